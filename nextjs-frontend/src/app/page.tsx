@@ -1,8 +1,8 @@
 'use client';
 
 import { useEffect, useState, useRef } from 'react';
-import { fraudAPI } from '@/lib/api';
-import { Stats, FraudResult } from '@/types';
+import { fraudAPI, createFraudEventSource } from '@/lib/api';
+import { Stats, FraudResult, Timeseries } from '@/types';
 import { Notification } from '@/types/notification';
 import { StatsOverview } from '@/components/StatsOverview';
 import { TransactionsTable } from '@/components/TransactionsTable';
@@ -13,6 +13,7 @@ import Link from 'next/link';
 export default function Dashboard() {
   const [stats, setStats] = useState<Stats | null>(null);
   const [transactions, setTransactions] = useState<FraudResult[]>([]);
+  const [timeseries, setTimeseries] = useState<Timeseries | null>(null);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState<string | null>(null);
   const [lastUpdate, setLastUpdate] = useState<Date>(new Date());
@@ -20,59 +21,85 @@ export default function Dashboard() {
   
   // Use ref to persist processed IDs across renders
   const processedIdsRef = useRef<Set<string>>(new Set());
+  // Write-position cursor from /recent, used to catch up after a stream reconnect
+  const cursorRef = useRef<string | null>(null);
+
+  // Store new fraud transactions for the notifications page
+  const recordFraudNotifications = (txns: FraudResult[]) => {
+    txns.forEach((txn) => {
+      if (txn.is_fraud && !processedIdsRef.current.has(txn.transaction_id)) {
+        // Store in localStorage for notifications page
+        const stored = localStorage.getItem('fraud_notifications') || '[]';
+        const notifications: Notification[] = JSON.parse(stored);
+        
+        const notification: Notification = {
+          id: txn.transaction_id,
+          transaction_id: txn.transaction_id,
+          user_id: txn.user_id,
+          amount: txn.amount,
+          fraud_probability: txn.fraud_probability,
+          risk_level: txn.risk_level,
+          is_fraud: txn.is_fraud,
+          timestamp: txn.timestamp,
+          model_used: txn.model_used,
+          ai_explanation: txn.ai_explanation,
+          risk_factors: txn.risk_factors,
+          recommendations: txn.recommendations,
+          read: false,
+        };
+        
+        notifications.unshift(notification);
+        // Keep only last 100 notifications
+        if (notifications.length > 100) {
+          notifications.splice(100);
+        }
+        
+        localStorage.setItem('fraud_notifications', JSON.stringify(notifications));
+        
+        // Mark as processed using ref
+        processedIdsRef.current.add(txn.transaction_id);
+      }
+    });
+  };
+
+  // Put new results on top, dropping any we already show
+  const mergeTransactions = (newTransactions: FraudResult[]) => {
+    if (newTransactions.length === 0) {
+      return;
+    }
+    recordFraudNotifications(newTransactions);
+    setTransactions((prev) => {
+      const ids = new Set(newTransactions.map((txn) => txn.transaction_id));
+      return [...newTransactions, ...prev.filter((txn) => !ids.has(txn.transaction_id))].slice(0, 100);
+    });
+    setLastUpdate(new Date());
+    updateUnreadCount();
+  };
+
+  const fetchSummary = async () => {
+    const [statsData, timeseriesData] = await Promise.all([
+      fraudAPI.getStats(),
+      fraudAPI.getTimeseries(24, 24).catch(() => null)
+    ]);
+    setStats(statsData);
+    setTimeseries(timeseriesData);
+  };
 
   const fetchData = async () => {
     try {
       console.log('🔄 Fetching data from backend...');
-      const [statsData, transactionsData] = await Promise.all([
-        fraudAPI.getStats(),
-        fraudAPI.getRecentTransactions(100)
+      const [transactionsData] = await Promise.all([
+        fraudAPI.getRecentTransactions(100),
+        fetchSummary()
       ]);
       console.log('✅ Data fetched:', {
-        stats: statsData,
         transactionCount: transactionsData.transactions?.length || 0
       });
-      setStats(statsData);
       
       const newTransactions = transactionsData.transactions || [];
-      
-      // Check for new fraud transactions and store them
-      newTransactions.forEach((txn) => {
-        if (txn.is_fraud && !processedIdsRef.current.has(txn.transaction_id)) {
-          // Store in localStorage for notifications page
-          const stored = localStorage.getItem('fraud_notifications') || '[]';
-          const notifications: Notification[] = JSON.parse(stored);
-          
-          const notification: Notification = {
-            id: txn.transaction_id,
-            transaction_id: txn.transaction_id,
-            user_id: txn.user_id,
-            amount: txn.amount,
-            fraud_probability: txn.fraud_probability,
-            risk_level: txn.risk_level,
-            is_fraud: txn.is_fraud,
-            timestamp: txn.timestamp,
-            model_used: txn.model_used,
-            ai_explanation: txn.ai_explanation,
-            risk_factors: txn.risk_factors,
-            recommendations: txn.recommendations,
-            read: false,
-          };
-          
-          notifications.unshift(notification);
-          // Keep only last 100 notifications
-          if (notifications.length > 100) {
-            notifications.splice(100);
-          }
-          
-          localStorage.setItem('fraud_notifications', JSON.stringify(notifications));
-          
-          // Mark as processed using ref
-          processedIdsRef.current.add(txn.transaction_id);
-        }
-      });
-      
+      recordFraudNotifications(newTransactions);
       setTransactions(newTransactions);
+      cursorRef.current = transactionsData.cursor ?? null;
       setLastUpdate(new Date());
       setError(null);
       
@@ -95,6 +122,25 @@ export default function Dashboard() {
     }
   };
 
+  // After a stream reconnect: fetch what was written while disconnected
+  const resync = async () => {
+    if (!cursorRef.current) {
+      return fetchData();
+    }
+    try {
+      const delta = await fraudAPI.getRecentTransactions(100, cursorRef.current);
+      if (delta.has_more) {
+        // Missed more than a page: start over from the newest rows
+        return fetchData();
+      }
+      mergeTransactions(delta.transactions || []);
+      cursorRef.current = delta.cursor ?? cursorRef.current;
+      await fetchSummary();
+    } catch (err) {
+      console.error('❌ Error resyncing after reconnect:', err);
+    }
+  };
+
   const updateUnreadCount = () => {
     const stored = localStorage.getItem('fraud_notifications');
     if (stored) {
@@ -115,14 +161,27 @@ export default function Dashboard() {
     
     fetchData();
 
-    // Poll for updates every 3 seconds
-    const interval = setInterval(fetchData, 3000);
+    // Live results over SSE; /recent?since= only fills the gap after a reconnect
+    const source = createFraudEventSource(
+      (result) => {
+        // /predict publishes bare scores without the transaction; the table needs both
+        if (result.user_id !== undefined) {
+          mergeTransactions([result]);
+        }
+      },
+      {},
+      resync
+    );
+
+    // Counters and charts change with every result, so refresh them on a slow timer
+    const summaryInterval = setInterval(() => fetchSummary().catch(() => null), 15000);
 
     // Update unread count periodically
     const unreadInterval = setInterval(updateUnreadCount, 1000);
 
     return () => {
-      clearInterval(interval);
+      source.close();
+      clearInterval(summaryInterval);
       clearInterval(unreadInterval);
     };
   }, []);
@@ -282,7 +341,7 @@ export default function Dashboard() {
           )}
 
           {/* Interactive Charts */}
-          <InteractiveCharts transactions={transactions} />
+          <InteractiveCharts transactions={transactions} timeseries={timeseries} />
 
           {/* Transactions Table */}
           <TransactionsTable transactions={transactions} onRefresh={fetchData} />
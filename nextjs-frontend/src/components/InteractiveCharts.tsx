@@ -1,7 +1,7 @@
 'use client';
 
 import React, { useState } from 'react';
-import { FraudResult } from '@/types';
+import { FraudResult, Timeseries } from '@/types';
 import {
   Chart as ChartJS,
   CategoryScale,
@@ -34,11 +34,12 @@ ChartJS.register(
 
 interface ChartsProps {
   transactions: FraudResult[];
+  timeseries?: Timeseries | null;
 }
 
 type TabType = 'risk-trend' | 'fraud-distribution' | 'amount-analysis' | 'hourly-volume';
 
-export const InteractiveCharts: React.FC<ChartsProps> = ({ transactions }) => {
+export const InteractiveCharts: React.FC<ChartsProps> = ({ transactions, timeseries }) => {
   const [activeTab, setActiveTab] = useState<TabType>('risk-trend');
 
   // Check if we have data
@@ -268,7 +269,14 @@ export const InteractiveCharts: React.FC<ChartsProps> = ({ transactions }) => {
     },
   };
 
-  // Prepare data for Hourly Volume
+  // Prepare data for Hourly Volume (server-side rollups when available)
+  const rollupHourlyData = timeseries?.points.map((point) => ({
+    hour: format(new Date(point.bucket_start + 'Z'), 'HH:00'),
+    total: point.count,
+    fraud: point.fraud_count,
+    legitimate: point.count - point.fraud_count,
+  }));
+
   const hourlyData = transactions.reduce((acc, txn) => {
     const hour = format(new Date(txn.timestamp), 'HH:00');
     if (!acc[hour]) {
@@ -280,9 +288,9 @@ export const InteractiveCharts: React.FC<ChartsProps> = ({ transactions }) => {
     return acc;
   }, {} as Record<string, { hour: string; total: number; fraud: number; legitimate: number }>);
 
-  const hourlyVolumeData = Object.values(hourlyData).sort((a, b) =>
-    a.hour.localeCompare(b.hour)
-  );
+  const hourlyVolumeData = rollupHourlyData && rollupHourlyData.length > 0
+    ? rollupHourlyData
+    : Object.values(hourlyData).sort((a, b) => a.hour.localeCompare(b.hour));
 
   const hourlyChartData = {
     labels: hourlyVolumeData.map(d => d.hour),
@@ -1,5 +1,5 @@
 import axios from 'axios';
-import { Stats, HealthCheck, RecentResults, FraudResult } from '@/types';
+import { Stats, HealthCheck, RecentResults, FraudResult, Timeseries } from '@/types';
 
 const API_URL = process.env.NEXT_PUBLIC_API_URL || 'http://localhost:8000';
 
@@ -55,26 +55,65 @@ export const fraudAPI = {
     return response.data;
   },
 
-  // Get recent transactions
-  getRecentTransactions: async (limit: number = 100): Promise<RecentResults> => {
-    const response = await api.get<RecentResults>(`/recent?limit=${limit}`);
+  // Get recent transactions (pass `since` to fetch only rows newer than a previous cursor)
+  getRecentTransactions: async (limit: number = 100, since?: string | null): Promise<RecentResults> => {
+    const params: Record<string, string | number> = { limit };
+    if (since) {
+      params.since = since;
+    }
+    const response = await api.get<RecentResults>('/recent', { params });
+    return response.data;
+  },
+
+  // Get downsampled chart series from server-side rollups
+  getTimeseries: async (hours: number = 24, maxPoints: number = 24): Promise<Timeseries> => {
+    const end = new Date();
+    const start = new Date(end.getTime() - hours * 3600 * 1000);
+    const response = await api.get<Timeseries>('/timeseries', {
+      params: {
+        start: start.toISOString(),
+        end: end.toISOString(),
+        max_points: maxPoints,
+      },
+    });
     return response.data;
   },
 };
 
-// Event source for real-time updates (if you want to implement SSE later)
-export const createFraudEventSource = (onMessage: (data: FraudResult) => void) => {
-  // For now, we'll poll. In production, you might use WebSocket or SSE
-  return setInterval(async () => {
+// Server-Sent Events stream of live fraud results (server-side filters optional).
+// `onReconnect` runs each time the browser re-establishes a dropped stream, so the
+// caller can fetch what it missed with /recent?since=<cursor>.
+export const createFraudEventSource = (
+  onMessage: (data: FraudResult) => void,
+  filters: { riskLevels?: string[]; userId?: string } = {},
+  onReconnect?: () => void
+) => {
+  const params = new URLSearchParams();
+  filters.riskLevels?.forEach((level) => params.append('risk_level', level));
+  if (filters.userId) {
+    params.append('user_id', filters.userId);
+  }
+  const query = params.toString();
+  const source = new EventSource(`${API_URL}/stream${query ? `?${query}` : ''}`);
+  let opened = false;
+
+  source.onopen = () => {
+    if (opened) {
+      onReconnect?.();
+    }
+    opened = true;
+  };
+  source.onmessage = (event) => {
     try {
-      const data = await fraudAPI.getRecentTransactions(10);
-      if (data.transactions.length > 0) {
-        onMessage(data.transactions[0]);
-      }
+      onMessage(JSON.parse(event.data));
     } catch (error) {
-      console.error('Failed to fetch updates:', error);
+      console.error('Failed to parse stream message:', error);
     }
-  }, 2000); // Poll every 2 seconds
+  };
+  // Evicted as a slow consumer: the browser reconnects automatically
+  source.addEventListener('evicted', () => console.warn('⚠️ Stream evicted, reconnecting...'));
+
+  return source;
 };
 
 export default api;
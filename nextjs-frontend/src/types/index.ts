@@ -11,7 +11,7 @@ export interface FraudResult extends Transaction {
   fraud_probability: number;
   risk_level: string;
   is_fraud: boolean;
-  features: Record<string, number>;
+  features?: Record<string, number>;  // only with /recent?include_features=true
   model_used: string;
   ai_explanation?: string;
   risk_factors?: string[];
@@ -37,4 +37,26 @@ export interface RecentResults {
   transactions: FraudResult[];
   total: number;
   limit: number;
+  cursor: string | null;       // write position; pass as `since` to fetch rows written after it
+  next_cursor: string | null;  // oldest row; pass as `before` to fetch the next older page
+  has_more: boolean;           // `since` mode: more new rows are waiting
+}
+
+export interface TimeseriesPoint {
+  bucket_start: string;
+  count: number;
+  fraud_count: number;
+  fraud_rate: number;
+  avg_risk_score: number;
+  total_amount: number;
+  risk_histogram: number[];  // 10 equal-width fraud_probability buckets
+  group?: string;
+}
+
+export interface Timeseries {
+  start: string;
+  end: string;
+  granularity: 'minute' | 'hour';
+  step_seconds: number;
+  points: TimeseriesPoint[];
 }
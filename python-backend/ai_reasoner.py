@@ -1,7 +1,15 @@
+import asyncio
+import time
 import httpx
 import json
 from typing import Dict, List, Optional
 from config import get_settings
+from circuit_breaker import CircuitBreaker
+import explanation_cache
+from explanation_cache import ExplanationCache
+import logs
+
+logger = logs.get_logger("ai")
 
 
 class AIReasoner:
@@ -15,6 +23,49 @@ class AIReasoner:
         self.ollama_url = self.settings.ollama_url
         self.ollama_model = self.settings.ollama_model
         
+        # One pooled keep-alive client, created on first use; a semaphore caps
+        # concurrent generations and the breaker skips Ollama while it is down
+        self._client: Optional[httpx.AsyncClient] = None
+        self._slots = asyncio.Semaphore(self.settings.ollama_max_concurrency)
+        self.breaker = CircuitBreaker(
+            "Ollama",
+            failure_threshold=self.settings.ollama_breaker_failures,
+            reset_timeout=self.settings.ollama_breaker_reset_seconds
+        )
+        self.stats = {
+            "succeeded": 0,
+            "failed": 0,
+            "timed_out": 0,
+            "saturated": 0,
+            "short_circuited": 0,
+        }
+        
+        # Ollama explanations are reused across transactions with the same risk profile;
+        # main.py attaches the Redis client when the cache is shared
+        self.explanation_cache: Optional[ExplanationCache] = None
+        if self.settings.explanation_cache_enabled:
+            self.explanation_cache = ExplanationCache(
+                max_entries=self.settings.explanation_cache_max_entries,
+                ttl=self.settings.explanation_cache_ttl_seconds
+            )
+    
+    def _get_client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            concurrency = self.settings.ollama_max_concurrency
+            self._client = httpx.AsyncClient(
+                base_url=self.ollama_url,
+                timeout=httpx.Timeout(self.settings.ollama_deadline_seconds,
+                                      connect=self.settings.ollama_connect_timeout),
+                limits=httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+            )
+        return self._client
+    
+    async def aclose(self):
+        """Close the pooled Ollama client"""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+        
     async def explain_fraud(
         self,
         transaction_id: str,
@@ -28,9 +79,9 @@ class AIReasoner:
         if not self.settings.enable_ai_reasoning:
             return None
         
-        # Get top risk factors
+        # Get top risk factors (the detector also reports its model and rule reason as strings)
         sorted_features = sorted(
-            feature_importance.items(),
+            ((name, value) for name, value in feature_importance.items() if isinstance(value, (int, float))),
             key=lambda x: x[1],
             reverse=True
         )[:5]
@@ -41,8 +92,11 @@ class AIReasoner:
                 transaction_id, fraud_score, risk_level, features, sorted_features
             )
         elif self.mode == "ollama":
+            cache_key = None
+            if self.explanation_cache is not None:
+                cache_key = explanation_cache.signature(risk_level, features, feature_importance)
             return await self._ollama_explanation(
-                transaction_id, fraud_score, risk_level, features, sorted_features
+                transaction_id, fraud_score, risk_level, features, sorted_features, cache_key
             )
         else:
             # Fallback to rule-based
@@ -119,17 +173,83 @@ class AIReasoner:
         fraud_score: float,
         risk_level: str,
         features: Dict[str, float],
-        top_features: List[tuple]
+        top_features: List[tuple],
+        cache_key: Optional[str] = None
     ) -> Dict[str, any]:
         """Generate AI explanation using local Ollama with Gemma 2B"""
         
-        # Build prompt for Ollama
+        def result(explanation: str, cached: bool = False):
+            return {
+                "transaction_id": transaction_id,
+                "fraud_score": fraud_score,
+                "risk_level": risk_level,
+                "explanation": explanation,
+                "risk_factors": [f"{k}: {v:.3f}" for k, v in top_features],
+                "recommendations": self._generate_enhanced_recommendations(risk_level, features, fraud_score),
+                "ai_model": f"Ollama {self.ollama_model}",
+                "confidence": f"{fraud_score:.1%}",
+                "cached": cached
+            }
+        
+        def fallback():
+            return self._rule_based_explanation(
+                transaction_id, fraud_score, risk_level, features, top_features
+            )
+        
+        # Same risk profile seen recently: reuse that explanation with this transaction's numbers
+        if cache_key is not None:
+            values = explanation_cache.fill_values(transaction_id, fraud_score, features, top_features)
+            cached = await self.explanation_cache.get(cache_key, values)
+            if cached is not None:
+                return result(cached, cached=True)
+        
+        # Open circuit: answer from the rules right away instead of waiting on a dead server
+        if not self.breaker.allow():
+            self.stats["short_circuited"] += 1
+            return fallback()
+        
+        # Cancelled before an outcome is recorded: hand back the probe
+        # (if this was one) so the breaker does not wait on it forever
+        started_at = time.perf_counter()
+        try:
+            explanation = await self._ollama_generate(fraud_score, risk_level, features, top_features)
+        except BaseException:
+            self.breaker.release()
+            raise
+        if explanation is None:
+            return fallback()
+        if cache_key is not None and explanation:
+            await self.explanation_cache.put(cache_key, explanation, values, time.perf_counter() - started_at)
+        return result(explanation)
+    
+    async def _ollama_generate(
+        self,
+        fraud_score: float,
+        risk_level: str,
+        features: Dict[str, float],
+        top_features: List[tuple]
+    ) -> Optional[str]:
+        """One Ollama generation under the slot limit and deadline; None means use the fallback
+        
+        Records the outcome on the breaker, except when saturated or cancelled.
+        """
         prompt = self._build_ollama_prompt(fraud_score, risk_level, features, top_features)
         
+        # The deadline covers waiting for a generation slot and the request itself
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.settings.ollama_deadline_seconds
         try:
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                response = await client.post(
-                    f"{self.ollama_url}/api/generate",
+            await asyncio.wait_for(self._slots.acquire(), self.settings.ollama_deadline_seconds)
+        except asyncio.TimeoutError:
+            # Saturated, not failing: leave the breaker alone
+            self.breaker.release()
+            self.stats["saturated"] += 1
+            return None
+        
+        try:
+            response = await asyncio.wait_for(
+                self._get_client().post(
+                    "/api/generate",
                     json={
                         "model": self.ollama_model,
                         "prompt": prompt,
@@ -140,35 +260,41 @@ class AIReasoner:
                             "max_tokens": 250
                         }
                     }
-                )
-                
-                if response.status_code == 200:
-                    result = response.json()
-                    explanation = result.get('response', '').strip()
-                    
-                    return {
-                        "transaction_id": transaction_id,
-                        "fraud_score": fraud_score,
-                        "risk_level": risk_level,
-                        "explanation": explanation,
-                        "risk_factors": [f"{k}: {v:.3f}" for k, v in top_features],
-                        "recommendations": self._generate_enhanced_recommendations(risk_level, features, fraud_score),
-                        "ai_model": f"Ollama {self.ollama_model}",
-                        "confidence": f"{fraud_score:.1%}"
-                    }
-                else:
-                    # Fallback to demo mode
-                    print(f"⚠️ Ollama not available (status {response.status_code}), using demo mode")
-                    return self._demo_explanation(
-                        transaction_id, fraud_score, risk_level, features, top_features
-                    )
-        
-        except Exception as e:
-            print(f"⚠️ Ollama connection failed: {e}, falling back to demo mode")
-            # Fallback to demo mode
-            return self._demo_explanation(
-                transaction_id, fraud_score, risk_level, features, top_features
+                ),
+                max(deadline - loop.time(), 0.001)
             )
+        except asyncio.TimeoutError:
+            self.breaker.record_failure()
+            self.stats["timed_out"] += 1
+            logger.warning("⚠️ Ollama missed its %.1fs deadline, using rule-based explanation",
+                           self.settings.ollama_deadline_seconds)
+            return None
+        except Exception as e:
+            self.breaker.record_failure()
+            self.stats["failed"] += 1
+            logger.warning("⚠️ Ollama connection failed: %s, using rule-based explanation", e)
+            return None
+        finally:
+            self._slots.release()
+        
+        if response.status_code != 200:
+            self.breaker.record_failure()
+            self.stats["failed"] += 1
+            logger.warning("⚠️ Ollama not available (status %s), using rule-based explanation", response.status_code)
+            return None
+        
+        # Only a usable answer counts as a success
+        try:
+            explanation = response.json().get('response', '').strip()
+        except (ValueError, AttributeError) as e:
+            self.breaker.record_failure()
+            self.stats["failed"] += 1
+            logger.warning("⚠️ Ollama returned a malformed response (%s), using rule-based explanation", e)
+            return None
+        
+        self.breaker.record_success()
+        self.stats["succeeded"] += 1
+        return explanation
     
     def _build_ollama_prompt(
         self,
@@ -0,0 +1,99 @@
+"""
+Backpressure and adaptive load shedding for the ingestion pipeline
+
+Stages are connected by bounded queues. The controller watches how full
+they are and steps through degradation modes, each one cheaper than the
+last, so a flood slows the least important work first:
+
+    normal       full pipeline, AI explanations inline
+    defer_ai     explanations move to a bounded background queue (skipped when it is full)
+    cheap_model  scoring switches to the rule-weighted SimpleFraudDetector
+    shed         low-amount transactions are parked in the deferred queue
+                 and replayed once the pipeline is back to normal
+
+Stepping back down needs the fill ratio to drop `hysteresis` below the
+threshold that triggered the mode and the current mode to have lasted
+`min_dwell` seconds, so bursty traffic does not make the pipeline flap.
+"""
+import asyncio
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Sequence
+
+import logs
+
+logger = logs.get_logger("backpressure")
+
+NORMAL = 0
+DEFER_AI = 1
+CHEAP_MODEL = 2
+SHED = 3
+MODE_NAMES = ("normal", "defer_ai", "cheap_model", "shed")
+
+
+class DegradationController:
+    """Pick the degradation mode from the fill ratio of the pipeline queues"""
+
+    def __init__(self, queues: Dict[str, asyncio.Queue], thresholds: Sequence[float] = (0.5, 0.75, 0.9),
+                 hysteresis: float = 0.2, min_dwell: float = 5.0, deferred_max: int = 50000):
+        self.queues = queues
+        # thresholds[i] is the fill ratio that enters mode i + 1
+        self.thresholds = tuple(thresholds)
+        self.hysteresis = hysteresis
+        self.min_dwell = min_dwell
+        self.mode = NORMAL
+        self._changed_at = time.monotonic()
+        self.deferred: Deque[Any] = deque()
+        self.deferred_max = deferred_max
+        self.stats = {
+            "mode_changes": 0,
+            "explanations_deferred": 0,
+            "explanations_skipped": 0,
+            "shed": 0,
+            "shed_dropped": 0,
+            "replayed": 0,
+        }
+
+    @property
+    def mode_name(self) -> str:
+        return MODE_NAMES[self.mode]
+
+    def fill_ratio(self) -> float:
+        """Fill of the fullest queue, 0.0 to 1.0"""
+        return max((q.qsize() / q.maxsize for q in self.queues.values() if q.maxsize), default=0.0)
+
+    def update(self) -> int:
+        """Recompute the mode; cheap enough to call once per transaction"""
+        fill = self.fill_ratio()
+        mode = self.mode
+        while mode < SHED and fill >= self.thresholds[mode]:
+            mode += 1
+        if mode == self.mode and time.monotonic() - self._changed_at >= self.min_dwell:
+            while mode > NORMAL and fill < self.thresholds[mode - 1] - self.hysteresis:
+                mode -= 1
+        if mode != self.mode:
+            logger.warning("⚠️  Degradation mode %s -> %s (queue fill %.0f%%)",
+                           self.mode_name, MODE_NAMES[mode], fill * 100)
+            self.mode = mode
+            self._changed_at = time.monotonic()
+            self.stats["mode_changes"] += 1
+        return mode
+
+    def shed(self, item: Any) -> bool:
+        """Park an item for later; False (and counted) if the deferred queue is full"""
+        if len(self.deferred) >= self.deferred_max:
+            self.stats["shed_dropped"] += 1
+            return False
+        self.deferred.append(item)
+        self.stats["shed"] += 1
+        return True
+
+    def get_stats(self) -> dict:
+        """Mode, queue depths and shedding counters"""
+        return {
+            "mode": self.mode_name,
+            "queue_fill": round(self.fill_ratio(), 3),
+            "queues": {name: q.qsize() for name, q in self.queues.items()},
+            "deferred": len(self.deferred),
+            **self.stats
+        }
@@ -0,0 +1 @@
+"""Performance benchmarks (run from python-backend with `python -m benchmarks.<name>`)"""
@@ -0,0 +1,70 @@
+"""
+Benchmark the stdlib and fast JSON codec paths
+
+Usage (from python-backend):
+    python -m benchmarks.codec_benchmark [--messages 20000]
+"""
+import argparse
+import json
+import time
+from datetime import datetime
+
+import numpy as np
+
+import codec
+from feature_extractor import FEATURE_NAMES
+
+
+def _sample_message(i: int) -> str:
+    """A transaction shaped like the go-mock-api payload"""
+    return json.dumps({
+        "transaction_id": f"txn-{i:08d}",
+        "user_id": f"user_{i % 500}",
+        "amount": 125.5 + i % 1000,
+        "currency": "USD",
+        "transaction_type": "purchase",
+        "merchant_id": f"merchant_{i % 50}",
+        "merchant_category": "retail",
+        "location": "New York, US",
+        "ip_address": "192.168.1.10",
+        "device_id": f"device_{i % 200}",
+        "timestamp": datetime.utcnow().isoformat() + "Z",
+        "metadata": {"channel": "web", "attempt": 1}
+    })
+
+
+def _run(messages, fast: bool) -> float:
+    """Decode, build and encode every message as the scoring path does; returns messages per second"""
+    features = np.random.rand(len(FEATURE_NAMES))
+    fraud_prob = np.float64(0.12)
+    is_fraud = fraud_prob >= 0.5
+    start = time.perf_counter()
+    for raw in messages:
+        transaction = codec.decode_transaction(raw, fast=fast)
+        result = codec.build_result(transaction, fraud_prob, "low", is_fraud, features.tolist(), "pretrained_lr")
+        codec.encode_result(result, fast=fast)
+    return len(messages) / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--messages", type=int, default=20000)
+    args = parser.parse_args()
+
+    if codec.orjson is None:
+        raise SystemExit("orjson is not installed")
+
+    messages = [_sample_message(i) for i in range(args.messages)]
+    # Warm up both paths
+    _run(messages[:1000], fast=False)
+    _run(messages[:1000], fast=True)
+    stdlib_rate = _run(messages, fast=False)
+    fast_rate = _run(messages, fast=True)
+
+    print(f"stdlib (json + Transaction(**data)): {stdlib_rate:,.0f} msg/s")
+    print(f"orjson (model_validate_json + orjson): {fast_rate:,.0f} msg/s")
+    print(f"speedup: {fast_rate / stdlib_rate:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,604 @@
+"""
+Load generator and end-to-end latency benchmark
+
+Generates transactions with the same normal and fraud patterns as
+go-mock-api (high amount, velocity bursts, multiple IPs, unusual time,
+account takeover) and drives the pipeline at a target TPS:
+
+- redis: publish to the `transactions` channel of a running backend and
+  time each result arriving on the results channel (end-to-end only).
+- inprocess: run the backend's own ingestion pipeline (main.py: consumer,
+  lanes, per-user scheduler, degradation, dedup, batched writers and
+  publisher) in this process, with Redis and the database session swapped
+  for in-process stand-ins unless --publish fakeredis/redis or --persist
+  postgres. Stage timings are taken from the service's own metrics.
+
+Latencies are measured from each transaction's scheduled send time, so a
+pipeline that falls behind shows up as queueing delay: end_to_end until
+the result is published, persisted until its row is committed. Results are
+written as JSON for tracking between versions.
+
+Usage (from python-backend):
+    python -m benchmarks.load_generator --mode inprocess --tps 500 --duration 30
+    python -m benchmarks.load_generator --mode redis --tps 200 --duration 60
+"""
+import argparse
+import asyncio
+import json
+import random
+import sqlite3
+import subprocess
+import time
+import uuid
+from collections import Counter, defaultdict
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from config import get_settings
+
+settings = get_settings()
+
+FRAUD_TYPES = ("high_amount", "velocity_attack", "multiple_ips", "unusual_time", "account_takeover")
+
+
+class TransactionGenerator:
+    """Python port of the go-mock-api TransactionGenerator"""
+
+    user_ids = [f"user_{i:03d}" for i in range(1, 16)]
+    merchant_ids = [
+        "merchant_amazon", "merchant_walmart", "merchant_target",
+        "merchant_bestbuy", "merchant_apple", "merchant_gas_station",
+        "merchant_restaurant", "merchant_grocery", "merchant_pharmacy",
+        "merchant_online_shop",
+    ]
+    ip_addresses = [
+        "192.168.1.1", "192.168.1.2", "10.0.0.1", "10.0.0.2",
+        "172.16.0.1", "172.16.0.2", "8.8.8.8", "1.1.1.1",
+    ]
+    device_ids = [
+        "device_mobile_001", "device_mobile_002", "device_web_001",
+        "device_web_002", "device_tablet_001", "device_tablet_002",
+    ]
+    locations = [
+        "New York, NY", "Los Angeles, CA", "Chicago, IL",
+        "Houston, TX", "Phoenix, AZ", "Philadelphia, PA",
+        "San Antonio, TX", "San Diego, CA", "Dallas, TX",
+    ]
+    categories = [
+        "electronics", "groceries", "gas", "restaurant",
+        "retail", "online", "entertainment", "healthcare",
+    ]
+    types = ["payment", "transfer", "withdrawal", "deposit", "refund"]
+
+    def __init__(self, fraud_rate: float = 0.15, velocity_burst: int = 6, seed: Optional[int] = None):
+        self.fraud_rate = fraud_rate
+        self.velocity_burst = velocity_burst
+        self.rng = random.Random(seed)
+        self._pending: List[dict] = []
+
+    def _uuid(self) -> str:
+        return str(uuid.UUID(int=self.rng.getrandbits(128), version=4))
+
+    def normal(self) -> dict:
+        """A normal transaction ($5 - $500)"""
+        rng = self.rng
+        return {
+            "transaction_id": self._uuid(),
+            "user_id": rng.choice(self.user_ids),
+            "amount": 5.0 + rng.random() * 495.0,
+            "currency": "USD",
+            "transaction_type": rng.choice(self.types),
+            "merchant_id": rng.choice(self.merchant_ids),
+            "merchant_category": rng.choice(self.categories),
+            "location": rng.choice(self.locations),
+            "ip_address": rng.choice(self.ip_addresses),
+            "device_id": rng.choice(self.device_ids),
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "metadata": {"is_fraud": False, "fraud_type": None},
+        }
+
+    def _fraud(self, txn: dict, fraud_type: str) -> dict:
+        txn["metadata"] = {"is_fraud": True, "fraud_type": fraud_type}
+        return txn
+
+    def fraud(self) -> List[dict]:
+        """One fraudulent transaction, or a burst for a velocity attack"""
+        rng = self.rng
+        fraud_type = rng.choice(FRAUD_TYPES)
+        txn = self.normal()
+        if fraud_type == "high_amount":
+            txn["amount"] = 1000.0 + rng.random() * 4000.0
+        elif fraud_type == "velocity_attack":
+            # Sent in rapid succession for the same user
+            burst = [self._fraud(txn, fraud_type)]
+            for _ in range(self.velocity_burst - 1):
+                follow = self.normal()
+                follow["user_id"] = txn["user_id"]
+                burst.append(self._fraud(follow, fraud_type))
+            return burst
+        elif fraud_type == "multiple_ips":
+            txn["ip_address"] = f"203.0.113.{rng.randrange(255)}"
+        elif fraud_type == "unusual_time":
+            now = datetime.now(timezone.utc)
+            txn["timestamp"] = now.replace(
+                hour=2 + rng.randrange(3), minute=rng.randrange(60), second=rng.randrange(60), microsecond=0
+            ).isoformat()
+        else:
+            txn["device_id"] = "device_unknown_" + self._uuid()[:8]
+            txn["location"] = "Unknown Location"
+            txn["amount"] = 500.0 + rng.random() * 1500.0
+        return [self._fraud(txn, fraud_type)]
+
+    def next(self) -> dict:
+        """Next transaction (normal or fraud)"""
+        if not self._pending:
+            self._pending = self.fraud() if self.rng.random() < self.fraud_rate else [self.normal()]
+        return self._pending.pop(0)
+
+
+class LatencyRecorder:
+    """Per-stage latency samples in seconds"""
+
+    def __init__(self):
+        self.samples: Dict[str, List[float]] = defaultdict(list)
+
+    def record(self, stage: str, seconds: float):
+        self.samples[stage].append(seconds)
+
+    def summary(self) -> Dict[str, dict]:
+        """count, mean, p50/p95/p99 and max per stage, in milliseconds"""
+        result = {}
+        for stage, values in self.samples.items():
+            arr = np.asarray(values) * 1000.0
+            p50, p95, p99 = np.percentile(arr, [50, 95, 99])
+            result[stage] = {
+                "count": len(values),
+                "mean_ms": round(float(arr.mean()), 4),
+                "p50_ms": round(float(p50), 4),
+                "p95_ms": round(float(p95), 4),
+                "p99_ms": round(float(p99), 4),
+                "max_ms": round(float(arr.max()), 4),
+            }
+        return result
+
+
+class StandInDatabase:
+    """Stand-in for main.AsyncSessionLocal: SQLite, or nothing when `path` is None"""
+
+    def __init__(self, path: Optional[str] = ":memory:"):
+        self.conn = sqlite3.connect(path) if path is not None else None
+        if self.conn is None:
+            return
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS transactions (
+                transaction_id TEXT, timestamp TEXT, user_id TEXT, amount REAL,
+                transaction_type TEXT, merchant_id TEXT, fraud_probability REAL,
+                risk_level TEXT, is_fraud INTEGER, feature_vector TEXT,
+                PRIMARY KEY (transaction_id, timestamp)
+            );
+            CREATE TABLE IF NOT EXISTS transaction_stats (
+                id INTEGER PRIMARY KEY, total_transactions INTEGER, fraud_detected INTEGER, risk_score_sum REAL
+            );
+        """)
+
+    def __call__(self) -> "StandInSession":
+        return StandInSession(self.conn)
+
+
+class StandInSession:
+    """What the writers and the duplicate check use of an AsyncSession: add_all, execute and commit
+
+    Each commit inserts the batch's rows and does one counters upsert, like
+    crud.create_transactions_async; the rollup upserts are not reproduced.
+    """
+
+    def __init__(self, conn: Optional[sqlite3.Connection]):
+        self.conn = conn
+        self._rows = []
+        self._found = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        self._rows = []
+        if self.conn is not None and exc_type is not None:
+            self.conn.rollback()
+
+    def add_all(self, rows: Sequence):
+        self._rows.extend(rows)
+
+    async def execute(self, statement):
+        """Answers the duplicate check's lookup by ID; the counters/rollup upserts wait for commit"""
+        if getattr(statement, "is_select", False):
+            txn_id = statement.compile().params.get("transaction_id_1")
+            self._found = None
+            if self.conn is not None:
+                self._found = self.conn.execute(
+                    "SELECT transaction_id FROM transactions WHERE transaction_id = ?", (txn_id,)
+                ).fetchone()
+        return self
+
+    def scalar_one_or_none(self):
+        return self._found
+
+    async def commit(self):
+        rows, self._rows = self._rows, []
+        if self.conn is None or not rows:
+            return
+        self.conn.executemany(
+            "INSERT INTO transactions VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            [(row.transaction_id, row.timestamp.isoformat(), row.user_id, row.amount, row.transaction_type,
+              row.merchant_id, row.fraud_probability, row.risk_level, int(row.is_fraud),
+              json.dumps(row.feature_vector)) for row in rows]
+        )
+        self.conn.execute(
+            "INSERT INTO transaction_stats VALUES (1, ?, ?, ?) ON CONFLICT(id) DO UPDATE SET "
+            "total_transactions = total_transactions + excluded.total_transactions, "
+            "fraud_detected = fraud_detected + excluded.fraud_detected, "
+            "risk_score_sum = risk_score_sum + excluded.risk_score_sum",
+            (len(rows), sum(1 for row in rows if row.is_fraud), sum(row.fraud_probability for row in rows))
+        )
+        self.conn.commit()
+
+
+class StandInRedis:
+    """In-process stand-in for the async Redis client: PUBLISH, pipelined PUBLISH and pub/sub"""
+
+    def __init__(self):
+        self._subscribers: Dict[str, set] = defaultdict(set)
+
+    async def publish(self, channel: str, message) -> int:
+        if isinstance(message, bytes):
+            message = message.decode()  # As a decode_responses client would see it
+        subscribers = self._subscribers[channel]
+        for queue in subscribers:
+            queue.put_nowait({"type": "message", "channel": channel, "data": message})
+        return len(subscribers)
+
+    def pipeline(self, transaction: bool = False) -> "_StandInPipeline":
+        return _StandInPipeline(self)
+
+    def pubsub(self) -> "_StandInPubSub":
+        return _StandInPubSub(self)
+
+    async def pubsub_numsub(self, *channels: str) -> list:
+        return [(channel, len(self._subscribers[channel])) for channel in channels]
+
+    async def close(self):
+        pass
+
+
+class _StandInPipeline:
+    def __init__(self, redis_client: StandInRedis):
+        self.redis_client = redis_client
+        self._commands = []
+
+    def publish(self, channel: str, message):
+        self._commands.append((channel, message))
+
+    async def execute(self) -> list:
+        return [await self.redis_client.publish(channel, message) for channel, message in self._commands]
+
+
+class _StandInPubSub:
+    def __init__(self, redis_client: StandInRedis):
+        self.redis_client = redis_client
+        self.queue: asyncio.Queue = asyncio.Queue()
+        self.channels: set = set()
+
+    async def subscribe(self, *channels: str):
+        for channel in channels:
+            self.channels.add(channel)
+            self.redis_client._subscribers[channel].add(self.queue)
+
+    async def unsubscribe(self, *channels: str):
+        for channel in channels or tuple(self.channels):
+            self.channels.discard(channel)
+            self.redis_client._subscribers[channel].discard(self.queue)
+
+    async def listen(self):
+        while True:
+            yield await self.queue.get()
+
+    async def close(self):
+        await self.unsubscribe()
+
+
+def _make_redis(kind: str):
+    """Async Redis client carrying both the transactions and the results channel"""
+    if kind == "memory":
+        return StandInRedis()
+    if kind == "fakeredis":
+        try:
+            import fakeredis.aioredis
+        except ImportError:
+            raise SystemExit("❌ --publish fakeredis requires fakeredis (pip install fakeredis)")
+        return fakeredis.aioredis.FakeRedis(decode_responses=True)
+    import redis.asyncio as redis
+    return redis.from_url(settings.redis_url, decode_responses=True)
+
+
+# metrics.<stage histogram> -> recorded stage; the service's own end-to-end starts at receipt
+TAPPED_STAGES = {"PARSE": "parse", "FEATURES": "features", "PREDICT": "predict", "EXPLAIN": "explain",
+                 "DB_WRITE": "db_write", "PUBLISH": "publish", "PUBLISH_FLUSH": "publish_flush",
+                 "END_TO_END": "in_service"}
+
+
+class _TappedHistogram:
+    """A stage histogram that also hands every observation to the recorder"""
+
+    def __init__(self, histogram, stage: str, recorder: LatencyRecorder):
+        self.histogram = histogram
+        self.stage = stage
+        self.recorder = recorder
+
+    def observe(self, value: float):
+        self.histogram.observe(value)
+        self.recorder.record(self.stage, value)
+
+
+def _tap_stage_metrics(recorder: LatencyRecorder):
+    """Record the service's own stage timings per sample"""
+    import metrics
+
+    for attribute, stage in TAPPED_STAGES.items():
+        setattr(metrics, attribute, _TappedHistogram(getattr(metrics, attribute), stage, recorder))
+
+
+async def run_inprocess(args, generator: TransactionGenerator, recorder: LatencyRecorder) -> dict:
+    """Run main's ingestion pipeline in this process and drive it at the target TPS"""
+    import crud
+    import main
+    from ai_reasoner import AIReasoner
+    from feature_extractor import FeatureExtractor
+    from pretrained_detector import PretrainedFraudDetector
+    from publisher import BatchPublisher
+
+    # What main.initialize sets up, minus the API-only parts
+    if args.persist == "postgres":
+        from database import init_db
+        await asyncio.to_thread(init_db)
+    else:
+        main.AsyncSessionLocal = StandInDatabase(":memory:" if args.persist == "sqlite" else None)
+    main.redis_client = redis_client = _make_redis(args.publish)
+    main.fraud_detector = await asyncio.to_thread(PretrainedFraudDetector)
+    main.feature_extractor = FeatureExtractor(settings.feature_window, settings.feature_history_max_keys)
+    main.ai_reasoner = AIReasoner()
+    # Always pub/sub, so results can be timed as they arrive
+    main.result_publisher = BatchPublisher(
+        redis_client,
+        batch_size=settings.publish_batch_size,
+        flush_interval=settings.publish_flush_interval,
+        max_pending=settings.publish_max_pending
+    )
+    _tap_stage_metrics(recorder)
+
+    # Pre-encode messages so generation cost is not measured
+    total = int(args.tps * args.duration)
+    messages = []
+    fraud_types = Counter()
+    for _ in range(total):
+        txn = generator.next()
+        fraud_types[txn["metadata"]["fraud_type"] or "normal"] += 1
+        messages.append((txn["transaction_id"], json.dumps(txn)))
+
+    scheduled_at: Dict[str, float] = {}
+    unpersisted: Dict[str, float] = {}
+    completed = persisted = 0
+
+    create_transactions_async = crud.create_transactions_async
+
+    async def timed_create_transactions(db, rows):
+        nonlocal persisted
+        result = await create_transactions_async(db, rows)
+        now = time.perf_counter()
+        for row in rows:
+            sent = unpersisted.pop(row.transaction_id, None)
+            if sent is not None:
+                recorder.record("persisted", now - sent)
+                persisted += 1
+        return result
+
+    crud.create_transactions_async = timed_create_transactions
+
+    pubsub = redis_client.pubsub()
+    await pubsub.subscribe(settings.redis_results_stream)
+
+    async def listen():
+        nonlocal completed
+        async for message in pubsub.listen():
+            if message["type"] != "message":
+                continue
+            try:
+                txn_id = json.loads(message["data"]).get("transaction_id")
+            except ValueError:
+                continue
+            sent = scheduled_at.pop(txn_id, None)
+            if sent is not None:
+                recorder.record("end_to_end", time.perf_counter() - sent)
+                completed += 1
+
+    # Same stages as main.initialize starts, publisher last so it flushes on the way out
+    tasks = [
+        asyncio.create_task(listen()),
+        asyncio.create_task(main.process_transactions_from_redis()),
+        asyncio.create_task(main.score_transactions()),
+        asyncio.create_task(main.scheduler.run()),
+        *(asyncio.create_task(main.persist_results()) for _ in range(settings.db_writer_concurrency)),
+        asyncio.create_task(main.explain_deferred()),
+        asyncio.create_task(main.replay_deferred()),
+        asyncio.create_task(main.result_publisher.run()),
+    ]
+    # The consumer must be listening before the first send
+    while not (await redis_client.pubsub_numsub("transactions"))[0][1]:
+        await asyncio.sleep(0.01)
+
+    interval = 1.0 / args.tps
+    started = time.perf_counter()
+    for i, (txn_id, raw) in enumerate(messages):
+        scheduled = started + i * interval
+        delay = scheduled - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        scheduled_at[txn_id] = unpersisted[txn_id] = scheduled
+        t0 = time.perf_counter()
+        await redis_client.publish("transactions", raw)
+        recorder.record("send", time.perf_counter() - t0)
+
+    # Wait for stragglers (shed transactions come back once the pipeline is idle)
+    deadline = time.perf_counter() + args.drain
+    while (scheduled_at or unpersisted) and time.perf_counter() < deadline:
+        await asyncio.sleep(0.05)
+    elapsed = time.perf_counter() - started
+
+    for task in tasks:
+        task.cancel()
+    for task in tasks:
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+    crud.create_transactions_async = create_transactions_async
+    main.scoring_executor.shutdown(wait=False)
+    await main.ai_reasoner.aclose()
+    await redis_client.close()
+    return {
+        "sent": total,
+        "completed": completed,
+        "persisted": persisted,
+        "elapsed_seconds": elapsed,
+        "fraud_types": dict(fraud_types),
+        "dedup": main.dedup_cache.get_stats() if main.dedup_cache is not None else None,
+        "degradation": dict(main.degradation.stats),
+    }
+
+
+async def run_redis(args, generator: TransactionGenerator, recorder: LatencyRecorder) -> dict:
+    """Publish to a running backend and time results on the results channel"""
+    import redis.asyncio as redis
+
+    client = redis.from_url(settings.redis_url, decode_responses=True)
+    pubsub = client.pubsub()
+    await pubsub.subscribe(settings.redis_results_stream)
+
+    scheduled_at: Dict[str, float] = {}
+    completed = 0
+    fraud_types = Counter()
+
+    async def listen():
+        nonlocal completed
+        async for message in pubsub.listen():
+            if message["type"] != "message":
+                continue
+            try:
+                txn_id = json.loads(message["data"]).get("transaction_id")
+            except ValueError:
+                continue
+            sent = scheduled_at.pop(txn_id, None)
+            if sent is not None:
+                recorder.record("end_to_end", time.perf_counter() - sent)
+                completed += 1
+
+    listener = asyncio.create_task(listen())
+    total = int(args.tps * args.duration)
+    interval = 1.0 / args.tps
+    started = time.perf_counter()
+    for i in range(total):
+        txn = generator.next()
+        fraud_types[txn["metadata"]["fraud_type"] or "normal"] += 1
+        raw = json.dumps(txn)
+        scheduled = started + i * interval
+        delay = scheduled - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        scheduled_at[txn["transaction_id"]] = scheduled
+        t0 = time.perf_counter()
+        await client.publish("transactions", raw)
+        recorder.record("publish", time.perf_counter() - t0)
+
+    # Wait for stragglers
+    deadline = time.perf_counter() + args.drain
+    while scheduled_at and time.perf_counter() < deadline:
+        await asyncio.sleep(0.05)
+    elapsed = time.perf_counter() - started
+
+    listener.cancel()
+    try:
+        await listener
+    except asyncio.CancelledError:
+        pass
+    await pubsub.close()
+    await client.close()
+    return {"sent": total, "completed": completed, "elapsed_seconds": elapsed, "fraud_types": dict(fraud_types)}
+
+
+def _git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except Exception:
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Drive the fraud pipeline at a target TPS and report latencies")
+    parser.add_argument("--mode", choices=["inprocess", "redis"], default="inprocess")
+    parser.add_argument("--tps", type=float, default=100.0, help="Target transactions per second")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds of load")
+    parser.add_argument("--fraud-rate", type=float, default=0.15)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--persist", choices=["sqlite", "postgres", "none"], default="sqlite",
+                        help="inprocess: database session for the writers (SQLite stand-in, DATABASE_URL, or discard)")
+    parser.add_argument("--publish", choices=["memory", "fakeredis", "redis"], default="memory",
+                        help="inprocess: Redis carrying the transactions and results channels (memory: "
+                             "in-process stand-in; redis: REDIS_URL, with no other consumer running)")
+    parser.add_argument("--drain", type=float, default=10.0, help="Seconds to wait for late results")
+    parser.add_argument("--label", help="Free-form label stored with the results")
+    parser.add_argument("--output", default="load_results.json", help="JSON results file ('-' for stdout)")
+    args = parser.parse_args()
+
+    generator = TransactionGenerator(fraud_rate=args.fraud_rate, seed=args.seed)
+    recorder = LatencyRecorder()
+    if args.mode == "redis":
+        run = asyncio.run(run_redis(args, generator, recorder))
+    else:
+        run = asyncio.run(run_inprocess(args, generator, recorder))
+
+    results = {
+        "label": args.label,
+        "git_revision": _git_revision(),
+        "recorded_at": datetime.now(timezone.utc).isoformat(),
+        "mode": args.mode,
+        "persist": args.persist if args.mode == "inprocess" else "backend",
+        "publish": args.publish if args.mode == "inprocess" else "redis",
+        "target_tps": args.tps,
+        "duration_seconds": args.duration,
+        "sent": run["sent"],
+        "completed": run["completed"],
+        "lost": run["sent"] - run["completed"],
+        "persisted": run.get("persisted"),
+        "dedup": run.get("dedup"),
+        "degradation": run.get("degradation"),
+        "achieved_tps": round(run["completed"] / run["elapsed_seconds"], 2) if run["elapsed_seconds"] else 0.0,
+        "fraud_types": run["fraud_types"],
+        "stages": recorder.summary(),
+    }
+
+    payload = json.dumps(results, indent=2)
+    if args.output == "-":
+        print(payload)
+    else:
+        with open(args.output, "w") as f:
+            f.write(payload + "\n")
+        e2e = results["stages"].get("end_to_end", {})
+        print(f"✅ {results['completed']:,}/{results['sent']:,} completed at {results['achieved_tps']:,} TPS; "
+              f"end-to-end p50={e2e.get('p50_ms')}ms p95={e2e.get('p95_ms')}ms p99={e2e.get('p99_ms')}ms "
+              f"-> {args.output}")
+
+
+if __name__ == "__main__":
+    main()
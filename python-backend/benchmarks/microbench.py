@@ -0,0 +1,343 @@
+"""
+Microbenchmarks for the backend hot functions
+
+Covers feature extraction across history sizes (empty, 100 and 1000
+entries per user, a heavy-hitter IP), features_to_array, the detectors'
+predict (single and batched), AIReasoner._demo_explanation and, with
+--database, crud.create_transaction. Results can be saved as a baseline;
+later runs compare against it and exit non-zero when a case slows down by
+more than --threshold, or when there is no baseline to compare against.
+The committed baseline (benchmarks/baselines/microbench.json) comes from
+the reference runner; re-save it there when a change is meant to move the
+numbers. CI runs the gate with `python -m pytest -m benchmark`.
+
+Usage (from python-backend):
+    python -m benchmarks.microbench --save-baseline
+    python -m benchmarks.microbench --threshold 0.15
+    python -m benchmarks.microbench --filter features
+"""
+import argparse
+import json
+import os
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta
+from functools import lru_cache
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from config import get_settings
+from feature_extractor import FeatureExtractor, FEATURE_NAMES
+from models import Transaction
+
+settings = get_settings()
+
+DEFAULT_BASELINE = Path(__file__).parent / "baselines" / "microbench.json"
+BATCH_SIZES = (1, 32, 256)
+
+# A case builds fresh state and returns (operation, items processed per call, stateful)
+Case = Callable[[], Tuple[Callable[[], object], int, bool]]
+
+
+class SkipCase(Exception):
+    """A case whose optional dependency or service is unavailable"""
+
+
+_BASE_TIME = datetime(2026, 1, 5, 12, 0, 0)
+
+
+def _transaction(i: int, user_id: str = "user_bench", ip_address: Optional[str] = None,
+                 merchant_id: Optional[str] = "merchant_bench", amount: Optional[float] = None) -> Transaction:
+    return Transaction(
+        transaction_id=f"bench-{user_id}-{i}",
+        user_id=user_id,
+        amount=amount if amount is not None else 20.0 + (i * 37) % 300,
+        transaction_type="payment",
+        merchant_id=merchant_id,
+        ip_address=ip_address,
+        timestamp=_BASE_TIME + timedelta(seconds=60 * i)
+    )
+
+
+def _extractor_with_history(history: int, heavy_ip: int = 0) -> FeatureExtractor:
+    """Extractor whose bench user (and merchant) already hold `history` transactions"""
+    extractor = FeatureExtractor(window_size=settings.feature_window)
+    past = [_transaction(i - history) for i in range(history)]
+    extractor.user_history["user_bench"] = past
+    extractor.merchant_history["merchant_bench"] = list(past)
+    if heavy_ip:
+        extractor.ip_history["10.0.0.1"] = [
+            _transaction(i - heavy_ip, user_id=f"user_{i % 500}", ip_address="10.0.0.1") for i in range(heavy_ip)
+        ]
+    return extractor
+
+
+def _stream(factory: Callable[[int], Transaction]) -> Callable[[], Transaction]:
+    """Endless supply of transactions from factory(i)"""
+    counter = iter(range(10 ** 12))
+    return lambda: factory(next(counter))
+
+
+def case_extract(history: int) -> Case:
+    def build():
+        extractor = _extractor_with_history(history)
+        if history == 0:
+            # A new user and merchant on every call
+            next_txn = _stream(lambda i: _transaction(i, user_id=f"new_user_{i}", merchant_id=f"new_merchant_{i}"))
+        else:
+            next_txn = _stream(lambda i: _transaction(i))
+        return lambda: extractor.extract_features(next_txn()), 1, True
+    return build
+
+
+def case_extract_heavy_ip(ip_history: int) -> Case:
+    def build():
+        extractor = _extractor_with_history(100, heavy_ip=ip_history)
+        next_txn = _stream(lambda i: _transaction(i, ip_address="10.0.0.1"))
+        return lambda: extractor.extract_features(next_txn()), 1, True
+    return build
+
+
+def case_extract_batch(batch_size: int) -> Case:
+    def build():
+        extractor = _extractor_with_history(100)
+        counter = iter(range(10 ** 12))
+
+        def run():
+            start = next(counter) * batch_size
+            return extractor.extract_features_batch([_transaction(start + i) for i in range(batch_size)])
+        return run, batch_size, True
+    return build
+
+
+def case_to_array() -> Case:
+    def build():
+        extractor = FeatureExtractor()
+        features = extractor.extract_features(_transaction(0))
+        return lambda: extractor.features_to_array(features), 1, False
+    return build
+
+
+def _feature_rows(n: int, path: str) -> np.ndarray:
+    """Feature rows that take the ML path ('ml') or a rule path ('rule') in PretrainedFraudDetector"""
+    rows = np.zeros((n, len(FEATURE_NAMES)))
+    rows[:, 0] = 50.0 + (np.arange(n) % 200)  # amount
+    rows[:, 5] = 120.0                         # user_avg_amount
+    rows[:, 9] = rows[:, 0] / 120.0            # amount_vs_avg
+    rows[:, 10] = 6 if path == "rule" else 1   # txns_last_hour (>= 5 triggers the velocity rule)
+    return rows
+
+
+@lru_cache(maxsize=None)
+def _pretrained_detector():
+    """Shared PretrainedFraudDetector (it trains on construction)"""
+    from pretrained_detector import PretrainedFraudDetector
+    return PretrainedFraudDetector()
+
+
+def case_pretrained(path: str, batch_size: int = 0) -> Case:
+    def build():
+        detector = _pretrained_detector()
+        if batch_size:
+            rows = _feature_rows(batch_size, path)
+            return lambda: detector.predict_batch(rows), batch_size, False
+        row = _feature_rows(1, path)[0]
+        return lambda: detector.predict(row), 1, False
+    return build
+
+
+def case_simple() -> Case:
+    def build():
+        from simple_detector import SimpleFraudDetector
+        detector = SimpleFraudDetector()
+        row = _feature_rows(1, "ml")[0]
+        return lambda: detector.predict(row), 1, False
+    return build
+
+
+@lru_cache(maxsize=None)
+def _ml_detector(model_type: str):
+    """Shared FraudDetector per model type, trained into a scratch directory so ./models is left alone"""
+    from fraud_detector import FraudDetector
+    return FraudDetector(model_type=model_type, model_path=tempfile.mkdtemp(prefix="bench_models_"))
+
+
+def case_ml_detector(model_type: str) -> Case:
+    def build():
+        try:
+            import fraud_detector  # noqa: F401 (xgboost, lightgbm and torch are optional here)
+        except ImportError as e:
+            raise SkipCase(str(e))
+        detector = _ml_detector(model_type)
+        row = _feature_rows(1, "ml")[0]
+        return lambda: detector.predict(row), 1, False
+    return build
+
+
+def case_demo_explanation() -> Case:
+    def build():
+        from ai_reasoner import AIReasoner
+        reasoner = AIReasoner()
+        features = FeatureExtractor().extract_features(_transaction(0, amount=850.0))
+        top_features = [("amount", 0.85), ("amount_vs_avg", 0.4), ("txns_last_hour", 0.2)]
+        return lambda: reasoner._demo_explanation("bench-txn", 0.87, "critical", features, top_features), 1, False
+    return build
+
+
+def case_create_transaction() -> Case:
+    def build():
+        import crud
+        from database import SessionLocal, init_db
+        from models import FraudScore
+        try:
+            init_db()
+        except Exception as e:
+            raise SkipCase(f"database unavailable: {e}")
+        db = SessionLocal()
+        extractor = FeatureExtractor()
+        counter = iter(range(10 ** 12))
+        run_id = int(time.time())
+
+        def run():
+            txn = _transaction(next(counter), user_id=f"bench_{run_id}")
+            txn.timestamp = datetime.utcnow()
+            features = extractor.extract_features(txn)
+            score = FraudScore(
+                transaction_id=txn.transaction_id, fraud_probability=0.1, risk_level="low",
+                is_fraud=False, features=features, model_used="bench"
+            )
+            return crud.create_transaction(db, txn, score, feature_vector=extractor.features_to_array(features).tolist())
+        return run, 1, True
+    return build
+
+
+def all_cases(include_database: bool) -> Dict[str, Case]:
+    """Every benchmark case by name"""
+    cases: Dict[str, Case] = {}
+    for history in (0, 100, 1000):
+        cases[f"features.extract[history={history}]"] = case_extract(history)
+    cases["features.extract[heavy_ip=10000]"] = case_extract_heavy_ip(10000)
+    for batch_size in BATCH_SIZES:
+        cases[f"features.extract_batch[batch={batch_size}]"] = case_extract_batch(batch_size)
+    cases["features.to_array"] = case_to_array()
+    for path in ("ml", "rule"):
+        cases[f"detector.pretrained.predict[{path}]"] = case_pretrained(path)
+        for batch_size in BATCH_SIZES:
+            cases[f"detector.pretrained.predict_batch[{path},batch={batch_size}]"] = case_pretrained(path, batch_size)
+    cases["detector.simple.predict"] = case_simple()
+    for model_type in ("xgboost", "lightgbm"):
+        cases[f"detector.{model_type}.predict"] = case_ml_detector(model_type)
+    cases["reasoner.demo_explanation"] = case_demo_explanation()
+    if include_database:
+        cases["crud.create_transaction"] = case_create_transaction()
+    return cases
+
+
+def measure(case: Case, repeats: int, items_per_repeat: int, min_time: float) -> dict:
+    """Median and best nanoseconds per item over `repeats` fresh runs
+
+    Stateful cases (histories that grow with every call) make a fixed number
+    of calls so their state evolves identically between runs; stateless
+    cases run for at least `min_time` seconds to average out timer noise.
+    """
+    per_item = []
+    calls_total = 0
+    for _ in range(repeats):
+        op, items, stateful = case()
+        op()  # warm-up
+        calls = 0
+        target = max(items_per_repeat // items, 5)
+        start = time.perf_counter_ns()
+        deadline = start + int(min_time * 1e9)
+        now = start
+        while calls < target or (not stateful and now < deadline):
+            op()
+            calls += 1
+            now = time.perf_counter_ns()
+        per_item.append((now - start) / (calls * items))
+        calls_total += calls
+    return {
+        "ns_per_item": round(statistics.median(per_item), 1),
+        "best_ns_per_item": round(min(per_item), 1),
+        "calls": calls_total,
+    }
+
+
+def compare(results: Dict[str, dict], baseline: Dict[str, dict], threshold: float) -> List[str]:
+    """Names of cases slower than baseline by more than `threshold` (fraction)"""
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get(name)
+        if not base or "ns_per_item" not in result or "ns_per_item" not in base:
+            continue
+        # Median of the repeats: best-of-repeats swings with one lucky run
+        change = result["ns_per_item"] / base["ns_per_item"] - 1.0
+        result["change_vs_baseline"] = round(change, 4)
+        if change > threshold:
+            regressions.append(name)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Microbenchmarks for the backend hot functions")
+    parser.add_argument("--filter", help="Only run cases whose name contains this text")
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--items", type=int, default=500, help="Items per repeat for stateful cases")
+    parser.add_argument("--min-time", type=float, default=0.1, help="Seconds per repeat for stateless cases")
+    parser.add_argument("--database", action="store_true", help="Include crud.create_transaction (needs DATABASE_URL)")
+    parser.add_argument("--baseline", default=str(DEFAULT_BASELINE), help="Baseline JSON file")
+    parser.add_argument("--save-baseline", action="store_true", help="Write these results as the new baseline")
+    parser.add_argument("--threshold", type=float,
+                        default=float(os.environ.get("MICROBENCH_THRESHOLD", "0.20")),
+                        help="Allowed slowdown vs baseline before failing (0.20 = 20%%)")
+    parser.add_argument("--output", help="Also write results JSON here")
+    args = parser.parse_args()
+
+    cases = {name: case for name, case in all_cases(args.database).items()
+             if not args.filter or args.filter in name}
+
+    results: Dict[str, dict] = {}
+    for name, case in cases.items():
+        try:
+            results[name] = measure(case, args.repeats, args.items, args.min_time)
+        except SkipCase as e:
+            results[name] = {"skipped": str(e)}
+        print(f"  {name:<55} " + (
+            f"{results[name]['ns_per_item'] / 1000:>10.2f} µs/item" if "ns_per_item" in results[name]
+            else f"skipped ({results[name]['skipped']})"
+        ), flush=True)
+
+    baseline_path = Path(args.baseline)
+    regressions: List[str] = []
+    if args.save_baseline:
+        baseline_path.parent.mkdir(parents=True, exist_ok=True)
+        existing = json.loads(baseline_path.read_text()) if baseline_path.exists() else {}
+        existing.update({k: v for k, v in results.items() if "ns_per_item" in v})
+        baseline_path.write_text(json.dumps(existing, indent=2, sort_keys=True) + "\n")
+        print(f"💾 Baseline saved to {baseline_path}")
+    elif baseline_path.exists():
+        baseline = json.loads(baseline_path.read_text())
+        regressions = compare(results, baseline, args.threshold)
+        for name in regressions:
+            print(f"❌ Regression: {name} is {results[name]['change_vs_baseline']:+.1%} vs baseline")
+        for name in sorted(set(results) - set(baseline)):
+            if "ns_per_item" in results[name]:
+                print(f"ℹ️  {name} has no baseline yet")
+        if not regressions:
+            print(f"✅ No regressions beyond {args.threshold:.0%} vs {baseline_path}")
+    else:
+        print(f"❌ No baseline at {baseline_path}; run with --save-baseline to create one")
+        regressions = ["<missing baseline>"]
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+
+    raise SystemExit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,381 @@
+"""
+Offline bulk scoring for backfills and replays
+
+Scores CSV, NDJSON or Parquet exports with the same FeatureExtractor and
+detector logic used online, without going through Redis. Input is read in
+chunks and passed through a bounded reorder buffer so feature state sees
+each user's transactions in timestamp order. With --workers > 1 rows are
+sharded by user_id across worker processes, each with its own feature
+state; merchant and IP features then only see the rows of their shard.
+
+Usage (from python-backend):
+    python bulk_score.py export.csv scored.ndjson --workers 4
+"""
+import argparse
+import heapq
+import json
+import multiprocessing as mp
+import threading
+import time
+import zlib
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import pandas as pd
+
+from config import get_settings
+from feature_extractor import FeatureExtractor, FEATURE_NAMES
+from models import Transaction
+from pretrained_detector import PretrainedFraudDetector
+
+settings = get_settings()
+
+FORMATS = {
+    ".csv": "csv",
+    ".ndjson": "ndjson",
+    ".jsonl": "ndjson",
+    ".json": "ndjson",
+    ".parquet": "parquet",
+}
+
+OUTPUT_COLUMNS = (
+    "transaction_id", "user_id", "timestamp", "amount", "transaction_type", "merchant_id",
+    "fraud_probability", "risk_level", "is_fraud", "model_used"
+)
+FEATURE_COLUMNS = [f"feature_{name}" for name in FEATURE_NAMES]
+
+
+def detect_format(path: str, explicit: Optional[str] = None) -> str:
+    """Format from --format or the file extension"""
+    if explicit:
+        return explicit
+    for suffix, fmt in FORMATS.items():
+        if path.lower().endswith(suffix):
+            return fmt
+    raise SystemExit(f"❌ Cannot tell the format of {path}; pass --format")
+
+
+def _require_pyarrow():
+    """Import pyarrow for Parquet input and output"""
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError:
+        raise SystemExit("❌ Parquet support requires pyarrow (pip install pyarrow)")
+    return pyarrow
+
+
+def read_chunks(path: str, fmt: str, chunk_size: int) -> Iterator[pd.DataFrame]:
+    """Stream the input as DataFrames of at most chunk_size rows"""
+    if fmt == "csv":
+        yield from pd.read_csv(path, chunksize=chunk_size)
+    elif fmt == "ndjson":
+        yield from pd.read_json(path, lines=True, chunksize=chunk_size, dtype=False, convert_dates=False)
+    else:
+        pa = _require_pyarrow()
+        for batch in pa.parquet.ParquetFile(path).iter_batches(batch_size=chunk_size):
+            yield batch.to_pandas()
+
+
+def to_records(df: pd.DataFrame) -> Tuple[List[dict], int]:
+    """Rows as dicts with naive UTC timestamps and None for missing values; returns (records, dropped)"""
+    if "timestamp" not in df.columns:
+        raise SystemExit("❌ Input has no timestamp column")
+    df = df.copy()
+    df["timestamp"] = pd.to_datetime(df["timestamp"], utc=True, errors="coerce").dt.tz_convert(None)
+    missing = df["timestamp"].isna()
+    df = df[~missing].astype(object).where(lambda d: pd.notna(d), None)
+
+    records = df.to_dict("records")
+    for record in records:
+        record["timestamp"] = record["timestamp"].to_pydatetime()
+        if isinstance(record.get("metadata"), str):
+            try:
+                record["metadata"] = json.loads(record["metadata"])
+            except ValueError:
+                record["metadata"] = None
+    return records, int(missing.sum())
+
+
+class ReorderBuffer:
+    """Bounded min-heap that releases records in timestamp order
+
+    Exports are usually sorted or nearly sorted; a window of N rows fixes
+    local disorder while streaming. Rows older than the last released one
+    are counted as late and still scored.
+    """
+
+    def __init__(self, window: int):
+        self.window = window
+        self._heap: List[Tuple[datetime, int, dict]] = []
+        self._seq = 0
+        self._last_released: Optional[datetime] = None
+        self.late = 0
+
+    def push(self, records: List[dict]) -> List[dict]:
+        """Add records; returns those released in timestamp order"""
+        for record in records:
+            if self._last_released is not None and record["timestamp"] < self._last_released:
+                self.late += 1
+            heapq.heappush(self._heap, (record["timestamp"], self._seq, record))
+            self._seq += 1
+        released = []
+        while len(self._heap) > self.window:
+            released.append(self._pop())
+        return released
+
+    def drain(self) -> List[dict]:
+        """Release everything left"""
+        return [self._pop() for _ in range(len(self._heap))]
+
+    def _pop(self) -> dict:
+        timestamp, _, record = heapq.heappop(self._heap)
+        self._last_released = max(timestamp, self._last_released or timestamp)
+        return record
+
+
+class ChunkScorer:
+    """Feature state and detector for one shard of users"""
+
+    def __init__(self, include_features: bool = False):
+        self.include_features = include_features
+        self.feature_extractor = FeatureExtractor(window_size=settings.feature_window)
+        self.detector = PretrainedFraudDetector()
+
+    def score(self, records: List[dict]) -> Tuple[List[dict], int]:
+        """Score records in order; returns (output rows, invalid row count)"""
+        transactions = []
+        for record in records:
+            try:
+                transactions.append(Transaction.model_validate(record))
+            except ValueError:
+                pass
+        errors = len(records) - len(transactions)
+        if not transactions:
+            return [], errors
+
+        _, features_matrix = self.feature_extractor.extract_features_batch(transactions)
+        predictions = self.detector.predict_batch(features_matrix)
+
+        rows = []
+        for transaction, features, (fraud_prob, _) in zip(transactions, features_matrix, predictions):
+            row = {
+                "transaction_id": transaction.transaction_id,
+                "user_id": transaction.user_id,
+                "timestamp": transaction.timestamp,
+                "amount": transaction.amount,
+                "transaction_type": transaction.transaction_type.value,
+                "merchant_id": transaction.merchant_id,
+                "fraud_probability": float(fraud_prob),
+                "risk_level": self.detector.get_risk_level(fraud_prob),
+                "is_fraud": bool(fraud_prob >= settings.fraud_threshold),
+                "model_used": settings.model_type,
+            }
+            if self.include_features:
+                row.update(zip(FEATURE_COLUMNS, features.tolist()))
+            rows.append(row)
+        return rows, errors
+
+
+class ChunkWriter:
+    """Write scored rows to CSV, NDJSON or Parquet one chunk at a time"""
+
+    def __init__(self, path: str, fmt: str, include_features: bool = False):
+        self.path = path
+        self.fmt = fmt
+        self.columns = list(OUTPUT_COLUMNS) + (FEATURE_COLUMNS if include_features else [])
+        self._parquet_writer = None
+        self._file = None
+        if fmt == "parquet":
+            pa = _require_pyarrow()
+            fields = {
+                "timestamp": pa.timestamp("us"),
+                "amount": pa.float64(),
+                "fraud_probability": pa.float64(),
+                "is_fraud": pa.bool_(),
+                **{name: pa.float64() for name in FEATURE_COLUMNS},
+            }
+            self._schema = pa.schema([(c, fields.get(c, pa.string())) for c in self.columns])
+            self._parquet_writer = pa.parquet.ParquetWriter(path, self._schema)
+        else:
+            self._file = open(path, "w", newline="")
+        self._wrote_header = False
+
+    def write(self, rows: List[dict]):
+        """Append one chunk of rows"""
+        if not rows:
+            return
+        if self.fmt == "parquet":
+            pa = _require_pyarrow()
+            self._parquet_writer.write_table(pa.Table.from_pylist(rows, schema=self._schema))
+        elif self.fmt == "csv":
+            pd.DataFrame(rows, columns=self.columns).to_csv(self._file, header=not self._wrote_header, index=False)
+            self._wrote_header = True
+        else:
+            self._file.write("".join(json.dumps(row, default=_json_default) + "\n" for row in rows))
+
+    def close(self):
+        """Flush and close the output"""
+        if self._parquet_writer is not None:
+            self._parquet_writer.close()
+        if self._file is not None:
+            self._file.close()
+
+
+def _json_default(value):
+    """Serialize datetimes as ISO strings"""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Cannot serialize {type(value).__name__}")
+
+
+class Progress:
+    """Rows read/scored counters with periodic throughput reports"""
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.started = time.perf_counter()
+        self._last_report = self.started
+        self.read = 0
+        self.scored = 0
+        self.errors = 0
+
+    def report(self, force: bool = False):
+        """Print progress if the interval elapsed (or force)"""
+        now = time.perf_counter()
+        if not force and now - self._last_report < self.interval:
+            return
+        self._last_report = now
+        elapsed = now - self.started
+        rate = self.scored / elapsed if elapsed > 0 else 0.0
+        print(f"⏳ {self.read:,} read, {self.scored:,} scored, {self.errors:,} invalid "
+              f"({rate:,.0f} rows/s, {elapsed:.1f}s)", flush=True)
+
+
+def _shard_worker(in_queue, out_queue, include_features: bool):
+    """Worker process: score record batches for one shard until a None sentinel"""
+    scorer = ChunkScorer(include_features)
+    while True:
+        records = in_queue.get()
+        if records is None:
+            break
+        out_queue.put(scorer.score(records))
+    out_queue.put(None)
+
+
+def shard_of(user_id, workers: int) -> int:
+    """Stable shard for a user"""
+    return zlib.crc32(str(user_id).encode()) % workers
+
+
+def run(args) -> Dict[str, float]:
+    """Score the input file and write the output; returns a summary"""
+    input_format = detect_format(args.input, args.format)
+    output_format = detect_format(args.output, args.output_format)
+    progress = Progress(args.progress_interval)
+    reorder = ReorderBuffer(args.reorder_window)
+    writer = ChunkWriter(args.output, output_format, args.include_features)
+
+    def batches() -> Iterator[List[dict]]:
+        for df in read_chunks(args.input, input_format, args.chunk_size):
+            records, dropped = to_records(df)
+            progress.read += len(df)
+            progress.errors += dropped
+            released = reorder.push(records)
+            if released:
+                yield released
+        remaining = reorder.drain()
+        if remaining:
+            yield remaining
+
+    try:
+        if args.workers <= 1:
+            scorer = ChunkScorer(args.include_features)
+            for records in batches():
+                rows, errors = scorer.score(records)
+                writer.write(rows)
+                progress.scored += len(rows)
+                progress.errors += errors
+                progress.report()
+        else:
+            in_queues = [mp.Queue(maxsize=4) for _ in range(args.workers)]
+            out_queue = mp.Queue(maxsize=args.workers * 4)
+            workers = [
+                mp.Process(target=_shard_worker, args=(q, out_queue, args.include_features), daemon=True)
+                for q in in_queues
+            ]
+            for worker in workers:
+                worker.start()
+
+            def drain_results():
+                finished = 0
+                while finished < len(workers):
+                    item = out_queue.get()
+                    if item is None:
+                        finished += 1
+                        continue
+                    rows, errors = item
+                    writer.write(rows)
+                    progress.scored += len(rows)
+                    progress.errors += errors
+
+            drainer = threading.Thread(target=drain_results, daemon=True)
+            drainer.start()
+
+            for records in batches():
+                shards: List[List[dict]] = [[] for _ in workers]
+                for record in records:
+                    shards[shard_of(record.get("user_id"), len(workers))].append(record)
+                for queue, shard in zip(in_queues, shards):
+                    if shard:
+                        queue.put(shard)
+                progress.report()
+
+            for queue in in_queues:
+                queue.put(None)
+            while drainer.is_alive():
+                drainer.join(timeout=args.progress_interval)
+                progress.report()
+            for worker in workers:
+                worker.join()
+    finally:
+        writer.close()
+
+    elapsed = time.perf_counter() - progress.started
+    summary = {
+        "rows_read": progress.read,
+        "rows_scored": progress.scored,
+        "rows_invalid": progress.errors,
+        "rows_late": reorder.late,
+        "elapsed_seconds": round(elapsed, 3),
+        "rows_per_second": round(progress.scored / elapsed, 1) if elapsed > 0 else 0.0,
+    }
+    if reorder.late:
+        print(f"⚠️  {reorder.late:,} rows arrived after newer ones; raise --reorder-window")
+    print(f"✅ Scored {progress.scored:,} rows in {elapsed:.1f}s ({summary['rows_per_second']:,.0f} rows/s) -> {args.output}")
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Score historical transactions offline")
+    parser.add_argument("input", help="CSV, NDJSON or Parquet export")
+    parser.add_argument("output", help="Scored output (.csv, .ndjson or .parquet)")
+    parser.add_argument("--format", choices=sorted(set(FORMATS.values())), help="Input format (default: by extension)")
+    parser.add_argument("--output-format", choices=sorted(set(FORMATS.values())), help="Output format (default: by extension)")
+    parser.add_argument("--chunk-size", type=int, default=10000, help="Rows read per chunk")
+    parser.add_argument("--reorder-window", type=int, default=10000,
+                        help="Rows buffered to restore timestamp order")
+    parser.add_argument("--workers", type=int, default=1, help="Worker processes (rows sharded by user_id)")
+    parser.add_argument("--include-features", action="store_true", help="Write the feature columns too")
+    parser.add_argument("--progress-interval", type=float, default=5.0, help="Seconds between progress reports")
+    parser.add_argument("--summary-json", help="Write the run summary to this file")
+    args = parser.parse_args()
+
+    summary = run(args)
+    if args.summary_json:
+        with open(args.summary_json, "w") as f:
+            json.dump(summary, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+Circuit breaker for calls to a flaky dependency
+
+Closed: calls go through and consecutive failures are counted. After
+`failure_threshold` of them the circuit opens and callers fall back
+immediately instead of waiting on a dead service. After `reset_timeout`
+seconds one trial call is let through (half-open): success closes the
+circuit, failure opens it for another `reset_timeout`.
+"""
+import time
+
+import logs
+
+logger = logs.get_logger("breaker")
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+STATES = (CLOSED, HALF_OPEN, OPEN)
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker with a single half-open probe"""
+
+    def __init__(self, name: str, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = CLOSED
+        self.failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+
+    def allow(self) -> bool:
+        """Whether a call may go out now; in half-open only the one probe may"""
+        if self.state == CLOSED:
+            return True
+        if self.state == OPEN:
+            if time.monotonic() - self._opened_at < self.reset_timeout:
+                return False
+            self.state = HALF_OPEN
+            logger.info("🔌 %s circuit half-open, sending a trial request", self.name)
+        if self._probe_in_flight:
+            return False
+        self._probe_in_flight = True
+        return True
+
+    def release(self):
+        """The allowed call never reached the service (e.g. no free slot)"""
+        self._probe_in_flight = False
+
+    def record_success(self):
+        if self.state != CLOSED:
+            logger.info("✅ %s circuit closed", self.name)
+        self.state = CLOSED
+        self.failures = 0
+        self._probe_in_flight = False
+
+    def record_failure(self):
+        self._probe_in_flight = False
+        self.failures += 1
+        if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+            if self.state != OPEN:
+                logger.warning("⚠️  %s circuit open after %d failures; using fallback for %.0fs",
+                               self.name, self.failures, self.reset_timeout)
+            self.state = OPEN
+            self._opened_at = time.monotonic()
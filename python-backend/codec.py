@@ -0,0 +1,77 @@
+"""
+JSON codec for the ingest and publish path
+
+The stdlib path parses each message into a dict with json.loads, validates
+it with Transaction(**data), and encodes results with json.dumps. The fast
+path validates raw bytes straight into the Transaction model (pydantic-core
+parses the JSON itself, no intermediate dict) and encodes results with
+orjson, which serializes NumPy scalars and arrays natively. Select it with
+Settings.json_codec; each function also takes an explicit `fast` override.
+"""
+import json
+from typing import Any, List, Optional, Union
+
+from config import get_settings
+from feature_extractor import FEATURE_SCHEMA_VERSION
+from models import Transaction
+import logs
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+settings = get_settings()
+
+_ORJSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY if orjson is not None else 0
+
+
+def use_fast_codec(fast: Optional[bool] = None) -> bool:
+    """True if the fast codec is selected (or requested with `fast`) and available"""
+    if fast is None:
+        fast = settings.json_codec == "orjson"
+    return fast and orjson is not None
+
+
+def decode_transaction(raw: Union[str, bytes], fast: Optional[bool] = None) -> Transaction:
+    """Decode and validate one incoming transaction message"""
+    if use_fast_codec(fast):
+        return Transaction.model_validate_json(raw)
+    return Transaction(**json.loads(raw))
+
+
+def build_result(transaction: Transaction, fraud_prob, risk_level, is_fraud, feature_vector: List[float],
+                 model_used) -> dict:
+    """Published result for a scored transaction, in native Python types so either codec encodes it"""
+    return {
+        "transaction_id": transaction.transaction_id,
+        "user_id": transaction.user_id,
+        "amount": float(transaction.amount),
+        "transaction_type": transaction.transaction_type,
+        "merchant_id": transaction.merchant_id,
+        "timestamp": transaction.timestamp.isoformat(),
+        "fraud_probability": float(fraud_prob),
+        "risk_level": str(risk_level),
+        "is_fraud": bool(is_fraud),
+        "feature_vector": feature_vector,
+        "feature_schema_version": FEATURE_SCHEMA_VERSION,
+        "model_used": str(model_used)
+    }
+
+
+def encode_result(result: dict, fast: Optional[bool] = None) -> Union[str, bytes]:
+    """Encode a fraud result for publishing"""
+    if use_fast_codec(fast):
+        return orjson.dumps(result, option=_ORJSON_OPTIONS)
+    return json.dumps(result)
+
+
+def loads(raw: Union[str, bytes], fast: Optional[bool] = None) -> Any:
+    """Parse a JSON document"""
+    if use_fast_codec(fast):
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
+if settings.json_codec == "orjson" and orjson is None:
+    logs.get_logger("codec").warning("⚠️  orjson not installed, using the stdlib JSON codec")
@@ -2,25 +2,143 @@
 CRUD operations for PostgreSQL database
 """
 from sqlalchemy.orm import Session
-from sqlalchemy import desc, func
-from typing import List, Optional
-from datetime import datetime, timedelta
-from database import TransactionDB
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import BigInteger, Text, cast, desc, func, select, delete, tuple_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from datetime import datetime, timedelta, timezone
+import base64
+import math
+from database import (
+    TransactionDB, TransactionStatsDB, FeatureSchemaDB, RollupMinuteDB, RollupHourDB,
+    STATS_ROW_ID, RISK_HISTOGRAM_BUCKETS
+)
+from feature_extractor import FEATURE_NAMES, FEATURE_SCHEMA_VERSION
+import partitions
+from config import get_settings
 from models import Transaction, FraudScore
 
+settings = get_settings()
 
-def create_transaction(db: Session, transaction: Transaction, fraud_result: FraudScore, 
+
+def naive_utc(timestamp) -> datetime:
+    """Normalize a timestamp to naive UTC to match the TIMESTAMP columns"""
+    if isinstance(timestamp, str):
+        timestamp = datetime.fromisoformat(timestamp.replace('Z', '+00:00'))
+    if timestamp.tzinfo is not None:
+        timestamp = timestamp.astimezone(timezone.utc).replace(tzinfo=None)
+    return timestamp
+
+
+def encode_cursor(timestamp: datetime, transaction_id: str) -> str:
+    """Encode a (timestamp, transaction_id) keyset position as an opaque cursor"""
+    raw = f"{naive_utc(timestamp).isoformat()}|{transaction_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, str]:
+    """Decode a cursor produced by encode_cursor (raises ValueError if malformed)"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        timestamp, transaction_id = raw.split("|", 1)
+        return naive_utc(datetime.fromisoformat(timestamp)), transaction_id
+    except Exception as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+
+def encode_since_cursor(write_xid: int, transaction_id: str) -> str:
+    """Encode a (write_xid, transaction_id) write position as an opaque `since` cursor"""
+    raw = f"x{write_xid}|{transaction_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_since_cursor(cursor: str) -> Tuple[int, str]:
+    """Decode a cursor produced by encode_since_cursor (raises ValueError if malformed)"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        write_xid, transaction_id = raw.split("|", 1)
+        if not write_xid.startswith("x"):
+            raise ValueError("not a since cursor")
+        return int(write_xid[1:]), transaction_id
+    except Exception as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+
+def _keyset_page_query(limit: int, before: Optional[Tuple[datetime, str]] = None):
+    """Newest-first page of transactions strictly older than the cursor"""
+    query = select(TransactionDB)
+    if before is not None:
+        # The plain timestamp bound lets the planner prune newer partitions
+        query = query.where(
+            tuple_(TransactionDB.timestamp, TransactionDB.transaction_id) < tuple_(*before),
+            TransactionDB.timestamp <= before[0]
+        )
+    return query.order_by(desc(TransactionDB.timestamp), desc(TransactionDB.transaction_id)).limit(limit)
+
+
+def _write_horizon():
+    """Oldest database transaction still in progress; every write below it has finished"""
+    return cast(cast(func.pg_snapshot_xmin(func.pg_current_snapshot()), Text), BigInteger)
+
+
+def _since_query(since: Tuple[int, str], limit: int):
+    """Rows written after the cursor, in write order, so polls never skip rows
+
+    Event timestamps say nothing about when a row was committed, and write
+    IDs are handed out before commit, so a row can become visible after a
+    poll has already read past its ID. Only rows below the horizon (no
+    writer below it is still open) are returned; later ones come with the
+    next poll. A long-open transaction holds the horizon back, which
+    delays polls but never drops rows.
+    """
+    return select(TransactionDB).where(
+        tuple_(TransactionDB.write_xid, TransactionDB.transaction_id) > tuple_(*since),
+        TransactionDB.write_xid < _write_horizon()
+    ).order_by(TransactionDB.write_xid, TransactionDB.transaction_id).limit(limit)
+
+
+# Feature names by schema version; versions are immutable so this never goes stale
+_feature_names_cache: Dict[int, List[str]] = {FEATURE_SCHEMA_VERSION: list(FEATURE_NAMES)}
+
+
+def project_features(feature_vector: Optional[Sequence[float]], feature_names: Sequence[str]) -> Dict[str, float]:
+    """Map a stored feature vector back to named features"""
+    if not feature_vector:
+        return {}
+    return dict(zip(feature_names, feature_vector))
+
+
+def get_feature_names(db: Session, version: int) -> List[str]:
+    """Get the feature names for a schema version"""
+    if version not in _feature_names_cache:
+        schema = db.get(FeatureSchemaDB, version)
+        _feature_names_cache[version] = list(schema.feature_names) if schema else []
+    return _feature_names_cache[version]
+
+
+async def get_feature_names_async(db: AsyncSession, version: int) -> List[str]:
+    """Get the feature names for a schema version"""
+    if version not in _feature_names_cache:
+        schema = await db.get(FeatureSchemaDB, version)
+        _feature_names_cache[version] = list(schema.feature_names) if schema else []
+    return _feature_names_cache[version]
+
+
+def build_transaction(transaction: Transaction, fraud_result: FraudScore,
                       ai_explanation: Optional[str] = None,
                       risk_factors: Optional[List] = None,
-                      recommendations: Optional[List] = None) -> TransactionDB:
-    """Create a new transaction record with fraud detection results"""
-    db_transaction = TransactionDB(
+                      recommendations: Optional[List] = None,
+                      feature_vector: Optional[Sequence[float]] = None) -> TransactionDB:
+    """Build a transaction row from a scored transaction"""
+    if feature_vector is None:
+        feature_vector = [fraud_result.features.get(name, 0.0) for name in FEATURE_NAMES]
+    return TransactionDB(
         transaction_id=transaction.transaction_id,
         user_id=transaction.user_id,
         amount=transaction.amount,
         transaction_type=transaction.transaction_type,
         merchant_id=transaction.merchant_id,
-        timestamp=datetime.fromisoformat(transaction.timestamp.replace('Z', '+00:00')) if isinstance(transaction.timestamp, str) else transaction.timestamp,
+        timestamp=naive_utc(transaction.timestamp),
         
         # Fraud detection results
         fraud_probability=fraud_result.fraud_probability,
@@ -33,11 +151,233 @@ def create_transaction(db: Session, transaction: Transaction, fraud_result: Frau
         risk_factors=risk_factors,
         recommendations=recommendations,
         
-        # Features
-        features=fraud_result.features
+        # Features (fixed-order vector, names in feature_schemas)
+        feature_vector=list(feature_vector),
+        feature_schema_version=FEATURE_SCHEMA_VERSION
+    )
+
+
+def _stats_aggregate(*criteria):
+    """Single-pass aggregate for total, fraud count and risk score sum"""
+    return select(
+        func.count(TransactionDB.transaction_id),
+        func.count(TransactionDB.transaction_id).filter(TransactionDB.is_fraud == True),
+        func.coalesce(func.sum(TransactionDB.fraud_probability), 0.0)
+    ).where(*criteria)
+
+
+def _stats_delta(total: int, fraud_count: int, risk_sum: float):
+    """Upsert that adds a delta to the counters row"""
+    stmt = pg_insert(TransactionStatsDB).values(
+        id=STATS_ROW_ID,
+        total_transactions=total,
+        fraud_detected=fraud_count,
+        risk_score_sum=risk_sum,
+        updated_at=datetime.utcnow()
+    )
+    return stmt.on_conflict_do_update(
+        index_elements=[TransactionStatsDB.id],
+        set_={
+            "total_transactions": TransactionStatsDB.total_transactions + stmt.excluded.total_transactions,
+            "fraud_detected": TransactionStatsDB.fraud_detected + stmt.excluded.fraud_detected,
+            "risk_score_sum": TransactionStatsDB.risk_score_sum + stmt.excluded.risk_score_sum,
+            "updated_at": stmt.excluded.updated_at
+        }
+    )
+
+
+def _stats_delta_for(db_transactions: Sequence[TransactionDB]):
+    """One counters delta covering a batch of new rows"""
+    return _stats_delta(
+        len(db_transactions),
+        sum(1 for row in db_transactions if row.is_fraud),
+        sum(float(row.fraud_probability) for row in db_transactions)
+    )
+
+
+# Rollup tables by granularity name, with their bucket width in seconds
+ROLLUP_GRANULARITIES = {
+    "minute": (RollupMinuteDB, 60),
+    "hour": (RollupHourDB, 3600),
+}
+
+_HISTOGRAM_COLUMNS = [f"risk_hist_{i}" for i in range(RISK_HISTOGRAM_BUCKETS)]
+
+
+def _histogram_column(risk_score: float) -> str:
+    """Histogram column for a fraud probability"""
+    index = min(max(int(risk_score * RISK_HISTOGRAM_BUCKETS), 0), RISK_HISTOGRAM_BUCKETS - 1)
+    return _HISTOGRAM_COLUMNS[index]
+
+
+_ROLLUP_SUMS = ("txn_count", "fraud_count", "risk_score_sum", "amount_sum", *_HISTOGRAM_COLUMNS)
+
+
+def _rollup_delta(model, bucket_start: datetime, risk_level: str, transaction_type: str, sums: Dict[str, float]):
+    """Upsert that adds summed counts to a rollup bucket"""
+    stmt = pg_insert(model).values(
+        bucket_start=bucket_start,
+        risk_level=risk_level,
+        transaction_type=transaction_type,
+        **sums
+    )
+    return stmt.on_conflict_do_update(
+        index_elements=[model.bucket_start, model.risk_level, model.transaction_type],
+        set_={name: getattr(model, name) + getattr(stmt.excluded, name) for name in _ROLLUP_SUMS}
+    )
+
+
+def _rollup_deltas_for(db_transactions: Sequence[TransactionDB]) -> list:
+    """Per-minute and per-hour rollup upserts for a batch of new rows
+
+    One upsert per bucket touched, in key order, so concurrent writers lock
+    the rollup rows in the same order and cannot deadlock each other.
+    """
+    sums: Dict[tuple, Dict[str, float]] = {}
+    for row in db_transactions:
+        risk_score = float(row.fraud_probability)
+        transaction_type = getattr(row.transaction_type, "value", row.transaction_type)
+        minute = row.timestamp.replace(second=0, microsecond=0)
+        for granularity, bucket_start in (("hour", minute.replace(minute=0)), ("minute", minute)):
+            bucket = sums.setdefault(
+                (granularity, bucket_start, row.risk_level, transaction_type), dict.fromkeys(_ROLLUP_SUMS, 0)
+            )
+            bucket["txn_count"] += 1
+            bucket["fraud_count"] += 1 if row.is_fraud else 0
+            bucket["risk_score_sum"] += risk_score
+            bucket["amount_sum"] += float(row.amount)
+            bucket[_histogram_column(risk_score)] += 1
+    return [
+        _rollup_delta(ROLLUP_GRANULARITIES[granularity][0], bucket_start, risk_level, transaction_type, bucket)
+        for (granularity, bucket_start, risk_level, transaction_type), bucket in sorted(sums.items())
+    ]
+
+
+def _timeseries_query(model, bucket_seconds: int, start: datetime, end: datetime, step_seconds: int,
+                      risk_level: Optional[str] = None, transaction_type: Optional[str] = None,
+                      group_by: Optional[str] = None):
+    """Aggregate rollup rows into buckets of `step_seconds`"""
+    epoch = func.extract("epoch", model.bucket_start)
+    if step_seconds > bucket_seconds:
+        epoch = func.floor(epoch / step_seconds) * step_seconds
+    bucket = epoch.label("bucket")
+
+    columns = [
+        bucket,
+        func.sum(model.txn_count).label("count"),
+        func.sum(model.fraud_count).label("fraud_count"),
+        func.sum(model.risk_score_sum).label("risk_score_sum"),
+        func.sum(model.amount_sum).label("amount_sum"),
+        *[func.sum(getattr(model, name)).label(name) for name in _HISTOGRAM_COLUMNS]
+    ]
+    group_columns = [bucket]
+    if group_by:
+        group_column = getattr(model, group_by).label("group")
+        columns.append(group_column)
+        group_columns.append(group_column)
+
+    query = select(*columns).where(model.bucket_start >= start, model.bucket_start < end)
+    if risk_level:
+        query = query.where(model.risk_level == risk_level)
+    if transaction_type:
+        query = query.where(model.transaction_type == transaction_type)
+    return query.group_by(*group_columns).order_by(bucket)
+
+
+def _timeseries_point(row) -> Dict[str, Any]:
+    """Convert an aggregated rollup row to the /timeseries response shape"""
+    count = int(row.count or 0)
+    fraud_count = int(row.fraud_count or 0)
+    point = {
+        "bucket_start": datetime.utcfromtimestamp(float(row.bucket)).isoformat(),
+        "count": count,
+        "fraud_count": fraud_count,
+        "fraud_rate": (fraud_count / count * 100) if count else 0.0,
+        "avg_risk_score": float(row.risk_score_sum) / count if count else 0.0,
+        "total_amount": float(row.amount_sum or 0.0),
+        "risk_histogram": [int(getattr(row, name) or 0) for name in _HISTOGRAM_COLUMNS],
+    }
+    if "group" in row._fields:
+        point["group"] = row.group
+    return point
+
+
+def resolve_timeseries_step(start: datetime, end: datetime, granularity: str, max_points: int) -> Tuple[str, int]:
+    """Pick the rollup granularity and output step (seconds) for a range
+
+    `granularity="auto"` uses per-minute rollups for ranges up to six hours
+    and per-hour rollups beyond that.
+    """
+    span = max((end - start).total_seconds(), 1)
+    if granularity == "auto":
+        granularity = "minute" if span <= 6 * 3600 else "hour"
+    if granularity not in ROLLUP_GRANULARITIES:
+        raise ValueError(f"Unknown granularity: {granularity}")
+    bucket_seconds = ROLLUP_GRANULARITIES[granularity][1]
+    step = max(bucket_seconds, math.ceil(span / max_points / bucket_seconds) * bucket_seconds)
+    return granularity, step
+
+
+def get_timeseries(db: Session, start: datetime, end: datetime, granularity: str, step_seconds: int,
+                   risk_level: Optional[str] = None, transaction_type: Optional[str] = None,
+                   group_by: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Get a downsampled time series from the rollup tables"""
+    model, bucket_seconds = ROLLUP_GRANULARITIES[granularity]
+    query = _timeseries_query(model, bucket_seconds, naive_utc(start), naive_utc(end), step_seconds,
+                              risk_level, transaction_type, group_by)
+    return [_timeseries_point(row) for row in db.execute(query)]
+
+
+def delete_old_rollups(db: Session) -> int:
+    """Delete rollup buckets past their retention"""
+    now = datetime.utcnow()
+    deleted = 0
+    for model, days in ((RollupMinuteDB, settings.rollup_minute_retention_days),
+                        (RollupHourDB, settings.rollup_hour_retention_days)):
+        result = db.execute(delete(model).where(model.bucket_start < now - timedelta(days=days)))
+        deleted += result.rowcount
+    db.commit()
+    return deleted
+
+
+def _stats_from_row(total, fraud_count, risk_sum) -> dict:
+    """Convert counter values to the stats response shape"""
+    total = total or 0
+    fraud_count = fraud_count or 0
+    return {
+        "total_transactions": total,
+        "fraud_detected": fraud_count,
+        "fraud_rate": (fraud_count / total * 100) if total > 0 else 0.0,
+        "avg_risk_score": float(risk_sum) / total if total > 0 and risk_sum else 0.0
+    }
+
+
+def _stats_from_counters(counters: Optional[TransactionStatsDB]) -> Optional[dict]:
+    """Convert the counters row to the stats response shape"""
+    if counters is None:
+        return None
+    return _stats_from_row(counters.total_transactions, counters.fraud_detected, counters.risk_score_sum)
+
+
+def create_transaction(db: Session, transaction: Transaction, fraud_result: FraudScore, 
+                      ai_explanation: Optional[str] = None,
+                      risk_factors: Optional[List] = None,
+                      recommendations: Optional[List] = None,
+                      feature_vector: Optional[Sequence[float]] = None) -> TransactionDB:
+    """Create a new transaction record with fraud detection results"""
+    db_transaction = build_transaction(
+        transaction, fraud_result,
+        ai_explanation=ai_explanation,
+        risk_factors=risk_factors,
+        recommendations=recommendations,
+        feature_vector=feature_vector
     )
     
+    # Row insert, counters and rollups commit (or roll back) together
     db.add(db_transaction)
+    db.execute(_stats_delta_for([db_transaction]))
+    for stmt in _rollup_deltas_for([db_transaction]):
+        db.execute(stmt)
     db.commit()
     db.refresh(db_transaction)
     return db_transaction
@@ -79,27 +419,226 @@ def get_transactions_by_date_range(db: Session, start_date: datetime, end_date:
 
 
 def get_stats(db: Session) -> dict:
-    """Get fraud detection statistics"""
-    total = db.query(func.count(TransactionDB.transaction_id)).scalar()
-    fraud_count = db.query(func.count(TransactionDB.transaction_id)).filter(TransactionDB.is_fraud == True).scalar()
-    avg_risk = db.query(func.avg(TransactionDB.fraud_probability)).scalar()
-    
-    return {
-        "total_transactions": total or 0,
-        "fraud_detected": fraud_count or 0,
-        "fraud_rate": (fraud_count / total * 100) if total > 0 else 0.0,
-        "avg_risk_score": float(avg_risk) if avg_risk else 0.0
-    }
+    """Get fraud detection statistics from the maintained counters row"""
+    stats = _stats_from_counters(db.get(TransactionStatsDB, STATS_ROW_ID))
+    if stats is None:
+        # Counters not seeded yet - fall back to a full aggregate
+        stats = _stats_from_row(*db.execute(_stats_aggregate()).one())
+    return stats
 
 
 def delete_old_transactions(db: Session, days: int = 30) -> int:
-    """Delete transactions older than specified days"""
+    """Delete transactions whose event timestamp is older than specified days
+
+    On a partitioned table, partitions entirely older than the cutoff are
+    detached and dropped, and only stray rows in the DEFAULT partition are
+    deleted row by row. Each step adjusts the stats counters in the same
+    database transaction.
+    """
     cutoff_date = datetime.utcnow() - timedelta(days=days)
-    deleted = db.query(TransactionDB).filter(TransactionDB.created_at < cutoff_date).delete()
+
+    if not partitions.is_partitioned(db):
+        criteria = (TransactionDB.timestamp < cutoff_date,)
+        total, fraud_count, risk_sum = db.execute(_stats_aggregate(*criteria)).one()
+        deleted = db.query(TransactionDB).filter(*criteria).delete()
+        if deleted:
+            db.execute(_stats_delta(-total, -fraud_count, -risk_sum))
+        db.commit()
+        return deleted
+
+    deleted = 0
+    for name, start, end in partitions.list_partitions(db):
+        if end is None or end > cutoff_date:
+            continue
+        # Pruned to this single partition by the timestamp bounds
+        total, fraud_count, risk_sum = db.execute(_stats_aggregate(
+            TransactionDB.timestamp >= start, TransactionDB.timestamp < end
+        )).one()
+        partitions.drop_partition(db, name)
+        if total:
+            db.execute(_stats_delta(-total, -fraud_count, -risk_sum))
+        db.commit()
+        deleted += total
+
+    total, fraud_count, risk_sum = partitions.purge_default_partition(db, cutoff_date)
+    if total:
+        db.execute(_stats_delta(-total, -fraud_count, -risk_sum))
     db.commit()
-    return deleted
+    return deleted + total
 
 
 def get_transaction_count(db: Session) -> int:
-    """Get total count of transactions"""
+    """Get total count of transactions (from the counters row when available)"""
+    counters = db.get(TransactionStatsDB, STATS_ROW_ID)
+    if counters is not None:
+        return counters.total_transactions
     return db.query(func.count(TransactionDB.transaction_id)).scalar()
+
+
+def get_recent_page(db: Session, limit: int = 100,
+                    before: Optional[Tuple[datetime, str]] = None) -> List[TransactionDB]:
+    """Get a newest-first keyset page of transactions older than `before`"""
+    return list(db.execute(_keyset_page_query(limit, before)).scalars())
+
+
+def get_transactions_since(db: Session, since: Tuple[int, str], limit: int = 100) -> List[TransactionDB]:
+    """Get transactions written after the `since` position, in write order"""
+    return list(db.execute(_since_query(since, limit)).scalars())
+
+
+def get_write_horizon(db: Session) -> int:
+    """Write position below which every transaction row is already visible"""
+    return db.execute(select(_write_horizon())).scalar()
+
+
+# ---------------------------------------------------------------------------
+# Async variants (AsyncSession / asyncpg) used by the API and ingestion loop
+# ---------------------------------------------------------------------------
+
+async def create_transactions_async(db: AsyncSession, db_transactions: Sequence[TransactionDB]) -> List[TransactionDB]:
+    """Insert a batch of rows (see build_transaction) with their counters and rollups
+
+    The counters row and each rollup bucket get one upsert per batch rather
+    than one per row, which keeps concurrent writers from queueing on their
+    row locks.
+    """
+    db.add_all(db_transactions)
+    await db.execute(_stats_delta_for(db_transactions))
+    for stmt in _rollup_deltas_for(db_transactions):
+        await db.execute(stmt)
+    await db.commit()
+    return list(db_transactions)
+
+
+async def create_transaction_async(db: AsyncSession, transaction: Transaction, fraud_result: FraudScore,
+                                   ai_explanation: Optional[str] = None,
+                                   risk_factors: Optional[List] = None,
+                                   recommendations: Optional[List] = None,
+                                   feature_vector: Optional[Sequence[float]] = None) -> TransactionDB:
+    """Create a new transaction record with fraud detection results"""
+    db_transaction = build_transaction(
+        transaction, fraud_result,
+        ai_explanation=ai_explanation,
+        risk_factors=risk_factors,
+        recommendations=recommendations,
+        feature_vector=feature_vector
+    )
+    await create_transactions_async(db, [db_transaction])
+    return db_transaction
+
+
+async def get_transaction_async(db: AsyncSession, transaction_id: str, around: Optional[datetime] = None,
+                                window: timedelta = timedelta(0)) -> Optional[TransactionDB]:
+    """Get a single transaction by ID
+
+    With `around`, only rows timestamped within `window` of it are searched,
+    so PostgreSQL scans the matching partitions instead of all of them.
+    """
+    query = select(TransactionDB).where(TransactionDB.transaction_id == transaction_id)
+    if around is not None:
+        around = naive_utc(around)
+        query = query.where(TransactionDB.timestamp.between(around - window, around + window))
+    result = await db.execute(query.limit(1))
+    return result.scalar_one_or_none()
+
+
+async def get_recent_transactions_async(db: AsyncSession, limit: int = 100, skip: int = 0) -> List[TransactionDB]:
+    """Get recent transactions ordered by timestamp"""
+    result = await db.execute(
+        select(TransactionDB).order_by(desc(TransactionDB.timestamp)).offset(skip).limit(limit)
+    )
+    return list(result.scalars())
+
+
+async def get_fraud_transactions_async(db: AsyncSession, limit: int = 100) -> List[TransactionDB]:
+    """Get transactions flagged as fraud"""
+    result = await db.execute(
+        select(TransactionDB).where(TransactionDB.is_fraud == True)
+        .order_by(desc(TransactionDB.timestamp)).limit(limit)
+    )
+    return list(result.scalars())
+
+
+async def get_high_risk_transactions_async(db: AsyncSession, limit: int = 100) -> List[TransactionDB]:
+    """Get high/critical risk transactions"""
+    result = await db.execute(
+        select(TransactionDB).where(TransactionDB.risk_level.in_(['high', 'critical']))
+        .order_by(desc(TransactionDB.timestamp)).limit(limit)
+    )
+    return list(result.scalars())
+
+
+async def get_transactions_by_user_async(db: AsyncSession, user_id: str, limit: int = 50) -> List[TransactionDB]:
+    """Get transactions for a specific user"""
+    result = await db.execute(
+        select(TransactionDB).where(TransactionDB.user_id == user_id)
+        .order_by(desc(TransactionDB.timestamp)).limit(limit)
+    )
+    return list(result.scalars())
+
+
+async def get_transactions_by_date_range_async(db: AsyncSession, start_date: datetime, end_date: datetime) -> List[TransactionDB]:
+    """Get transactions within a date range"""
+    result = await db.execute(
+        select(TransactionDB).where(
+            TransactionDB.timestamp >= start_date,
+            TransactionDB.timestamp <= end_date
+        ).order_by(desc(TransactionDB.timestamp))
+    )
+    return list(result.scalars())
+
+
+async def get_stats_async(db: AsyncSession) -> dict:
+    """Get fraud detection statistics from the maintained counters row"""
+    stats = _stats_from_counters(await db.get(TransactionStatsDB, STATS_ROW_ID))
+    if stats is None:
+        # Counters not seeded yet - fall back to a full aggregate
+        result = await db.execute(_stats_aggregate())
+        stats = _stats_from_row(*result.one())
+    return stats
+
+
+async def delete_old_transactions_async(db: AsyncSession, days: int = 30) -> int:
+    """Delete transactions older than specified days (partition drops, see delete_old_transactions)"""
+    return await db.run_sync(delete_old_transactions, days)
+
+
+async def get_transaction_count_async(db: AsyncSession) -> int:
+    """Get total count of transactions (from the counters row when available)"""
+    counters = await db.get(TransactionStatsDB, STATS_ROW_ID)
+    if counters is not None:
+        return counters.total_transactions
+    result = await db.execute(select(func.count(TransactionDB.transaction_id)))
+    return result.scalar()
+
+
+async def get_recent_page_async(db: AsyncSession, limit: int = 100,
+                                before: Optional[Tuple[datetime, str]] = None) -> List[TransactionDB]:
+    """Get a newest-first keyset page of transactions older than `before`"""
+    result = await db.execute(_keyset_page_query(limit, before))
+    return list(result.scalars())
+
+
+async def get_transactions_since_async(db: AsyncSession, since: Tuple[int, str],
+                                       limit: int = 100) -> List[TransactionDB]:
+    """Get transactions written after the `since` position, in write order"""
+    result = await db.execute(_since_query(since, limit))
+    return list(result.scalars())
+
+
+async def get_write_horizon_async(db: AsyncSession) -> int:
+    """Write position below which every transaction row is already visible"""
+    result = await db.execute(select(_write_horizon()))
+    return result.scalar()
+
+
+async def get_timeseries_async(db: AsyncSession, start: datetime, end: datetime, granularity: str,
+                               step_seconds: int, risk_level: Optional[str] = None,
+                               transaction_type: Optional[str] = None,
+                               group_by: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Get a downsampled time series from the rollup tables"""
+    model, bucket_seconds = ROLLUP_GRANULARITIES[granularity]
+    query = _timeseries_query(model, bucket_seconds, naive_utc(start), naive_utc(end), step_seconds,
+                              risk_level, transaction_type, group_by)
+    result = await db.execute(query)
+    return [_timeseries_point(row) for row in result]
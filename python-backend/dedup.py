@@ -0,0 +1,114 @@
+"""
+Transaction-ID deduplication for idempotent ingestion
+
+Redelivered messages must be dropped before feature extraction, or they
+are counted twice in the per-user velocity windows. Recent IDs are kept
+exactly in a bounded, time-windowed set; IDs that age out of the set go
+into a Bloom filter that covers the longer tail in constant memory.
+
+check() reserves an ID as soon as it is seen, so a redelivery arriving
+while the first copy is still being scored is dropped too. If scoring or
+persisting fails, the caller discards the ID so the redelivery is scored.
+"""
+import hashlib
+import math
+import time
+from collections import OrderedDict
+
+NEW = "new"
+DUPLICATE = "duplicate"
+# Seen by the Bloom filter only: a duplicate, or a false positive at `error_rate`
+PROBABLE_DUPLICATE = "probable_duplicate"
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter over strings"""
+
+    def __init__(self, capacity: int, error_rate: float):
+        self.capacity = capacity
+        self.num_bits = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.num_hashes = max(1, round(self.num_bits / capacity * math.log(2)))
+        self.bits = bytearray((self.num_bits + 7) // 8)
+        self.count = 0
+
+    def _positions(self, item: str):
+        """Bit positions for an item (double hashing over one digest)"""
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return ((h1 + i * h2) % self.num_bits for i in range(self.num_hashes))
+
+    def add(self, item: str):
+        """Add an item"""
+        for pos in self._positions(item):
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+        self.count += 1
+
+    def __contains__(self, item: str) -> bool:
+        """True if the item may have been added"""
+        return all(self.bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(item))
+
+
+class DeduplicationCache:
+    """Exact recent-ID window backed by rotating Bloom filters
+
+    Two Bloom generations are kept; when the current one reaches capacity
+    the older is discarded, so memory stays bounded and the false-positive
+    rate stays within twice the configured one.
+    """
+
+    def __init__(self, window_seconds: float = 600.0, max_entries: int = 100000,
+                 bloom_capacity: int = 1000000, bloom_error_rate: float = 0.001):
+        self.window_seconds = window_seconds
+        self.max_entries = max_entries
+        self.bloom_capacity = bloom_capacity
+        self.bloom_error_rate = bloom_error_rate
+        self._recent: "OrderedDict[str, float]" = OrderedDict()
+        self._bloom = BloomFilter(bloom_capacity, bloom_error_rate)
+        self._previous_bloom = None
+        self.stats = {"checked": 0, "duplicates_dropped": 0, "bloom_hits": 0}
+
+    def _expire(self, now: float):
+        """Move IDs past the window (or over the size bound) into the Bloom filter"""
+        cutoff = now - self.window_seconds
+        while self._recent:
+            txn_id, seen_at = next(iter(self._recent.items()))
+            if seen_at >= cutoff and len(self._recent) < self.max_entries:
+                break
+            self._recent.popitem(last=False)
+            self._add_to_bloom(txn_id)
+
+    def _add_to_bloom(self, txn_id: str):
+        """Add to the current Bloom generation, rotating when it is full"""
+        if self._bloom.count >= self.bloom_capacity:
+            self._previous_bloom = self._bloom
+            self._bloom = BloomFilter(self.bloom_capacity, self.bloom_error_rate)
+        self._bloom.add(txn_id)
+
+    def check(self, txn_id: str) -> str:
+        """Classify an ID and remember it; returns NEW, DUPLICATE or PROBABLE_DUPLICATE"""
+        now = time.monotonic()
+        self.stats["checked"] += 1
+        self._expire(now)
+
+        if txn_id in self._recent:
+            self.stats["duplicates_dropped"] += 1
+            return DUPLICATE
+
+        self._recent[txn_id] = now
+        if txn_id in self._bloom or (self._previous_bloom is not None and txn_id in self._previous_bloom):
+            self.stats["bloom_hits"] += 1
+            return PROBABLE_DUPLICATE
+        return NEW
+
+    def discard(self, txn_id: str):
+        """Forget an ID whose processing failed, so a redelivery is not dropped"""
+        self._recent.pop(txn_id, None)
+
+    def record_duplicate(self):
+        """Count a probable duplicate the caller confirmed"""
+        self.stats["duplicates_dropped"] += 1
+
+    def get_stats(self) -> dict:
+        """Counters and current window size"""
+        return {"window_entries": len(self._recent), **self.stats}
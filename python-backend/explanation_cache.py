@@ -0,0 +1,180 @@
+"""
+Explanation cache keyed by a quantized risk signature
+
+Flagged transactions cluster into a handful of risk profiles (same rule
+reason, similar amount, similar velocity), and an LLM explanation for one
+reads the same as for the next apart from the numbers. Explanations are
+cached under a signature of risk level, detector reason and bucketed key
+features. Before storing, the transaction-specific numbers in the text are
+swapped for placeholders; a hit renders the template with the new
+transaction's numbers. Entries live in process (LRU with TTL) and can be
+shared through Redis so every worker benefits from one generation.
+"""
+import bisect
+import json
+import re
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+AMOUNT_BUCKETS = (50, 100, 250, 500, 1000, 2500, 5000)
+DEVIATION_BUCKETS = (1.5, 3, 5, 10)
+VELOCITY_BUCKETS = (1, 3, 5, 10)
+
+
+def signature(risk_level: str, features: Dict[str, float], importance: Dict[str, Any]) -> str:
+    """Cache key: risk level, detector reason and bucketed amount, deviation and velocity"""
+    reason = importance.get("reason") or importance.get("model") or "-"
+    top = sorted(name for name, value in importance.items() if isinstance(value, (int, float)))
+    return "|".join((
+        risk_level,
+        str(reason),
+        f"a{bisect.bisect(AMOUNT_BUCKETS, features.get('amount', 0))}",
+        f"d{bisect.bisect(DEVIATION_BUCKETS, features.get('amount_vs_avg', 1))}",
+        f"v{bisect.bisect(VELOCITY_BUCKETS, features.get('txns_last_hour', 0))}",
+        ",".join(top)
+    ))
+
+
+def fill_values(transaction_id: str, fraud_score: float, features: Dict[str, float],
+                top_features: List[tuple]) -> Dict[str, str]:
+    """The transaction-specific numbers, formatted the way the prompt shows them
+
+    Formats of the same quantity share the name prefix before the first underscore.
+    """
+    amount = features.get('amount', 0)
+    user_avg = features.get('user_avg_amount', 0)
+    velocity = int(features.get('txns_last_hour', 0))
+    values = {
+        "txn_id": transaction_id,
+        "score_pct1": f"{fraud_score:.1%}",
+        "score_pct0": f"{fraud_score:.0%}",
+        "amount_cents": f"${amount:,.2f}",
+        "amount_cents_plain": f"${amount:.2f}",
+        "amount_dollars": f"${amount:,.0f}",
+        "amount_dollars_plain": f"${amount:.0f}",
+        "user_avg_cents": f"${user_avg:,.2f}",
+        "user_avg_cents_plain": f"${user_avg:.2f}",
+        "user_avg_dollars": f"${user_avg:,.0f}",
+        "deviation": f"{features.get('amount_vs_avg', 1):.1f}x",
+        "velocity_transactions": f"{velocity} transactions",
+        "velocity_txns": f"{velocity} txns",
+    }
+    for index, (_, value) in enumerate(top_features):
+        values[f"factor{index}_value"] = f"{value:.3f}"
+    return values
+
+
+def to_template(text: str, values: Dict[str, str]) -> Optional[str]:
+    """Replace the values in `text` with placeholders
+
+    None if a value in the text could stand for two different quantities.
+    """
+    names: Dict[str, str] = {}
+    ambiguous = set()
+    for name, value in values.items():
+        if value in names and names[value].split("_")[0] != name.split("_")[0]:
+            ambiguous.add(value)
+        names.setdefault(value, name)
+    if any(value in text for value in ambiguous):
+        return None
+    # Longest first, and never in the middle of a longer number
+    pattern = re.compile(
+        r"(?<![\d.,])(" + "|".join(re.escape(v) for v in sorted(names, key=len, reverse=True)) + r")(?![\d]|[.,]\d)"
+    )
+    escaped = text.replace("{", "{{").replace("}", "}}")
+    return pattern.sub(lambda match: "{" + names[match.group(1)] + "}", escaped)
+
+
+def render(template: str, values: Dict[str, str]) -> Optional[str]:
+    """Fill a template with another transaction's values; None if one is missing"""
+    try:
+        return template.format_map(values)
+    except (KeyError, IndexError, ValueError):
+        return None
+
+
+class ExplanationCache:
+    """LRU + TTL cache of explanation templates, optionally shared through Redis"""
+
+    def __init__(self, max_entries: int = 2048, ttl: float = 600.0, redis_client=None,
+                 namespace: str = "explanation_cache"):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.redis_client = redis_client
+        self.namespace = namespace
+        # key -> (expires_at, template, seconds the generation took)
+        self._entries: "OrderedDict[str, Tuple[float, str, float]]" = OrderedDict()
+        self._generations = 0
+        self._generation_seconds = 0.0
+        self.stats = {"hits": 0, "misses": 0, "stored": 0, "uncacheable": 0, "saved_seconds": 0.0}
+
+    @property
+    def avg_generation_seconds(self) -> float:
+        return self._generation_seconds / self._generations if self._generations else 0.0
+
+    def _store_local(self, key: str, template: str, generation_seconds: float, ttl: float):
+        self._entries[key] = (time.monotonic() + ttl, template, generation_seconds)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def get(self, key: str, values: Dict[str, str]) -> Optional[str]:
+        """The cached explanation rendered with `values`, or None on a miss"""
+        entry = self._entries.get(key)
+        if entry is not None:
+            if time.monotonic() < entry[0]:
+                self._entries.move_to_end(key)
+            else:
+                del self._entries[key]
+                entry = None
+        if entry is None and self.redis_client is not None:
+            entry = await self._redis_get(key)
+
+        explanation = render(entry[1], values) if entry is not None else None
+        if explanation is None:
+            self.stats["misses"] += 1
+            return None
+        self.stats["hits"] += 1
+        self.stats["saved_seconds"] += entry[2]
+        return explanation
+
+    async def _redis_get(self, key: str) -> Optional[Tuple[float, str, float]]:
+        """Fetch an entry another worker generated and keep it locally for its remaining TTL"""
+        redis_key = f"{self.namespace}:{key}"
+        try:
+            raw, ttl_ms = await self.redis_client.get(redis_key), await self.redis_client.pttl(redis_key)
+        except Exception:
+            return None
+        if raw is None or ttl_ms <= 0:
+            return None
+        payload = json.loads(raw)
+        self._store_local(key, payload["template"], payload["generation_seconds"], ttl_ms / 1000)
+        return self._entries[key]
+
+    async def put(self, key: str, explanation: str, values: Dict[str, str], generation_seconds: float):
+        """Template and store a freshly generated explanation"""
+        self._generations += 1
+        self._generation_seconds += generation_seconds
+        template = to_template(explanation, values)
+        if template is None:
+            self.stats["uncacheable"] += 1
+            return
+        self._store_local(key, template, generation_seconds, self.ttl)
+        self.stats["stored"] += 1
+        if self.redis_client is not None:
+            payload = json.dumps({"template": template, "generation_seconds": generation_seconds})
+            try:
+                await self.redis_client.set(f"{self.namespace}:{key}", payload, px=max(int(self.ttl * 1000), 1))
+            except Exception:
+                pass
+
+    def get_stats(self) -> dict:
+        """Hit rate, saved generation time and current size"""
+        lookups = self.stats["hits"] + self.stats["misses"]
+        return {
+            "entries": len(self._entries),
+            "hit_rate": round(self.stats["hits"] / lookups, 3) if lookups else 0.0,
+            "avg_generation_seconds": round(self.avg_generation_seconds, 3),
+            **self.stats
+        }
@@ -1,19 +1,54 @@
+import threading
 import numpy as np
 import pandas as pd
-from typing import Dict, List
+from typing import Dict, List, Tuple
 from datetime import datetime, timedelta
-from collections import defaultdict
+from collections import OrderedDict
 from models import Transaction
 
 
+# Fixed feature order used for model input and the stored feature vector.
+# Bump FEATURE_SCHEMA_VERSION whenever this list changes.
+FEATURE_SCHEMA_VERSION = 1
+FEATURE_NAMES = (
+    'amount', 'hour_of_day', 'day_of_week', 'is_weekend',
+    'transaction_type', 'user_avg_amount', 'user_std_amount',
+    'user_max_amount', 'user_min_amount', 'amount_vs_avg',
+    'txns_last_hour', 'txns_last_day', 'time_since_last_txn',
+    'merchant_avg_amount', 'merchant_std_amount',
+    'ip_txn_count', 'ip_unique_users', 'ip_user_ratio'
+)
+
+
+class _History(OrderedDict):
+    """Per-key transaction lists; past `max_keys` keys the least recently used is dropped"""
+    
+    def __init__(self, max_keys: int):
+        super().__init__()
+        self.max_keys = max_keys
+    
+    def __missing__(self, key):
+        value = self[key] = []
+        if len(self) > self.max_keys:
+            self.popitem(last=False)
+        return value
+
+
 class FeatureExtractor:
-    """Extract features from transactions for ML models"""
+    """Extract features from transactions for ML models
+    
+    Calls for different users may run concurrently (one at a time per user,
+    see scheduler.KeyedScheduler), but merchants and IPs are shared across
+    users, so every history access goes through one lock. Each history keeps
+    at most `window_size` transactions per key and `max_keys` keys.
+    """
     
-    def __init__(self, window_size: int = 100):
+    def __init__(self, window_size: int = 100, max_keys: int = 100000):
         self.window_size = window_size
-        self.user_history = defaultdict(list)
-        self.merchant_history = defaultdict(list)
-        self.ip_history = defaultdict(list)
+        self.user_history = _History(max_keys)
+        self.merchant_history = _History(max_keys)
+        self.ip_history = _History(max_keys)
+        self._lock = threading.Lock()
         
     def extract_features(self, transaction: Transaction) -> Dict[str, float]:
         """Extract features from a transaction"""
@@ -35,8 +70,14 @@ class FeatureExtractor:
         }
         features['transaction_type'] = type_encoding.get(transaction.transaction_type, 0.0)
         
+        # Merchant and IP lists are copied under the lock; a user's list only
+        # changes in that user's own (serialized) calls
+        with self._lock:
+            user_txns = self.user_history[transaction.user_id]
+            merchant_txns = list(self.merchant_history[transaction.merchant_id]) if transaction.merchant_id else []
+            ip_txns = list(self.ip_history[transaction.ip_address]) if transaction.ip_address else []
+        
         # User-based features
-        user_txns = self.user_history[transaction.user_id]
         if user_txns:
             amounts = [t.amount for t in user_txns[-self.window_size:]]
             features['user_avg_amount'] = np.mean(amounts)
@@ -74,7 +115,6 @@ class FeatureExtractor:
         
         # Merchant-based features
         if transaction.merchant_id:
-            merchant_txns = self.merchant_history[transaction.merchant_id]
             if merchant_txns:
                 amounts = [t.amount for t in merchant_txns[-self.window_size:]]
                 features['merchant_avg_amount'] = np.mean(amounts)
@@ -88,7 +128,6 @@ class FeatureExtractor:
         
         # IP-based features
         if transaction.ip_address:
-            ip_txns = self.ip_history[transaction.ip_address]
             features['ip_txn_count'] = len(ip_txns)
             
             # Check for IP used by multiple users
@@ -100,31 +139,41 @@ class FeatureExtractor:
             features['ip_unique_users'] = 0
             features['ip_user_ratio'] = 0.0
         
-        # Update history
-        self.user_history[transaction.user_id].append(transaction)
-        if transaction.merchant_id:
-            self.merchant_history[transaction.merchant_id].append(transaction)
-        if transaction.ip_address:
-            self.ip_history[transaction.ip_address].append(transaction)
-        
-        # Trim history to window size
-        self.user_history[transaction.user_id] = \
-            self.user_history[transaction.user_id][-self.window_size:]
+        # Update history, trimmed to the window size
+        with self._lock:
+            self._append(self.user_history, transaction.user_id, transaction)
+            if transaction.merchant_id:
+                self._append(self.merchant_history, transaction.merchant_id, transaction)
+            if transaction.ip_address:
+                self._append(self.ip_history, transaction.ip_address, transaction)
         
         return features
     
+    def _append(self, history: _History, key: str, transaction: Transaction):
+        """Append to one key's history (caller holds the lock)"""
+        txns = history[key]
+        history.move_to_end(key)
+        txns.append(transaction)
+        if len(txns) > self.window_size:
+            del txns[:-self.window_size]
+    
     def get_feature_names(self) -> List[str]:
         """Get ordered list of feature names"""
-        return [
-            'amount', 'hour_of_day', 'day_of_week', 'is_weekend',
-            'transaction_type', 'user_avg_amount', 'user_std_amount',
-            'user_max_amount', 'user_min_amount', 'amount_vs_avg',
-            'txns_last_hour', 'txns_last_day', 'time_since_last_txn',
-            'merchant_avg_amount', 'merchant_std_amount',
-            'ip_txn_count', 'ip_unique_users', 'ip_user_ratio'
-        ]
+        return list(FEATURE_NAMES)
     
     def features_to_array(self, features: Dict[str, float]) -> np.ndarray:
         """Convert feature dict to numpy array in correct order"""
         feature_names = self.get_feature_names()
         return np.array([features.get(name, 0.0) for name in feature_names])
+
+    def extract_features_batch(self, transactions: List[Transaction]) -> Tuple[List[Dict[str, float]], np.ndarray]:
+        """Extract features for transactions in order; returns the dicts and one feature matrix"""
+        features_list = [self.extract_features(txn) for txn in transactions]
+        return features_list, self.features_to_matrix(features_list)
+
+    def features_to_matrix(self, features_list: List[Dict[str, float]]) -> np.ndarray:
+        """Stack feature dicts into one (rows, features) matrix in model order"""
+        return np.array(
+            [[features.get(name, 0.0) for name in FEATURE_NAMES] for features in features_list],
+            dtype=float
+        ).reshape(len(features_list), len(FEATURE_NAMES))
@@ -8,6 +8,10 @@ import joblib
 import os
 from pathlib import Path
 
+import logs
+
+logger = logs.get_logger("detector")
+
 
 class PyTorchAutoencoder(nn.Module):
     """Autoencoder for anomaly detection"""
@@ -70,13 +74,13 @@ class FraudDetector:
         model_file = self.model_path / f"{self.model_type}_model.pkl"
         
         if model_file.exists():
-            print(f"Loading existing {self.model_type} model...")
+            logger.info("Loading existing %s model...", self.model_type)
             if self.model_type == "pytorch":
                 self.model = torch.load(model_file)
             else:
                 self.model = joblib.load(model_file)
         else:
-            print(f"Creating new {self.model_type} model...")
+            logger.info("Creating new %s model...", self.model_type)
             self._create_pretrained_model()
     
     def _create_pretrained_model(self):
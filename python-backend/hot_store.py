@@ -0,0 +1,113 @@
+"""
+In-memory hot tier for recent fraud results
+
+A bounded buffer of the most recent results persisted by this process,
+ordered by their (timestamp, transaction_id) key like the database views,
+with secondary indexes by user_id, risk_level and is_fraud. When this
+process is the only writer, the API serves recent, per-user and high-risk
+views from here when the request fits inside the hot window, and falls
+back to PostgreSQL otherwise.
+"""
+import bisect
+import heapq
+from collections import defaultdict
+from datetime import datetime
+from itertools import islice
+from typing import Dict, Iterable, List, Tuple
+
+# (keyset key, sequence number for ties, result dict)
+Entry = Tuple[Tuple[datetime, str], int, dict]
+
+
+class HotResultStore:
+    """Bounded, key-ordered buffer of recent results with secondary indexes
+
+    Every index is a list sorted by key. Results arrive roughly in key
+    order, so inserts land at or near the end, and eviction always removes
+    the smallest key, which is the head of every index it appears in.
+    Results keyed at or below the watermark are not kept: rows that old may
+    have been evicted around them, so memory could not tell the full story.
+    """
+
+    def __init__(self, capacity: int = 1000):
+        self.capacity = capacity
+        self._entries: List[Entry] = []
+        self._by_user: Dict[str, List[Entry]] = defaultdict(list)
+        self._by_risk_level: Dict[str, List[Entry]] = defaultdict(list)
+        self._fraud: List[Entry] = []
+        self._seq = 0
+        # The store holds every result this process persisted with a key above this
+        self.watermark: Tuple[datetime, str] = (datetime.utcnow(), "")
+
+    def __len__(self) -> int:
+        """Number of results held"""
+        return len(self._entries)
+
+    def add(self, key: Tuple[datetime, str], result: dict) -> bool:
+        """Add a result keyed by (naive UTC timestamp, transaction_id); False if below the watermark"""
+        if key <= self.watermark:
+            return False
+        entry = (key, self._seq, result)
+        self._seq += 1
+        bisect.insort(self._entries, entry)
+        bisect.insort(self._by_user[result["user_id"]], entry)
+        bisect.insort(self._by_risk_level[result["risk_level"]], entry)
+        if result["is_fraud"]:
+            bisect.insort(self._fraud, entry)
+        if len(self._entries) > self.capacity:
+            self._evict()
+        return True
+
+    def _evict(self):
+        """Drop the entry with the smallest key from the buffer and every index"""
+        key, _, result = self._entries.pop(0)
+        for index, index_key in ((self._by_user, result["user_id"]),
+                                 (self._by_risk_level, result["risk_level"])):
+            bucket = index[index_key]
+            bucket.pop(0)
+            if not bucket:
+                del index[index_key]
+        if result["is_fraud"]:
+            self._fraud.pop(0)
+        self.watermark = key
+
+    @staticmethod
+    def _newest(entries: Iterable[Entry], limit: int) -> List[Entry]:
+        """First `limit` entries of a newest-first iterator"""
+        return list(islice(entries, limit))
+
+    def values(self) -> List[dict]:
+        """All results, oldest first"""
+        return [result for _, _, result in self._entries]
+
+    def recent(self, limit: int) -> List[Entry]:
+        """Newest `limit` entries, newest first"""
+        return self._newest(reversed(self._entries), limit)
+
+    def user_count(self, user_id: str) -> int:
+        """Number of results held for a user"""
+        return len(self._by_user.get(user_id, ()))
+
+    def by_user(self, user_id: str, limit: int) -> List[Entry]:
+        """Newest entries for a user, newest first"""
+        return self._newest(reversed(self._by_user.get(user_id, ())), limit)
+
+    def risk_level_count(self, risk_levels: Iterable[str]) -> int:
+        """Number of results held in any of the risk levels"""
+        return sum(len(self._by_risk_level.get(level, ())) for level in risk_levels)
+
+    def by_risk_levels(self, risk_levels: Iterable[str], limit: int) -> List[Entry]:
+        """Newest entries in any of the risk levels, newest first"""
+        merged = heapq.merge(
+            *(reversed(self._by_risk_level.get(level, ())) for level in risk_levels),
+            reverse=True
+        )
+        return self._newest(merged, limit)
+
+    def fraud_count(self) -> int:
+        """Number of fraud results held"""
+        return len(self._fraud)
+
+    def fraud(self, limit: int) -> List[Entry]:
+        """Newest entries flagged as fraud, newest first"""
+        return self._newest(reversed(self._fraud), limit)
@@ -0,0 +1,84 @@
+"""
+Priority lanes for scoring
+
+Transactions are classified into lanes by amount and transaction type
+(first matching lane wins; the last lane is the catch-all). LaneQueue
+serves lanes in strict priority order, except that every `1 / min_share`-th
+item goes to whichever lower lane has waited longest, so a flood of
+high-value traffic slows the low lane down but never stops it.
+"""
+import asyncio
+import time
+from collections import deque
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+
+class Lane:
+    """One priority lane with its matching rule and latency SLO"""
+
+    def __init__(self, name: str, slo_seconds: float, min_amount: float = 0.0,
+                 transaction_types: Optional[Iterable[str]] = None):
+        self.name = name
+        self.slo_seconds = slo_seconds
+        self.min_amount = min_amount
+        self.transaction_types = frozenset(transaction_types) if transaction_types else None
+
+    def matches(self, transaction) -> bool:
+        if transaction.amount < self.min_amount:
+            return False
+        return self.transaction_types is None or transaction.transaction_type in self.transaction_types
+
+
+def load_lanes(specs: Sequence[Dict[str, Any]]) -> List[Lane]:
+    """Build lanes from settings, highest priority first"""
+    return [Lane(**spec) for spec in specs]
+
+
+def classify(lanes: Sequence[Lane], transaction) -> int:
+    """Index of the first lane the transaction matches (the last lane otherwise)"""
+    for index, lane in enumerate(lanes):
+        if lane.matches(transaction):
+            return index
+    return len(lanes) - 1
+
+
+class LaneQueue(asyncio.Queue):
+    """asyncio.Queue of (lane, item) pairs served by lane priority
+
+    Bounded on the total across lanes; put/get/qsize behave as in asyncio.Queue.
+    """
+
+    def __init__(self, lane_count: int, maxsize: int = 0, min_share: float = 0.1):
+        self.lane_count = lane_count
+        self.share_every = max(1, round(1 / min_share)) if min_share > 0 else 0
+        super().__init__(maxsize)
+
+    def _init(self, maxsize):
+        self._lanes = [deque() for _ in range(self.lane_count)]
+        self._size = 0
+        self._picks = 0
+
+    def qsize(self) -> int:
+        return self._size
+
+    def empty(self) -> bool:
+        return self._size == 0
+
+    def _put(self, entry):
+        lane, item = entry
+        self._lanes[lane].append((time.monotonic(), item))
+        self._size += 1
+
+    def _get(self):
+        waiting = [index for index, lane in enumerate(self._lanes) if lane]
+        lane = waiting[0]
+        self._picks += 1
+        if self.share_every and len(waiting) > 1 and self._picks % self.share_every == 0:
+            # Starvation protection: the longest-waiting lower lane goes first this time
+            lane = min(waiting[1:], key=lambda index: self._lanes[index][0][0])
+        _, item = self._lanes[lane].popleft()
+        self._size -= 1
+        return lane, item
+
+    def lane_sizes(self) -> List[int]:
+        return [len(lane) for lane in self._lanes]
@@ -0,0 +1,144 @@
+"""
+Non-blocking structured logging
+
+Application loggers live under the "fraud" namespace. Records go onto a
+bounded in-memory queue; a background QueueListener thread formats and
+writes them, so logging never waits on stdout. When the queue is full new
+records are dropped and counted instead of blocking the event loop.
+
+Per-transaction info lines go through a TransactionLogSampler so a flood
+logs a fixed fraction of them, and hot-path debug output is guarded with
+`logger.isEnabledFor(logging.DEBUG)` so it costs one cached check when
+debug is off.
+"""
+import atexit
+import json
+import logging
+import logging.handlers
+import queue
+import sys
+from datetime import datetime, timezone
+from typing import Optional
+
+ROOT_LOGGER = "fraud"
+
+# Attributes every LogRecord has; anything else came from `extra=` and is a structured field
+_RECORD_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+_listener: Optional[logging.handlers.QueueListener] = None
+_handler: Optional[logging.Handler] = None
+dropped = 0
+
+
+def get_logger(name: str) -> logging.Logger:
+    """Logger for one component, e.g. get_logger("consumer") -> fraud.consumer"""
+    return logging.getLogger(f"{ROOT_LOGGER}.{name}")
+
+
+def _fields(record: logging.LogRecord) -> dict:
+    return {k: v for k, v in vars(record).items() if k not in _RECORD_ATTRS and not k.startswith("_")}
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line with the record's structured fields"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            **_fields(record)
+        }
+        if record.exc_text:
+            entry["exc_info"] = record.exc_text
+        return json.dumps(entry, default=str)
+
+
+class TextFormatter(logging.Formatter):
+    """Human-readable line with structured fields appended as key=value"""
+
+    def __init__(self):
+        super().__init__("%(asctime)s %(levelname)-7s %(name)s: %(message)s")
+
+    def format(self, record: logging.LogRecord) -> str:
+        line = super().format(record)
+        fields = _fields(record)
+        if fields:
+            line += " " + " ".join(f"{k}={v}" for k, v in fields.items())
+        return line
+
+
+class NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that drops records when the queue is full"""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Formatting happens on the listener thread; only resolve what
+        # cannot safely cross threads (live tracebacks)
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        global dropped
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            dropped += 1
+
+
+class TransactionLogSampler:
+    """Let through one in every `1 / rate` per-transaction log lines"""
+
+    def __init__(self, rate: float):
+        self.every = max(1, round(1 / rate)) if rate > 0 else 0
+        self._count = 0
+
+    def should_log(self) -> bool:
+        if not self.every:
+            return False
+        self._count += 1
+        if self._count >= self.every:
+            self._count = 0
+            return True
+        return False
+
+
+def _parse_levels(spec: str) -> dict:
+    """Parse "detector=DEBUG,publisher=WARNING" into {component: level}"""
+    levels = {}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        name, _, level = item.partition("=")
+        levels[name.strip()] = level.strip().upper()
+    return levels
+
+
+def setup_logging(level: str = "INFO", fmt: str = "text", levels: str = "", queue_size: int = 10000):
+    """Install the queue handler and start the listener thread (idempotent)"""
+    global _listener, _handler
+    if _listener is not None:
+        return
+    logger = logging.getLogger(ROOT_LOGGER)
+    logger.setLevel(level.upper())
+    logger.propagate = False
+    for name, component_level in _parse_levels(levels).items():
+        get_logger(name).setLevel(component_level)
+
+    output = logging.StreamHandler(sys.stdout)
+    output.setFormatter(JsonFormatter() if fmt == "json" else TextFormatter())
+    log_queue = queue.Queue(maxsize=queue_size)
+    _handler = NonBlockingQueueHandler(log_queue)
+    logger.addHandler(_handler)
+    _listener = logging.handlers.QueueListener(log_queue, output, respect_handler_level=True)
+    _listener.start()
+    atexit.register(shutdown_logging)
+
+
+def shutdown_logging():
+    """Drain queued records and stop the listener thread"""
+    global _listener, _handler
+    if _listener is not None:
+        logging.getLogger(ROOT_LOGGER).removeHandler(_handler)
+        _listener.stop()
+        _listener = _handler = None
@@ -1,29 +1,60 @@
-from fastapi import FastAPI, HTTPException, BackgroundTasks, Depends
+from fastapi import FastAPI, HTTPException, BackgroundTasks, Depends, Header, Query, Request
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
+from starlette.requests import ClientDisconnect
 from contextlib import asynccontextmanager
-from sqlalchemy.orm import Session
+from functools import partial
+import anyio
+from sqlalchemy.ext.asyncio import AsyncSession
 import redis.asyncio as redis
 import json
 import time
 import asyncio
-from datetime import datetime
-from typing import Optional
+from datetime import datetime, timedelta
+from typing import List, Optional, Tuple
 
 from config import get_settings
 from models import Transaction, FraudScore, FraudExplanation, HealthCheck, Stats
-from feature_extractor import FeatureExtractor
+from feature_extractor import FeatureExtractor, FEATURE_NAMES
 from pretrained_detector import PretrainedFraudDetector  # Using pretrained LR model
 from ai_reasoner import AIReasoner
-from database import init_db, get_db
+from database import init_db, close_db, AsyncSessionLocal, SessionLocal
 import crud
+import codec
+import partitions
+from streaming import ResultBroadcaster
+from hot_store import HotResultStore
+from response_cache import ResponseCache
+from publisher import BatchPublisher
+import dedup
+import logs
+import metrics
+import profiling
+from startup import StartupTracker
+from simple_detector import SimpleFraudDetector
+import backpressure
+from scheduler import KeyedScheduler
+import lanes
+import circuit_breaker
+from concurrent.futures import ThreadPoolExecutor
 
 
 # Global state
 settings = get_settings()
+logs.setup_logging(settings.log_level, settings.log_format, settings.log_levels, settings.log_queue_size)
+logger = logs.get_logger("api")
+consumer_logger = logs.get_logger("consumer")
+# Per-transaction info lines are sampled so a flood does not flood the log
+txn_log_sampler = logs.TransactionLogSampler(settings.log_transaction_sample_rate)
 feature_extractor = None
 fraud_detector = None
 ai_reasoner = None
 redis_client = None
+result_broadcaster = None
+result_publisher = None
+response_cache = None
+background_tasks = {}
+startup = StartupTracker(["database", "detector", "features", "ai_reasoner", "redis"])
 stats = {
     "total_transactions": 0,
     "fraud_detected": 0,
@@ -31,162 +62,644 @@ stats = {
     "start_time": time.time()
 }
 
-# Store recent fraud results for frontend (max 500)
-recent_fraud_results = []
-MAX_RECENT_RESULTS = 500
+# In-memory hot tier of recent persisted results (key-ordered, with secondary indexes)
+hot_store = HotResultStore(capacity=settings.hot_tier_size)
+
+# Recently seen transaction IDs, checked before feature extraction
+dedup_cache = dedup.DeduplicationCache(
+    window_seconds=settings.dedup_window_seconds,
+    max_entries=settings.dedup_max_entries,
+    bloom_capacity=settings.dedup_bloom_capacity,
+    bloom_error_rate=settings.dedup_bloom_error_rate
+) if settings.dedup_enabled else None
+
+# Bounded hand-offs between ingestion stages; how full they are drives load shedding
+# Scoring lanes by amount and type, highest priority first; the ingest queue serves them in order
+priority_lanes = lanes.load_lanes(settings.priority_lanes)
+ingest_queue = lanes.LaneQueue(len(priority_lanes), maxsize=settings.ingest_queue_size, min_share=settings.lane_min_share)
+persist_queue = asyncio.Queue(maxsize=settings.persist_queue_size)
+explain_queue = asyncio.Queue(maxsize=settings.explain_queue_size)
+# Inline explanations run as their own tasks so they do not hold a scheduler worker
+explaining_slots = asyncio.Semaphore(settings.inline_explain_max_pending)
+explaining_tasks = set()
+# Per-user ordered scoring: users run in parallel on the executor, one job per user at a time
+scheduler = KeyedScheduler(
+    concurrency=settings.scoring_concurrency,
+    max_pending=settings.scoring_max_pending,
+    lanes=len(priority_lanes),
+    min_share=settings.lane_min_share
+)
+scoring_executor = ThreadPoolExecutor(max_workers=settings.scoring_concurrency, thread_name_prefix="scoring")
+degradation = backpressure.DegradationController(
+    {"ingest": ingest_queue, "scoring": scheduler, "persist": persist_queue},
+    thresholds=(settings.degrade_defer_ai_at, settings.degrade_cheap_model_at, settings.degrade_shed_at),
+    hysteresis=settings.degrade_hysteresis,
+    min_dwell=settings.degrade_min_dwell_seconds,
+    deferred_max=settings.deferred_queue_size
+)
+# Rule-weighted detector used instead of the LR model under pressure
+cheap_detector = SimpleFraudDetector()
+
+
+# Queue depths and component counters, read when /metrics is scraped
+metrics.register_callback(
+    "fraud_ready", "1 once startup has finished and ingestion is running",
+    lambda: 1 if startup.ready else 0
+)
+metrics.register_callback(
+    "fraud_degradation_mode", "0 normal, 1 defer_ai, 2 cheap_model, 3 shed",
+    lambda: degradation.mode
+)
+metrics.register_callback(
+    "fraud_ingest_queue_depth", "Transactions waiting to be scored",
+    lambda: ingest_queue.qsize()
+)
+metrics.register_callback(
+    "fraud_lane_queue_depth", "Transactions waiting to be scored per priority lane",
+    lambda: {lane.name: size for lane, size in zip(priority_lanes, ingest_queue.lane_sizes())},
+    label_names=("lane",)
+)
+metrics.register_callback(
+    "fraud_lane_slo_seconds", "Latency SLO per priority lane",
+    lambda: {lane.name: lane.slo_seconds for lane in priority_lanes},
+    label_names=("lane",)
+)
+metrics.register_callback(
+    "fraud_scheduler_pending", "Transactions scheduled for scoring (queued or running)",
+    lambda: scheduler.qsize()
+)
+metrics.register_callback(
+    "fraud_scheduler_active_users", "Users with scheduled scoring work",
+    lambda: scheduler.get_stats()["keys"]
+)
+metrics.register_callback(
+    "fraud_persist_queue_depth", "Scored transactions waiting for the database writers",
+    lambda: persist_queue.qsize()
+)
+metrics.register_callback(
+    "fraud_explain_queue_depth", "AI explanations deferred under load",
+    lambda: explain_queue.qsize()
+)
+metrics.register_callback(
+    "fraud_deferred_queue_depth", "Shed transactions waiting to be replayed",
+    lambda: len(degradation.deferred)
+)
+metrics.register_callback(
+    "fraud_shed_total", "Transactions shed to the deferred queue",
+    lambda: degradation.stats["shed"], type_name="counter"
+)
+metrics.register_callback(
+    "fraud_shed_dropped_total", "Transactions dropped because the deferred queue was full",
+    lambda: degradation.stats["shed_dropped"], type_name="counter"
+)
+metrics.register_callback(
+    "fraud_explanations_skipped_total", "AI explanations skipped because the explain queue was full",
+    lambda: degradation.stats["explanations_skipped"], type_name="counter"
+)
+metrics.register_callback(
+    "fraud_ollama_circuit_state", "Ollama circuit breaker: 0 closed, 1 half-open, 2 open",
+    lambda: circuit_breaker.STATES.index(ai_reasoner.breaker.state) if ai_reasoner else 0
+)
+metrics.register_callback(
+    "fraud_ollama_calls_total", "Ollama explanation calls by outcome",
+    lambda: dict(ai_reasoner.stats) if ai_reasoner else {},
+    type_name="counter", label_names=("outcome",)
+)
+metrics.register_callback(
+    "fraud_explanation_cache_hits_total", "AI explanations served from the explanation cache",
+    lambda: ai_reasoner.explanation_cache.stats["hits"] if ai_reasoner and ai_reasoner.explanation_cache else 0,
+    type_name="counter"
+)
+metrics.register_callback(
+    "fraud_explanation_cache_misses_total", "AI explanations not found in the explanation cache",
+    lambda: ai_reasoner.explanation_cache.stats["misses"] if ai_reasoner and ai_reasoner.explanation_cache else 0,
+    type_name="counter"
+)
+metrics.register_callback(
+    "fraud_explanation_cache_saved_seconds_total", "Estimated Ollama generation time saved by cache hits",
+    lambda: ai_reasoner.explanation_cache.stats["saved_seconds"] if ai_reasoner and ai_reasoner.explanation_cache else 0,
+    type_name="counter"
+)
+metrics.register_callback(
+    "fraud_log_dropped_total", "Log records dropped because the log queue was full",
+    lambda: logs.dropped, type_name="counter"
+)
+metrics.register_callback(
+    "fraud_publish_pending", "Results waiting in the batching publisher",
+    lambda: result_publisher.get_stats()["pending"] if result_publisher else 0
+)
+metrics.register_callback(
+    "fraud_publish_dropped_total", "Results dropped by the batching publisher",
+    lambda: result_publisher.stats["messages_dropped"] if result_publisher else 0, type_name="counter"
+)
+metrics.register_callback(
+    "fraud_publish_errors_total", "Failed publish pipelines",
+    lambda: result_publisher.stats["publish_errors"] if result_publisher else 0, type_name="counter"
+)
+metrics.register_callback(
+    "fraud_stream_clients", "Connected /stream clients",
+    lambda: len(result_broadcaster.subscribers) if result_broadcaster else 0
+)
+metrics.register_callback(
+    "fraud_stream_buffered_messages", "Messages buffered for /stream clients",
+    lambda: sum(s.queue.qsize() for s in result_broadcaster.subscribers) if result_broadcaster else 0
+)
+metrics.register_callback(
+    "fraud_stream_evicted_total", "Slow /stream clients evicted",
+    lambda: result_broadcaster.stats["clients_evicted"] if result_broadcaster else 0, type_name="counter"
+)
+metrics.register_callback("fraud_hot_tier_entries", "Results held in the hot tier", lambda: len(hot_store))
+metrics.register_callback(
+    "fraud_response_cache_hits_total", "Response cache hits",
+    lambda: response_cache.stats["hits"] if response_cache else 0, type_name="counter"
+)
+metrics.register_callback(
+    "fraud_response_cache_misses_total", "Response cache misses",
+    lambda: response_cache.stats["misses"] if response_cache else 0, type_name="counter"
+)
+metrics.register_callback(
+    "fraud_duplicates_dropped_total", "Duplicate transactions dropped before scoring",
+    lambda: dedup_cache.stats["duplicates_dropped"] if dedup_cache else 0, type_name="counter"
+)
+
+
+async def cached(key: str, ttl: float, loader, tags=()):
+    """Serve through the response cache, or call the loader directly when disabled"""
+    if response_cache is None:
+        return await loader()
+    return await response_cache.get_or_load(key, ttl, loader, tags)
+
+
+async def is_duplicate(transaction: Transaction) -> bool:
+    """Check the dedup cache, confirming Bloom-only hits against PostgreSQL"""
+    verdict = dedup_cache.check(transaction.transaction_id)
+    if verdict == dedup.NEW:
+        return False
+    if verdict == dedup.PROBABLE_DUPLICATE:
+        try:
+            async with AsyncSessionLocal() as db:
+                # A redelivery carries the same event time: only partitions near it can hold the row
+                found = await crud.get_transaction_async(
+                    db, transaction.transaction_id, around=transaction.timestamp,
+                    window=timedelta(seconds=settings.dedup_window_seconds)
+                ) is not None
+        except Exception as e:
+            consumer_logger.warning("⚠️  Duplicate check error: %s", e)
+            found = False
+        if not found:
+            return False
+        dedup_cache.record_duplicate()
+    consumer_logger.debug("🔁 Dropped duplicate txn", extra={"transaction_id": transaction.transaction_id})
+    return True
+
+
+def forget_transaction(transaction_id: str):
+    """Release a dedup reservation after scoring or persisting failed"""
+    if dedup_cache is not None:
+        dedup_cache.discard(transaction_id)
 
 
 async def process_transactions_from_redis():
-    """Background task to process transactions from Redis pub/sub"""
+    """Background task receiving transactions from Redis pub/sub into the ingest queue"""
     pubsub = redis_client.pubsub()
     await pubsub.subscribe("transactions")
-    print("🎧 Listening for transactions on Redis channel 'transactions'...")
+    consumer_logger.info("🎧 Listening for transactions on Redis channel 'transactions'...")
     
     try:
         async for message in pubsub.listen():
-            if message["type"] == "message":
-                try:
-                    # Parse transaction
-                    txn_data = json.loads(message["data"])
-                    transaction = Transaction(**txn_data)
-                    
-                    # Extract features
-                    features_dict = feature_extractor.extract_features(transaction)
-                    features_array = feature_extractor.features_to_array(features_dict)
-                    
-                    # Predict fraud
-                    fraud_prob, importance = fraud_detector.predict(features_array)
-                    risk_level = fraud_detector.get_risk_level(fraud_prob)
-                    is_fraud = fraud_prob >= settings.fraud_threshold
-                    
-                    # Create fraud score with ALL transaction details
-                    fraud_score = FraudScore(
-                        transaction_id=transaction.transaction_id,
-                        fraud_probability=fraud_prob,
-                        risk_level=risk_level,
-                        is_fraud=is_fraud,
-                        features=features_dict,
-                        model_used=settings.model_type
-                    )
-                    
-                    # Update stats
-                    stats["total_transactions"] += 1
-                    stats["total_risk_score"] += float(fraud_prob)
-                    if is_fraud:
-                        stats["fraud_detected"] += 1
-                    
-                    # Publish COMPLETE fraud result to Redis (includes all transaction data)
-                    # Convert all values to native Python types for JSON serialization
-                    fraud_result_with_txn = {
-                        "transaction_id": transaction.transaction_id,
-                        "user_id": transaction.user_id,
-                        "amount": float(transaction.amount),
-                        "transaction_type": transaction.transaction_type,
-                        "merchant_id": transaction.merchant_id,
-                        "timestamp": transaction.timestamp.isoformat(),
-                        "fraud_probability": float(fraud_prob),
-                        "risk_level": str(risk_level),
-                        "is_fraud": bool(is_fraud),
-                        "features": {k: float(v) for k, v in features_dict.items()},
-                        "model_used": str(settings.model_type)
-                    }
-                    
-                    # Generate AI explanation ONLY for confirmed fraud transactions
-                    if settings.enable_ai_reasoning and is_fraud:
-                        try:
-                            explanation = await ai_reasoner.explain_fraud(
-                                transaction_id=transaction.transaction_id,
-                                fraud_score=float(fraud_prob),
-                                risk_level=str(risk_level),
-                                features=features_dict,
-                                feature_importance=importance
-                            )
-                            if explanation:
-                                fraud_result_with_txn["ai_explanation"] = explanation.get("explanation", "")
-                                fraud_result_with_txn["risk_factors"] = explanation.get("risk_factors", [])
-                                fraud_result_with_txn["recommendations"] = explanation.get("recommendations", [])
-                        except Exception as e:
-                            print(f"⚠️  AI explanation error: {e}")
-                    
-                    # Save to PostgreSQL database
-                    try:
-                        from database import SessionLocal
-                        db = SessionLocal()
-                        try:
-                            # Extract AI data if available
-                            ai_explanation = fraud_result_with_txn.get("ai_explanation")
-                            risk_factors = fraud_result_with_txn.get("risk_factors")
-                            recommendations = fraud_result_with_txn.get("recommendations")
-                            
-                            # Create transaction in database
-                            db_transaction = crud.create_transaction(
-                                db, 
-                                transaction, 
-                                fraud_score,
-                                ai_explanation=ai_explanation,
-                                risk_factors=risk_factors,
-                                recommendations=recommendations
-                            )
-                            db.commit()
-                        finally:
-                            db.close()
-                    except Exception as e:
-                        print(f"⚠️  Database save error: {e}")
-                    
-                    # Store in memory for /recent endpoint
-                    recent_fraud_results.append(fraud_result_with_txn)
-                    if len(recent_fraud_results) > MAX_RECENT_RESULTS:
-                        recent_fraud_results.pop(0)  # Remove oldest
-                    
-                    await redis_client.publish(
-                        settings.redis_results_stream,
-                        json.dumps(fraud_result_with_txn)
-                    )
-                    
-                    print(f"✅ Processed txn {transaction.transaction_id[:8]}... - Risk: {fraud_prob:.2f} ({risk_level})")
-                    
-                except Exception as e:
-                    print(f"❌ Error processing transaction: {e}")
+            if message["type"] != "message":
+                continue
+            received_at = time.perf_counter()
+            try:
+                transaction = codec.decode_transaction(message["data"])
+            except Exception as e:
+                metrics.ERRORS.labels("parse").inc()
+                consumer_logger.warning("⚠️  Invalid transaction message: %s", e)
+                continue
+            metrics.PARSE.observe(time.perf_counter() - received_at)
+            
+            # Last degradation step: park low-amount traffic until the pipeline recovers
+            if degradation.update() == backpressure.SHED and transaction.amount < settings.shed_amount_threshold:
+                degradation.shed(transaction)
+                continue
+            # Blocks when the scorer is behind, which is what pushes the modes up
+            await ingest_queue.put((lanes.classify(priority_lanes, transaction), (transaction, received_at)))
     except asyncio.CancelledError:
-        print("🛑 Stopping transaction processing...")
+        consumer_logger.info("🛑 Stopping transaction processing...")
         await pubsub.unsubscribe("transactions")
         await pubsub.close()
 
-@asynccontextmanager
-async def lifespan(app: FastAPI):
-    """Startup and shutdown events"""
-    global feature_extractor, fraud_detector, ai_reasoner, redis_client
+
+async def score_transactions():
+    """Background task handing queued transactions to the per-user scheduler"""
+    while True:
+        lane, (transaction, received_at) = await ingest_queue.get()
+        # Waits while the scheduler is full, so the ingest queue backs up
+        await scheduler.submit(transaction.user_id, process_transaction, transaction, received_at, lane, lane=lane)
+        ingest_queue.task_done()
+
+
+async def process_transaction(transaction: Transaction, received_at: float, lane: int):
+    """Scheduler job for one consumed transaction; errors are counted, not raised"""
+    metrics.IN_FLIGHT.inc()
+    try:
+        await score_transaction(transaction, received_at, lane)
+    except Exception as e:
+        forget_transaction(transaction.transaction_id)
+        metrics.ERRORS.labels("process").inc()
+        consumer_logger.exception("❌ Error processing transaction: %s", e)
+    finally:
+        metrics.IN_FLIGHT.dec()
+
+
+def featurize_and_predict(detector, transaction: Transaction):
+    """Features and prediction for one transaction; runs on the scoring executor
+    
+    Only ever called for one transaction per user at a time (see KeyedScheduler),
+    which keeps that user's feature history ordered.
+    """
+    started = time.perf_counter()
+    features_dict = feature_extractor.extract_features(transaction)
+    features_array = feature_extractor.features_to_array(features_dict)
+    featured = time.perf_counter()
+    fraud_prob, importance = detector.predict(features_array)
+    # Timings are observed back on the event loop, which owns the metrics
+    return features_dict, features_array, fraud_prob, importance, featured - started, time.perf_counter() - featured
+
+
+async def run_scoring(function, *args):
+    """Run blocking feature/model work on the scoring executor"""
+    return await asyncio.get_running_loop().run_in_executor(scoring_executor, function, *args)
+
+
+async def score_transaction(transaction: Transaction, received_at: float, lane: int):
+    """Score one transaction and hand it to the persist and publish stages"""
+    # Drop redelivered messages before any feature state is mutated
+    if dedup_cache is not None and await is_duplicate(transaction):
+        return
+    mode = degradation.update()
+    
+    # Extract features and predict fraud (the rule-weighted detector is the cheap path under pressure)
+    detector = cheap_detector if mode >= backpressure.CHEAP_MODEL else fraud_detector
+    model_used = cheap_detector.name if detector is cheap_detector else settings.model_type
+    features_dict, features_array, fraud_prob, importance, features_seconds, predict_seconds = \
+        await run_scoring(featurize_and_predict, detector, transaction)
+    feature_vector = features_array.tolist()
+    risk_level = detector.get_risk_level(fraud_prob)
+    is_fraud = fraud_prob >= settings.fraud_threshold
+    metrics.FEATURES.observe(features_seconds)
+    metrics.PREDICT.observe(predict_seconds)
     
-    # Startup
-    print("🚀 Starting Fraud Detection API...")
+    # Create fraud score with ALL transaction details
+    fraud_score = FraudScore(
+        transaction_id=transaction.transaction_id,
+        fraud_probability=fraud_prob,
+        risk_level=risk_level,
+        is_fraud=is_fraud,
+        features=features_dict,
+        model_used=model_used
+    )
+    
+    # Update stats
+    stats["total_transactions"] += 1
+    stats["total_risk_score"] += float(fraud_prob)
+    if is_fraud:
+        stats["fraud_detected"] += 1
+    
+    # Publish COMPLETE fraud result to Redis (includes all transaction data)
+    fraud_result_with_txn = codec.build_result(
+        transaction, fraud_prob, risk_level, is_fraud, feature_vector, model_used
+    )
     
-    # Initialize PostgreSQL database
-    print("🗄️  Initializing PostgreSQL database...")
-    init_db()
+    # Generate AI explanation ONLY for confirmed fraud transactions
+    if settings.enable_ai_reasoning and is_fraud:
+        if mode == backpressure.NORMAL:
+            # The scheduler worker is released here; the explaining task publishes and persists.
+            # Waits only when too many explanations are already pending.
+            await explaining_slots.acquire()
+            metrics.IN_FLIGHT.inc()
+            task = asyncio.create_task(explain_and_finish(
+                transaction, received_at, lane, fraud_score, fraud_result_with_txn, feature_vector, importance
+            ))
+            explaining_tasks.add(task)
+            task.add_done_callback(explaining_tasks.discard)
+            return
+        # First degradation step: explain later on fraud_explanations, or not at all
+        try:
+            explain_queue.put_nowait((
+                transaction.transaction_id, float(fraud_prob), str(risk_level), features_dict, importance
+            ))
+            degradation.stats["explanations_deferred"] += 1
+        except asyncio.QueueFull:
+            degradation.stats["explanations_skipped"] += 1
     
-    feature_extractor = FeatureExtractor(window_size=settings.feature_window)
-    fraud_detector = PretrainedFraudDetector()  # Using pretrained LR model
-    ai_reasoner = AIReasoner()
+    await finish_transaction(transaction, received_at, lane, fraud_score, fraud_result_with_txn, feature_vector)
+
+
+async def explain_and_finish(transaction: Transaction, received_at: float, lane: int, fraud_score: FraudScore,
+                             fraud_result_with_txn: dict, feature_vector, importance):
+    """Inline AI explanation, then publish and persist; runs outside the scheduler
     
-    # Connect to Redis
-    redis_client = redis.from_url(settings.redis_url, decode_responses=True)
-    await redis_client.ping()
-    print("✅ Connected to Redis")
+    Later transactions of the same user may be published before this one;
+    their features were already computed in order.
+    """
+    try:
+        stage_start = time.perf_counter()
+        try:
+            explanation = await ai_reasoner.explain_fraud(
+                transaction_id=transaction.transaction_id,
+                fraud_score=float(fraud_score.fraud_probability),
+                risk_level=str(fraud_score.risk_level),
+                features=fraud_score.features,
+                feature_importance=importance
+            )
+            if explanation:
+                fraud_result_with_txn["ai_explanation"] = explanation.get("explanation", "")
+                fraud_result_with_txn["risk_factors"] = explanation.get("risk_factors", [])
+                fraud_result_with_txn["recommendations"] = explanation.get("recommendations", [])
+        except Exception as e:
+            metrics.ERRORS.labels("explain").inc()
+            consumer_logger.warning("⚠️  AI explanation error: %s", e)
+        metrics.EXPLAIN.observe(time.perf_counter() - stage_start)
+        await finish_transaction(transaction, received_at, lane, fraud_score, fraud_result_with_txn, feature_vector)
+    except Exception as e:
+        forget_transaction(transaction.transaction_id)
+        metrics.ERRORS.labels("process").inc()
+        consumer_logger.exception("❌ Error processing transaction: %s", e)
+    finally:
+        explaining_slots.release()
+        metrics.IN_FLIGHT.dec()
+
+
+async def finish_transaction(transaction: Transaction, received_at: float, lane: int, fraud_score: FraudScore,
+                             fraud_result_with_txn: dict, feature_vector):
+    """Publish a scored transaction and hand it to the database writers"""
+    risk_level = fraud_score.risk_level
+    stage_start = time.perf_counter()
+    result_publisher.publish(
+        settings.redis_results_stream,
+        codec.encode_result(fraud_result_with_txn)
+    )
+    stage_end = time.perf_counter()
+    metrics.PUBLISH.observe(stage_end - stage_start)
+    metrics.END_TO_END.observe(stage_end - received_at)
+    metrics.TRANSACTIONS_PROCESSED.labels(risk_level).inc()
+    priority_lane = priority_lanes[lane]
+    metrics.LANE_LATENCY.labels(priority_lane.name).observe(stage_end - received_at)
+    if stage_end - received_at > priority_lane.slo_seconds:
+        metrics.LANE_SLO_VIOLATIONS.labels(priority_lane.name).inc()
     
-    # Start background task to process transactions from Redis
-    processing_task = asyncio.create_task(process_transactions_from_redis())
+    # Save to PostgreSQL via the writer tasks; waits when they are behind
+    await persist_queue.put((transaction, fraud_score, fraud_result_with_txn, feature_vector))
+    
+    if txn_log_sampler.should_log():
+        consumer_logger.info("✅ Processed txn", extra={
+            "transaction_id": transaction.transaction_id,
+            "risk_score": round(float(fraud_score.fraud_probability), 4),
+            "risk_level": risk_level
+        })
+
+
+def _build_row(transaction: Transaction, fraud_score: FraudScore, fraud_result_with_txn: dict, feature_vector):
+    """Database row for a scored transaction, with AI data if available"""
+    return crud.build_transaction(
+        transaction,
+        fraud_score,
+        ai_explanation=fraud_result_with_txn.get("ai_explanation"),
+        risk_factors=fraud_result_with_txn.get("risk_factors"),
+        recommendations=fraud_result_with_txn.get("recommendations"),
+        feature_vector=feature_vector
+    )
+
+
+async def write_batch(batch: list) -> int:
+    """Insert a batch in one database transaction; returns the rows written
+
+    If the batch fails (e.g. one duplicate key), its rows are retried one by
+    one so a single bad row cannot take the rest of the batch with it.
+    """
+    try:
+        async with AsyncSessionLocal() as db:
+            await crud.create_transactions_async(db, [_build_row(*item) for item in batch])
+    except Exception as e:
+        if len(batch) == 1:
+            forget_transaction(batch[0][0].transaction_id)
+            metrics.ERRORS.labels("db_write").inc()
+            consumer_logger.warning("⚠️  Database save error: %s", e)
+            return 0
+        written = 0
+        for item in batch:
+            written += await write_batch([item])
+        return written
+    
+    # Hot tier only gets persisted rows, so memory never shows one the database lacks
+    for transaction, _, fraud_result_with_txn, _ in batch:
+        hot_store.add((crud.naive_utc(transaction.timestamp), transaction.transaction_id), fraud_result_with_txn)
+    return len(batch)
+
+
+async def persist_results():
+    """Background task writing scored transactions to PostgreSQL in batches"""
+    while True:
+        batch = [await persist_queue.get()]
+        # Take whatever else is already waiting, so batches grow with the backlog
+        while len(batch) < settings.db_write_batch_size and not persist_queue.empty():
+            batch.append(persist_queue.get_nowait())
+        stage_start = time.perf_counter()
+        try:
+            if await write_batch(batch) and response_cache is not None:
+                await response_cache.invalidate("transactions")
+        finally:
+            # Lets shutdown wait for the last batch (persist_queue.join)
+            for _ in batch:
+                persist_queue.task_done()
+        metrics.DB_WRITE.observe(time.perf_counter() - stage_start)
+
+
+async def explain_deferred():
+    """Background task generating explanations deferred under load"""
+    while True:
+        await generate_explanation(*await explain_queue.get())
+
+
+async def replay_deferred():
+    """Background task feeding shed transactions back once the pipeline is back to normal"""
+    while True:
+        await asyncio.sleep(settings.deferred_replay_interval)
+        # Also lets the mode step down while no traffic arrives
+        while (degradation.update() == backpressure.NORMAL and degradation.deferred
+               and degradation.fill_ratio() < settings.degrade_defer_ai_at / 2):
+            transaction = degradation.deferred.popleft()
+            ingest_queue.put_nowait((lanes.classify(priority_lanes, transaction), (transaction, time.perf_counter())))
+            degradation.stats["replayed"] += 1
+
+
+async def drain_pipeline():
+    """Score and write everything accepted so far; the consumer must already be stopped"""
+    # Shed transactions go back in whatever the mode: nothing new is arriving
+    while degradation.deferred:
+        transaction = degradation.deferred.popleft()
+        await ingest_queue.put((lanes.classify(priority_lanes, transaction), (transaction, time.perf_counter())))
+        degradation.stats["replayed"] += 1
+    await ingest_queue.join()
+    while scheduler.qsize():
+        await asyncio.sleep(0.05)
+    if explaining_tasks:
+        await asyncio.gather(*explaining_tasks, return_exceptions=True)
+    await persist_queue.join()
+
+
+def count_undrained():
+    """Log and count what shutdown is about to drop"""
+    left = {
+        "deferred": len(degradation.deferred),
+        "ingest": ingest_queue.qsize(),
+        "scoring": scheduler.qsize(),
+        "explaining": len(explaining_tasks),
+        "persist": persist_queue.qsize(),
+        "explain_deferred": explain_queue.qsize(),
+    }
+    for stage, count in left.items():
+        if count:
+            metrics.SHUTDOWN_DISCARDED.labels(stage).inc(count)
+    if any(left.values()):
+        logger.warning("⚠️  Shutdown dropped undrained work: %s",
+                       ", ".join(f"{stage}={count}" for stage, count in left.items() if count))
+
+
+def run_partition_maintenance():
+    """Create upcoming partitions and drop the ones past retention"""
+    with SessionLocal() as db:
+        if not partitions.is_partitioned(db):
+            return
+        created = partitions.ensure_partitions(db)
+        removed = crud.delete_old_transactions(db, days=settings.retention_days)
+        rollups_removed = crud.delete_old_rollups(db)
+        if created or removed or rollups_removed:
+            logger.info("🗂️  Partition maintenance: %d created, %d rows retired, %d rollup buckets expired",
+                        created, removed, rollups_removed)
+
+
+async def partition_maintenance_loop():
+    """Background task running partition maintenance periodically"""
+    while True:
+        await asyncio.sleep(settings.partition_maintenance_interval)
+        try:
+            await asyncio.to_thread(run_partition_maintenance)
+            if response_cache is not None:
+                await response_cache.invalidate("transactions")
+        except Exception as e:
+            logger.warning("⚠️  Partition maintenance error: %s", e)
+
+
+async def connect_redis():
+    """Open the Redis client and check it answers"""
+    client = redis.from_url(settings.redis_url, decode_responses=True)
+    await client.ping()
+    return client
+
+
+async def initialize():
+    """Run the independent startup steps concurrently, then start the pipeline"""
+    global feature_extractor, fraud_detector, ai_reasoner, redis_client, result_broadcaster, result_publisher, response_cache
+    
+    # Schema creation and model training block, so they run in worker threads
+    try:
+        results = await asyncio.gather(
+            startup.run("database", init_db, in_thread=True),
+            startup.run("detector", PretrainedFraudDetector, in_thread=True),  # Using pretrained LR model
+            startup.run("features", FeatureExtractor, settings.feature_window,
+                        settings.feature_history_max_keys),
+            startup.run("ai_reasoner", AIReasoner),
+            startup.run("redis", connect_redis)
+        )
+    except Exception:
+        logger.error("❌ Startup failed; /live will report unhealthy")
+        return
+    _, fraud_detector, feature_extractor, ai_reasoner, redis_client = results
+    
+    # Read-through cache for the polled dashboard endpoints
+    if settings.cache_enabled:
+        response_cache = ResponseCache(
+            max_entries=settings.cache_max_entries,
+            redis_client=redis_client if settings.cache_backend == "redis" else None,
+            min_invalidation_interval=settings.cache_min_invalidation_interval
+        )
+    if ai_reasoner.explanation_cache is not None and settings.explanation_cache_backend == "redis":
+        ai_reasoner.explanation_cache.redis_client = redis_client
+    
+    # Results are published in pipelined batches
+    result_publisher = BatchPublisher(
+        redis_client,
+        batch_size=settings.publish_batch_size,
+        flush_interval=settings.publish_flush_interval,
+        max_pending=settings.publish_max_pending,
+        mode=settings.publish_mode,
+        stream_maxlen=settings.publish_stream_maxlen
+    )
+    
+    # Single results subscription fanned out to /stream clients
+    result_broadcaster = ResultBroadcaster(
+        redis_client,
+        settings.redis_results_stream,
+        buffer_size=settings.stream_client_buffer,
+        max_clients=settings.stream_max_clients
+    )
+    
+    # Ingestion starts only now that the detector and feature state exist
+    background_tasks.update(
+        processing=asyncio.create_task(process_transactions_from_redis()),
+        scoring=asyncio.create_task(score_transactions()),
+        scheduler=asyncio.create_task(scheduler.run()),
+        **{f"persist_{i}": asyncio.create_task(persist_results()) for i in range(settings.db_writer_concurrency)},
+        explain=asyncio.create_task(explain_deferred()),
+        replay=asyncio.create_task(replay_deferred()),
+        maintenance=asyncio.create_task(partition_maintenance_loop()),
+        broadcast=asyncio.create_task(result_broadcaster.run()),
+        publisher=asyncio.create_task(result_publisher.run())
+    )
+    startup.mark_ready()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Startup and shutdown events"""
+    # Startup runs in the background so /live answers while the model trains
+    logger.info("🚀 Starting Fraud Detection API...")
+    startup_task = asyncio.create_task(initialize())
     
     yield
     
     # Shutdown
-    print("🛑 Shutting down...")
-    processing_task.cancel()
-    try:
-        await processing_task
-    except asyncio.CancelledError:
-        pass
+    logger.info("🛑 Shutting down...")
+    startup_task.cancel()
+    # Redis does not redeliver: stop taking transactions, then finish the accepted ones
+    consumer = background_tasks.pop("processing", None)
+    if consumer is not None:
+        consumer.cancel()
+        try:
+            await consumer
+        except asyncio.CancelledError:
+            pass
+        try:
+            await asyncio.wait_for(drain_pipeline(), settings.shutdown_drain_seconds)
+        except asyncio.TimeoutError:
+            logger.warning("⚠️  Pipeline not drained within %.0fs", settings.shutdown_drain_seconds)
+        count_undrained()
+    # Dict order puts the publisher last so it flushes what the consumer published
+    for task in (*explaining_tasks, *background_tasks.values()):
+        task.cancel()
+    for task in (startup_task, *explaining_tasks, *background_tasks.values()):
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+    scoring_executor.shutdown(wait=False)
+    if ai_reasoner:
+        await ai_reasoner.aclose()
     if redis_client:
         await redis_client.close()
+    await close_db()
 
 
 app = FastAPI(
@@ -215,27 +728,65 @@ async def root():
     }
 
 
-@app.get("/health", response_model=HealthCheck)
-async def health_check():
-    """Health check endpoint"""
+async def _load_health() -> HealthCheck:
+    """Check Redis and the model"""
     try:
         await redis_client.ping()
         redis_connected = True
     except:
         redis_connected = False
     
+    model_loaded = fraud_detector is not None and fraud_detector.model is not None
+    if not startup.ready:
+        status = "starting"
+    elif redis_connected and model_loaded and degradation.mode == backpressure.NORMAL:
+        status = "healthy"
+    else:
+        status = "degraded"
+    pressure = degradation.get_stats()
     return HealthCheck(
-        status="healthy" if redis_connected and fraud_detector.model else "degraded",
-        model_loaded=fraud_detector.model is not None,
-        redis_connected=redis_connected
+        status=status,
+        model_loaded=model_loaded,
+        redis_connected=redis_connected,
+        ready=startup.ready,
+        degradation_mode=pressure["mode"],
+        queues={**pressure["queues"], "explain": explain_queue.qsize(), "deferred": pressure["deferred"]}
     )
 
 
-@app.get("/stats", response_model=Stats)
-async def get_stats(db: Session = Depends(get_db)):
-    """Get system statistics from PostgreSQL database"""
+def require_ready():
+    """Reject requests that need the detector until startup has finished"""
+    if not startup.ready:
+        raise HTTPException(status_code=503, detail="Service is starting", headers={"Retry-After": "1"})
+
+
+@app.get("/live")
+async def liveness():
+    """Liveness probe: the process is up and startup has not failed"""
+    if startup.failed:
+        return JSONResponse(status_code=503, content={"status": "failed", **startup.report()})
+    return {"status": "alive"}
+
+
+@app.get("/ready")
+async def readiness():
+    """Readiness probe: startup is done and ingestion is running, with per-step timings"""
+    return JSONResponse(status_code=200 if startup.ready else 503, content=startup.report())
+
+
+@app.get("/health", response_model=HealthCheck)
+async def health_check():
+    """Health check endpoint"""
+    async def load():
+        return (await _load_health()).model_dump(mode="json")
+    return await cached("health", settings.cache_ttl_health, load)
+
+
+async def _load_stats() -> Stats:
+    """Get system statistics from the PostgreSQL counters row"""
     try:
-        db_stats = crud.get_stats(db)
+        async with AsyncSessionLocal() as db:
+            db_stats = await crud.get_stats_async(db)
         
         return Stats(
             total_transactions=db_stats["total_transactions"],
@@ -243,15 +794,17 @@ async def get_stats(db: Session = Depends(get_db)):
             fraud_rate=db_stats["fraud_rate"],
             avg_risk_score=db_stats["avg_risk_score"],
             model_type="pretrained_lr",
-            uptime_seconds=time.time() - stats["start_time"]
+            uptime_seconds=time.time() - stats["start_time"],
+            duplicates_dropped=dedup_cache.stats["duplicates_dropped"] if dedup_cache else 0
         )
     except Exception as e:
         # Fallback to in-memory stats if database fails
-        total_transactions = len(recent_fraud_results)
+        recent_results = hot_store.values()
+        total_transactions = len(recent_results)
         
         if total_transactions > 0:
-            fraud_detected = sum(1 for r in recent_fraud_results if r.get("is_fraud", False))
-            total_risk_score = sum(r.get("fraud_probability", 0.0) for r in recent_fraud_results)
+            fraud_detected = hot_store.fraud_count()
+            total_risk_score = sum(r.get("fraud_probability", 0.0) for r in recent_results)
             fraud_rate = (fraud_detected / total_transactions) * 100
             avg_risk_score = total_risk_score / total_transactions
         else:
@@ -265,70 +818,405 @@ async def get_stats(db: Session = Depends(get_db)):
             fraud_rate=fraud_rate,
             avg_risk_score=avg_risk_score,
             model_type="pretrained_lr",
-            uptime_seconds=time.time() - stats["start_time"]
+            uptime_seconds=time.time() - stats["start_time"],
+            duplicates_dropped=dedup_cache.stats["duplicates_dropped"] if dedup_cache else 0
         )
 
 
-@app.get("/recent")
-async def get_recent_transactions(limit: int = 100, db: Session = Depends(get_db)):
-    """Get recent fraud detection results from PostgreSQL database"""
+@app.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    """Pipeline metrics in the Prometheus text format"""
+    return PlainTextResponse(metrics.registry.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+@app.get("/stats", response_model=Stats)
+async def get_stats():
+    """Get system statistics from PostgreSQL database"""
+    async def load():
+        return (await _load_stats()).model_dump()
+    return await cached("stats", settings.cache_ttl_stats, load, tags=("transactions",))
+
+
+def _transaction_to_dict(db_txn, feature_names: Optional[dict] = None) -> dict:
+    """Convert a database row to the /recent response format
+
+    Features are projected back to named fields only when `feature_names`
+    (schema version -> names) is given.
+    """
+    txn_dict = {
+        "transaction_id": db_txn.transaction_id,
+        "user_id": db_txn.user_id,
+        "amount": float(db_txn.amount),
+        "transaction_type": db_txn.transaction_type,
+        "merchant_id": db_txn.merchant_id,
+        "timestamp": db_txn.timestamp.isoformat() if db_txn.timestamp else None,
+        "fraud_probability": float(db_txn.fraud_probability),
+        "risk_level": db_txn.risk_level,
+        "is_fraud": bool(db_txn.is_fraud),
+        "model_used": db_txn.model_used,
+    }
+    
+    if feature_names is not None:
+        txn_dict["features"] = crud.project_features(
+            db_txn.feature_vector, feature_names.get(db_txn.feature_schema_version, [])
+        )
+    
+    # Add AI explanation if available
+    if db_txn.ai_explanation:
+        txn_dict["ai_explanation"] = db_txn.ai_explanation
+    if db_txn.risk_factors:
+        txn_dict["risk_factors"] = db_txn.risk_factors
+    if db_txn.recommendations:
+        txn_dict["recommendations"] = db_txn.recommendations
+    
+    return txn_dict
+
+
+def _hot_result_view(result: dict, include_features: bool = False) -> dict:
+    """Shape an in-memory result like a /recent database row"""
+    view = {k: v for k, v in result.items() if k not in ("feature_vector", "feature_schema_version")}
+    if include_features:
+        view["features"] = crud.project_features(result.get("feature_vector"), FEATURE_NAMES)
+    return view
+
+
+async def _feature_names_for(db_transactions, include_features: bool) -> Optional[dict]:
+    """Feature names by schema version for the rows, when features were requested"""
+    if not include_features:
+        return None
+    versions = {t.feature_schema_version for t in db_transactions if t.feature_vector}
+    async with AsyncSessionLocal() as db:
+        return {v: await crud.get_feature_names_async(db, v) for v in versions}
+
+
+def _serve_from_memory() -> bool:
+    """True if the hot tier sees every result written, so views may be served from it"""
+    return settings.hot_tier_enabled and settings.hot_tier_single_writer
+
+
+async def _fetch_total() -> int:
+    """Total transaction count from the counters row"""
+    async with AsyncSessionLocal() as db:
+        return await crud.get_transaction_count_async(db)
+
+
+async def _fetch_total_and_horizon() -> Tuple[int, int]:
+    """Total transaction count and the current write horizon"""
+    async with AsyncSessionLocal() as db:
+        horizon = await crud.get_write_horizon_async(db)
+        return await crud.get_transaction_count_async(db), horizon
+
+
+def _page_response(transactions: list, keys: list, limit: int, total: int, cursor: Optional[str],
+                   has_more: bool, source: str, paging: bool = True) -> dict:
+    """Build a /recent response; `keys` are the (timestamp, transaction_id) keys of the rows"""
+    # Cursor of the oldest row, for fetching the next older page
+    next_cursor = None
+    if paging and len(keys) == limit:
+        next_cursor = crud.encode_cursor(*min(keys))
+    
+    return {
+        "transactions": transactions,
+        "total": total,
+        "limit": limit,
+        "cursor": cursor,
+        "next_cursor": next_cursor,
+        "has_more": has_more,
+        "source": source
+    }
+
+
+async def _load_recent(limit: int, before_key, since_key, since: Optional[str],
+                       include_features: bool) -> dict:
+    """Build a /recent response from the hot tier or PostgreSQL
+
+    `since` polls follow the write position, which only PostgreSQL knows,
+    so they always go to the database. The first page hands out the write
+    horizon read before the page as its `cursor`: polling from there
+    returns everything written since, possibly repeating rows the page
+    already showed.
+    """
+    # Hot tier
+    if _serve_from_memory() and before_key is None and since_key is None and len(hot_store) >= limit:
+        hot_entries = hot_store.recent(limit)
+        cursor = None
+        try:
+            total, horizon = await _fetch_total_and_horizon()
+            cursor = crud.encode_since_cursor(horizon, "")
+        except Exception:
+            total = len(hot_store)
+        return _page_response(
+            [_hot_result_view(result, include_features) for _, _, result in hot_entries],
+            [key for key, _, _ in hot_entries],
+            limit, total, cursor, has_more=False, source="memory"
+        )
+
+    async def fetch_rows():
+        async with AsyncSessionLocal() as db:
+            # Horizon first: every row below it is visible to the query that follows
+            horizon = await crud.get_write_horizon_async(db)
+            if since_key is not None:
+                # Fetch one extra row to know whether the client is still behind
+                rows = await crud.get_transactions_since_async(db, since_key, limit=limit + 1)
+            else:
+                rows = await crud.get_recent_page_async(db, limit=limit, before=before_key)
+            return rows, horizon
+
     try:
-        db_transactions = crud.get_recent_transactions(db, limit=limit)
+        # Rows and total come from separate pooled connections, so run them concurrently
+        (db_transactions, horizon), total = await asyncio.gather(fetch_rows(), _fetch_total())
         
-        # Convert database objects to dict format
-        transactions = []
-        for db_txn in db_transactions:
-            txn_dict = {
-                "transaction_id": db_txn.transaction_id,
-                "user_id": db_txn.user_id,
-                "amount": float(db_txn.amount),
-                "transaction_type": db_txn.transaction_type,
-                "merchant_id": db_txn.merchant_id,
-                "timestamp": db_txn.timestamp.isoformat() if db_txn.timestamp else None,
-                "fraud_probability": float(db_txn.fraud_probability),
-                "risk_level": db_txn.risk_level,
-                "is_fraud": bool(db_txn.is_fraud),
-                "model_used": db_txn.model_used,
-                "features": db_txn.features or {},
-            }
-            
-            # Add AI explanation if available
-            if db_txn.ai_explanation:
-                txn_dict["ai_explanation"] = db_txn.ai_explanation
-            if db_txn.risk_factors:
-                txn_dict["risk_factors"] = db_txn.risk_factors
-            if db_txn.recommendations:
-                txn_dict["recommendations"] = db_txn.recommendations
-            
-            transactions.append(txn_dict)
+        has_more = False
+        cursor = None
+        if since_key is not None:
+            has_more = len(db_transactions) > limit
+            db_transactions = db_transactions[:limit]
+            position = since_key
+            if db_transactions:
+                position = (db_transactions[-1].write_xid, db_transactions[-1].transaction_id)
+            if not has_more:
+                # Nothing else below the horizon, so the next poll can start there
+                position = max(position, (horizon, ""))
+            cursor = crud.encode_since_cursor(*position)
+            db_transactions.reverse()  # Newest first, like a normal page
+        elif before_key is None:
+            cursor = crud.encode_since_cursor(horizon, "")
         
-        total = crud.get_transaction_count(db)
+        feature_names = await _feature_names_for(db_transactions, include_features)
         
+        return _page_response(
+            [_transaction_to_dict(db_txn, feature_names) for db_txn in db_transactions],
+            [(db_txn.timestamp, db_txn.transaction_id) for db_txn in db_transactions],
+            limit, total, cursor, has_more, source="database", paging=since_key is None
+        )
+    except Exception as e:
+        logger.warning("⚠️  Database query error: %s", e)
+        # Fallback to the hot tier, whatever it holds
+        hot_entries = hot_store.recent(limit)
         return {
-            "transactions": transactions,
-            "total": total,
-            "limit": limit
+            "transactions": [_hot_result_view(result, include_features) for _, _, result in hot_entries],
+            "total": len(hot_store),
+            "limit": limit,
+            "cursor": None,
+            "next_cursor": None,
+            "has_more": False,
+            "source": "memory"
         }
-    except Exception as e:
-        print(f"⚠️  Database query error: {e}")
-        # Fallback to in-memory cache
+
+
+@app.get("/recent")
+async def get_recent_transactions(
+    limit: int = Query(100, ge=1, le=1000),
+    before: Optional[str] = None,
+    since: Optional[str] = None,
+    include_features: bool = False
+):
+    """Get recent fraud detection results
+
+    - no cursor: newest `limit` rows
+    - before=<cursor>: the next older page (use `next_cursor` from a previous response),
+      keyset-paginated on (timestamp, transaction_id)
+    - since=<cursor>: rows written after the cursor (use `cursor` from the first page or
+      a previous poll). Keyed on write order, not event time, so a row committed late
+      with an older timestamp is still delivered.
+
+    The first page is served from the in-memory hot tier when it fits
+    inside it, everything else from PostgreSQL. Set include_features=true
+    to get the named feature values for each row.
+    """
+    try:
+        before_key = crud.decode_cursor(before) if before else None
+        since_key = crud.decode_since_cursor(since) if since else None
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    async def load():
+        return await _load_recent(limit, before_key, since_key, since, include_features)
+    return await cached(
+        f"recent:{limit}:{before}:{since}:{include_features}",
+        settings.cache_ttl_recent, load, tags=("transactions",)
+    )
+
+
+@app.get("/users/{user_id}/transactions")
+async def get_user_transactions(
+    user_id: str,
+    limit: int = Query(50, ge=1, le=500),
+    include_features: bool = False
+):
+    """Get a user's most recent results (hot tier first, PostgreSQL for older data)"""
+    if _serve_from_memory() and hot_store.user_count(user_id) >= limit:
+        return {
+            "transactions": [_hot_result_view(r, include_features) for _, _, r in hot_store.by_user(user_id, limit)],
+            "limit": limit,
+            "source": "memory"
+        }
+    
+    async with AsyncSessionLocal() as db:
+        db_transactions = await crud.get_transactions_by_user_async(db, user_id, limit=limit)
+    feature_names = await _feature_names_for(db_transactions, include_features)
+    return {
+        "transactions": [_transaction_to_dict(t, feature_names) for t in db_transactions],
+        "limit": limit,
+        "source": "database"
+    }
+
+
+@app.get("/high-risk")
+async def get_high_risk_transactions(
+    limit: int = Query(100, ge=1, le=1000),
+    include_features: bool = False
+):
+    """Get the most recent high/critical risk results (hot tier first, PostgreSQL for older data)"""
+    risk_levels = ("high", "critical")
+    if _serve_from_memory() and hot_store.risk_level_count(risk_levels) >= limit:
+        return {
+            "transactions": [_hot_result_view(r, include_features)
+                             for _, _, r in hot_store.by_risk_levels(risk_levels, limit)],
+            "limit": limit,
+            "source": "memory"
+        }
+    
+    async with AsyncSessionLocal() as db:
+        db_transactions = await crud.get_high_risk_transactions_async(db, limit=limit)
+    feature_names = await _feature_names_for(db_transactions, include_features)
+    return {
+        "transactions": [_transaction_to_dict(t, feature_names) for t in db_transactions],
+        "limit": limit,
+        "source": "database"
+    }
+
+
+@app.get("/fraud")
+async def get_fraud_transactions(
+    limit: int = Query(100, ge=1, le=1000),
+    include_features: bool = False
+):
+    """Get the most recent results flagged as fraud (hot tier first, PostgreSQL for older data)"""
+    if _serve_from_memory() and hot_store.fraud_count() >= limit:
+        return {
+            "transactions": [_hot_result_view(r, include_features) for _, _, r in hot_store.fraud(limit)],
+            "limit": limit,
+            "source": "memory"
+        }
+    
+    async with AsyncSessionLocal() as db:
+        db_transactions = await crud.get_fraud_transactions_async(db, limit=limit)
+    feature_names = await _feature_names_for(db_transactions, include_features)
+    return {
+        "transactions": [_transaction_to_dict(t, feature_names) for t in db_transactions],
+        "limit": limit,
+        "source": "database"
+    }
+
+
+@app.get("/timeseries")
+async def get_timeseries(
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    granularity: str = Query("auto", pattern="^(auto|minute|hour)$"),
+    max_points: int = Query(120, ge=1, le=2000),
+    risk_level: Optional[str] = None,
+    transaction_type: Optional[str] = None,
+    group_by: Optional[str] = Query(None, pattern="^(risk_level|transaction_type)$")
+):
+    """Get downsampled chart series from the per-minute / per-hour rollups
+
+    Defaults to the last hour. Each point covers `step_seconds` and carries
+    count, fraud count/rate, average risk score, total amount and a
+    10-bucket risk score histogram.
+    """
+    end = crud.naive_utc(end) if end else datetime.utcnow()
+    start = crud.naive_utc(start) if start else end - timedelta(hours=1)
+    if start >= end:
+        raise HTTPException(status_code=400, detail="start must be before end")
+    
+    granularity, step_seconds = crud.resolve_timeseries_step(start, end, granularity, max_points)
+    
+    async def load():
+        async with AsyncSessionLocal() as db:
+            points = await crud.get_timeseries_async(
+                db, start, end, granularity, step_seconds,
+                risk_level=risk_level,
+                transaction_type=transaction_type,
+                group_by=group_by
+            )
         return {
-            "transactions": recent_fraud_results[-limit:] if len(recent_fraud_results) > limit else recent_fraud_results,
-            "total": len(recent_fraud_results),
-            "limit": limit
+            "start": start.isoformat(),
+            "end": end.isoformat(),
+            "granularity": granularity,
+            "step_seconds": step_seconds,
+            "points": points
         }
+    
+    # Key on the step-aligned range so dashboards polling "last N hours" share entries
+    aligned_end = int(end.timestamp()) // step_seconds
+    return await cached(
+        f"timeseries:{int(start.timestamp()) // step_seconds}:{aligned_end}:{granularity}:{step_seconds}:"
+        f"{risk_level}:{transaction_type}:{group_by}",
+        settings.cache_ttl_timeseries, load, tags=("transactions",)
+    )
+
+
+@app.get("/stream", dependencies=[Depends(require_ready)])
+async def stream_results(
+    request: Request,
+    risk_level: Optional[List[str]] = Query(None),
+    user_id: Optional[str] = None
+):
+    """Stream fraud results as Server-Sent Events
+
+    Optional filters: one or more `risk_level` values and a `user_id`. If the
+    client falls behind its buffer it is disconnected, and should resume
+    with /recent?since=<cursor>.
+    """
+    subscriber = result_broadcaster.subscribe(
+        risk_levels=set(risk_level) if risk_level else None,
+        user_id=user_id
+    )
+    if subscriber is None:
+        raise HTTPException(status_code=503, detail="Too many stream clients")
+
+    async def event_stream():
+        try:
+            yield "retry: 3000\n\n"
+            while True:
+                try:
+                    data = await asyncio.wait_for(
+                        subscriber.queue.get(), timeout=settings.stream_heartbeat_seconds
+                    )
+                except asyncio.TimeoutError:
+                    if await request.is_disconnected():
+                        break
+                    yield ": keepalive\n\n"
+                    continue
+                if data is None:
+                    # Evicted as a slow consumer
+                    yield "event: evicted\ndata: {}\n\n"
+                    break
+                yield f"data: {data}\n\n"
+        finally:
+            result_broadcaster.unsubscribe(subscriber)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
 
 
-@app.post("/predict", response_model=FraudScore)
+@app.post("/predict", response_model=FraudScore, dependencies=[Depends(require_ready)])
 async def predict_fraud(transaction: Transaction, background_tasks: BackgroundTasks):
     """Predict fraud probability for a transaction"""
+    # Same idempotency as the consumer: a repeated ID must not update feature state twice
+    if dedup_cache is not None and await is_duplicate(transaction):
+        raise HTTPException(status_code=409, detail=f"Transaction {transaction.transaction_id} was already scored")
     try:
-        # Extract features
-        features_dict = feature_extractor.extract_features(transaction)
-        features_array = feature_extractor.features_to_array(features_dict)
-        
-        # Predict fraud
-        fraud_prob, importance = fraud_detector.predict(features_array)
+        # Extract features and predict fraud, ordered with this user's consumed transactions
+        features_dict, _, fraud_prob, importance, _, _ = await scheduler.call(
+            transaction.user_id, run_scoring, featurize_and_predict, fraud_detector, transaction,
+            lane=lanes.classify(priority_lanes, transaction)
+        )
         risk_level = fraud_detector.get_risk_level(fraud_prob)
         is_fraud = fraud_prob >= settings.fraud_threshold
         
@@ -349,7 +1237,7 @@ async def predict_fraud(transaction: Transaction, background_tasks: BackgroundTa
             stats["fraud_detected"] += 1
         
         # Publish to Redis
-        await redis_client.publish(
+        result_publisher.publish(
             settings.redis_results_stream,
             fraud_score.model_dump_json()
         )
@@ -368,10 +1256,248 @@ async def predict_fraud(transaction: Transaction, background_tasks: BackgroundTa
         return fraud_score
     
     except Exception as e:
+        forget_transaction(transaction.transaction_id)
         raise HTTPException(status_code=500, detail=f"Prediction error: {str(e)}")
 
 
-@app.post("/explain", response_model=FraudExplanation)
+class _DuplexStreamingResponse(StreamingResponse):
+    """Streams the response while the request body is still being read
+    
+    StreamingResponse listens for client disconnect on `receive`, which would
+    consume the request body chunks an NDJSON upload is still sending. Until
+    `body_done` is set, a disconnect surfaces as ClientDisconnect from the
+    body reader instead; after that, `receive` is watched as usual.
+    """
+    def __init__(self, content, body_done: asyncio.Event, **kwargs):
+        super().__init__(content, **kwargs)
+        self.body_done = body_done
+    
+    async def __call__(self, scope, receive, send):
+        async def listen_for_disconnect():
+            await self.body_done.wait()
+            await self.listen_for_disconnect(receive)
+        
+        async with anyio.create_task_group() as task_group:
+            async def wrap(func):
+                await func()
+                task_group.cancel_scope.cancel()
+            
+            task_group.start_soon(wrap, partial(self.stream_response, send))
+            await wrap(listen_for_disconnect)
+        
+        if self.background is not None:
+            await self.background()
+
+
+async def _extract_features_scheduled(transactions: List[Transaction]) -> List[dict]:
+    """Extract features with one scheduler job per user, keeping each user's rows in order"""
+    rows_by_user = {}
+    for i, transaction in enumerate(transactions):
+        rows_by_user.setdefault(transaction.user_id, []).append(i)
+    
+    def extract(rows):
+        return [feature_extractor.extract_features(transactions[i]) for i in rows]
+    
+    # Bulk scoring rides in the lowest lane so it does not delay live traffic
+    lowest = len(priority_lanes) - 1
+    futures = [
+        await scheduler.submit(user_id, run_scoring, extract, rows, lane=lowest)
+        for user_id, rows in rows_by_user.items()
+    ]
+    features_list = [None] * len(transactions)
+    for rows, user_features in zip(rows_by_user.values(), await asyncio.gather(*futures)):
+        for i, features in zip(rows, user_features):
+            features_list[i] = features
+    return features_list
+
+
+async def _score_chunk(transactions: List[Transaction], background_tasks: BackgroundTasks) -> List[str]:
+    """Score transactions through the batched feature and model path; returns NDJSON lines"""
+    features_list = await _extract_features_scheduled(transactions)
+    
+    def predict(features_list):
+        return fraud_detector.predict_batch(feature_extractor.features_to_matrix(features_list))
+    
+    predictions = await run_scoring(predict, features_list)
+    
+    lines = []
+    for transaction, features_dict, (fraud_prob, importance) in zip(transactions, features_list, predictions):
+        risk_level = fraud_detector.get_risk_level(fraud_prob)
+        is_fraud = fraud_prob >= settings.fraud_threshold
+        fraud_score = FraudScore(
+            transaction_id=transaction.transaction_id,
+            fraud_probability=fraud_prob,
+            risk_level=risk_level,
+            is_fraud=is_fraud,
+            features=features_dict,
+            model_used=settings.model_type
+        )
+        
+        stats["total_transactions"] += 1
+        stats["total_risk_score"] += fraud_prob
+        if is_fraud:
+            stats["fraud_detected"] += 1
+        
+        line = fraud_score.model_dump_json()
+        result_publisher.publish(settings.redis_results_stream, line)
+        if fraud_prob >= 0.5:
+            background_tasks.add_task(
+                generate_explanation,
+                transaction.transaction_id,
+                fraud_prob,
+                risk_level,
+                features_dict,
+                importance
+            )
+        lines.append(line + "\n")
+    return lines
+
+
+async def _ndjson_lines(request: Request, body_done: asyncio.Event):
+    """Yield non-empty lines of a streamed NDJSON request body; sets `body_done` once it is read"""
+    buffer = b""
+    async for chunk in request.stream():
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            if line.strip():
+                yield line
+    body_done.set()
+    if buffer.strip():
+        yield buffer
+
+
+async def _json_array_lines(items: list):
+    """Yield the items of a parsed JSON array"""
+    for item in items:
+        yield item
+
+
+@app.post("/predict/batch", dependencies=[Depends(require_ready)])
+async def predict_fraud_batch(request: Request, background_tasks: BackgroundTasks):
+    """Score many transactions in one request
+    
+    Accepts a JSON array, or an NDJSON body (Content-Type: application/x-ndjson)
+    that is scored while it uploads. Streams one FraudScore per line back as each
+    chunk completes, an {"index", "error"} line for an invalid or duplicate row, and a final
+    {"summary": ...} line with counts and timings.
+    """
+    received_at = time.perf_counter()
+    max_items = settings.predict_batch_max_items
+    headers = {"X-Batch-Max-Items": str(max_items)}
+    
+    is_ndjson = "ndjson" in request.headers.get("content-type", "")
+    body_done = asyncio.Event()
+    if is_ndjson:
+        items = _ndjson_lines(request, body_done)
+        parse = Transaction.model_validate_json
+    else:
+        try:
+            payload = codec.loads(await request.body())
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=f"Invalid JSON: {e}")
+        if not isinstance(payload, list):
+            raise HTTPException(status_code=400, detail="Expected a JSON array of transactions")
+        if len(payload) > max_items:
+            raise HTTPException(status_code=413, detail=f"Batch exceeds {max_items} transactions")
+        items = _json_array_lines(payload)
+        parse = Transaction.model_validate
+        headers["X-Batch-Size"] = str(len(payload))
+        headers["X-Parse-Time-Ms"] = f"{(time.perf_counter() - received_at) * 1000:.2f}"
+    
+    async def results():
+        count = 0
+        errors = 0
+        duplicates = 0
+        scoring_seconds = 0.0
+        chunk: List[Transaction] = []
+        
+        async def flush():
+            nonlocal scoring_seconds
+            started = time.perf_counter()
+            lines = await _score_chunk(chunk, background_tasks)
+            scoring_seconds += time.perf_counter() - started
+            chunk.clear()
+            return "".join(lines)
+        
+        index = 0
+        try:
+            async for item in items:
+                if index >= max_items:
+                    errors += 1
+                    yield json.dumps({"index": index, "error": f"Batch exceeds {max_items} transactions"}) + "\n"
+                    break
+                try:
+                    transaction = parse(item)
+                except ValueError as e:
+                    errors += 1
+                    yield json.dumps({"index": index, "error": str(e)}) + "\n"
+                else:
+                    # Same idempotency as /predict: a repeated ID must not update feature state twice
+                    if dedup_cache is not None and await is_duplicate(transaction):
+                        duplicates += 1
+                        yield json.dumps({"index": index, "error": "Duplicate transaction_id"}) + "\n"
+                    else:
+                        chunk.append(transaction)
+                index += 1
+                if len(chunk) >= settings.predict_batch_chunk_size:
+                    count += len(chunk)
+                    yield await flush()
+                    # Let the consumer loop and other requests run between chunks
+                    await asyncio.sleep(0)
+            if chunk:
+                count += len(chunk)
+                yield await flush()
+        except ClientDisconnect:
+            # Gone mid-upload: nobody is left to read the rest
+            return
+        finally:
+            # Rows never scored (failure, disconnect) must not stay reserved in the dedup cache
+            for transaction in chunk:
+                forget_transaction(transaction.transaction_id)
+        
+        yield json.dumps({"summary": {
+            "scored": count,
+            "errors": errors,
+            "duplicates": duplicates,
+            "scoring_ms": round(scoring_seconds * 1000, 2),
+            "total_ms": round((time.perf_counter() - received_at) * 1000, 2)
+        }}) + "\n"
+    
+    if is_ndjson:
+        return _DuplexStreamingResponse(results(), body_done, media_type="application/x-ndjson", headers=headers)
+    return StreamingResponse(results(), media_type="application/x-ndjson", headers=headers)
+
+
+def require_admin(x_admin_token: Optional[str] = Header(None)):
+    """Allow admin endpoints only with the configured token"""
+    if not settings.admin_token:
+        raise HTTPException(status_code=404, detail="Admin endpoints are disabled")
+    if x_admin_token != settings.admin_token:
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+
+
+@app.post("/admin/profile", response_class=PlainTextResponse, dependencies=[Depends(require_admin)])
+async def profile_service(
+    mode: str = Query("sample", description="sample, cprofile or tracemalloc"),
+    seconds: Optional[float] = Query(None, gt=0),
+    interval_ms: float = Query(5.0, ge=1.0, le=1000.0, description="Sampling interval (sample mode)"),
+    top: int = Query(30, ge=1, le=500, description="Entries returned (cprofile and tracemalloc)"),
+    all_threads: bool = Query(False, description="Sample every thread, not just the event loop")
+):
+    """Profile the live service for a bounded duration"""
+    if mode not in profiling.MODES:
+        raise HTTPException(status_code=400, detail=f"mode must be one of {', '.join(profiling.MODES)}")
+    seconds = min(seconds or settings.profile_default_seconds, settings.profile_max_seconds)
+    try:
+        result = await profiling.run_profile(mode, seconds, interval_ms / 1000, top, all_threads)
+    except profiling.ProfilerBusy:
+        raise HTTPException(status_code=409, detail="A profile is already running")
+    filename = f"profile-{mode}-{int(time.time())}.{'folded' if mode == 'sample' else 'txt'}"
+    return PlainTextResponse(result, headers={"Content-Disposition": f'attachment; filename="{filename}"'})
+
+
+@app.post("/explain", response_model=FraudExplanation, dependencies=[Depends(require_ready)])
 async def explain_fraud_decision(
     transaction_id: str,
     fraud_score: float,
@@ -408,12 +1534,12 @@ async def generate_explanation(
         )
         
         # Publish explanation to Redis
-        await redis_client.publish(
+        result_publisher.publish(
             "fraud_explanations",
             json.dumps(explanation)
         )
     except Exception as e:
-        print(f"Error generating explanation: {e}")
+        logger.warning("Error generating explanation: %s", e)
 
 
 if __name__ == "__main__":
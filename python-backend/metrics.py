@@ -0,0 +1,261 @@
+"""
+Low-overhead pipeline metrics in the Prometheus text format
+
+Histograms, counters and gauges are plain Python objects updated from the
+event loop thread, so recording takes no lock: an observation is a bisect
+plus two additions. Queue depths and other values owned by other
+components are read through callbacks only when /metrics is scraped.
+"""
+import math
+from bisect import bisect_left
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+# Seconds; covers sub-millisecond model calls up to slow explanation and DB writes
+DEFAULT_BUCKETS = (
+    0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0
+)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = list(zip(names, values))
+    if extra:
+        pairs.append(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    """Base for a metric family with optional labels"""
+
+    type_name = "untyped"
+
+    def __init__(self, name: str, documentation: str, label_names: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        self._children: Dict[Tuple[str, ...], object] = {}
+        self._function: Optional[Callable[[], float]] = None
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def labels(self, *values: str):
+        """Child metric for one label combination"""
+        child = self._children.get(values)
+        if child is None:
+            child = self._children[values] = self._new_child()
+        return child
+
+    def set_function(self, function: Callable[[], float]):
+        """Read the value from `function` at scrape time"""
+        self._function = function
+
+    def _samples(self) -> List[Tuple[str, str, float]]:
+        if self._function is not None:
+            try:
+                value = self._function()
+            except Exception:
+                return []
+            if isinstance(value, dict):
+                # Labelled callback: {label value(s): sample value}
+                return [
+                    (self.name, _format_labels(self.label_names, key if isinstance(key, tuple) else (key,)), v)
+                    for key, v in value.items()
+                ]
+            return [(self.name, "", value)]
+        return [
+            sample
+            for values, child in self._children.items()
+            for sample in child.samples(self.name, self.label_names, values)
+        ]
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type_name}"]
+        lines.extend(f"{name}{labels} {_format_value(value)}" for name, labels, value in self._samples())
+        return lines
+
+
+class _ValueChild:
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0):
+        self.value += amount
+
+    def dec(self, amount: float = 1.0):
+        self.value -= amount
+
+    def set(self, value: float):
+        self.value = value
+
+    def samples(self, name, label_names, values):
+        return [(name, _format_labels(label_names, values), self.value)]
+
+
+class Counter(_Metric):
+    """Monotonic counter"""
+
+    type_name = "counter"
+
+    def _new_child(self):
+        return _ValueChild()
+
+    def inc(self, amount: float = 1.0):
+        self.labels().inc(amount)
+
+
+class Gauge(_Metric):
+    """Value that goes up and down"""
+
+    type_name = "gauge"
+
+    def _new_child(self):
+        return _ValueChild()
+
+    def inc(self, amount: float = 1.0):
+        self.labels().inc(amount)
+
+    def dec(self, amount: float = 1.0):
+        self.labels().dec(amount)
+
+    def set(self, value: float):
+        self.labels().set(value)
+
+
+class _HistogramChild:
+    __slots__ = ("upper_bounds", "counts", "sum")
+
+    def __init__(self, upper_bounds: Tuple[float, ...]):
+        self.upper_bounds = upper_bounds
+        # One slot per bucket plus +Inf; cumulated only when rendering
+        self.counts = [0] * (len(upper_bounds) + 1)
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.upper_bounds, value)] += 1
+        self.sum += value
+
+    def samples(self, name, label_names, values):
+        result = []
+        cumulative = 0
+        for bound, count in zip(self.upper_bounds + (math.inf,), self.counts):
+            cumulative += count
+            le = "+Inf" if math.isinf(bound) else repr(bound)
+            result.append((f"{name}_bucket", _format_labels(label_names, values, ("le", le)), cumulative))
+        result.append((f"{name}_sum", _format_labels(label_names, values), self.sum))
+        result.append((f"{name}_count", _format_labels(label_names, values), cumulative))
+        return result
+
+
+class Histogram(_Metric):
+    """Bucketed distribution of observed values"""
+
+    type_name = "histogram"
+
+    def __init__(self, name: str, documentation: str, label_names: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, label_names)
+        self.upper_bounds = tuple(sorted(buckets))
+
+    def _new_child(self):
+        return _HistogramChild(self.upper_bounds)
+
+    def observe(self, value: float):
+        self.labels().observe(value)
+
+
+class MetricsRegistry:
+    """Collection of metric families rendered together"""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format"""
+        lines = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+STAGE_SECONDS = registry.register(Histogram(
+    "fraud_stage_duration_seconds",
+    "Time spent in each processing stage",
+    label_names=("stage",)
+))
+TRANSACTIONS_PROCESSED = registry.register(Counter(
+    "fraud_transactions_processed_total",
+    "Transactions scored by the ingestion pipeline",
+    label_names=("risk_level",)
+))
+ERRORS = registry.register(Counter(
+    "fraud_errors_total",
+    "Errors by pipeline stage",
+    label_names=("stage",)
+))
+IN_FLIGHT = registry.register(Gauge(
+    "fraud_in_flight_transactions",
+    "Transactions currently being processed"
+))
+STARTUP_SECONDS = registry.register(Gauge(
+    "fraud_startup_step_seconds",
+    "Duration of each startup step",
+    label_names=("step",)
+))
+LANE_LATENCY = registry.register(Histogram(
+    "fraud_lane_latency_seconds",
+    "Receive-to-publish latency per priority lane",
+    label_names=("lane",)
+))
+LANE_SLO_VIOLATIONS = registry.register(Counter(
+    "fraud_lane_slo_violations_total",
+    "Transactions that exceeded their lane's latency SLO",
+    label_names=("lane",)
+))
+SHUTDOWN_DISCARDED = registry.register(Counter(
+    "fraud_shutdown_discarded_total",
+    "Accepted transactions (or deferred explanations) dropped because shutdown could not drain them",
+    label_names=("stage",)
+))
+
+# Pre-resolved children keep label lookups off the hot path
+PARSE = STAGE_SECONDS.labels("parse")
+FEATURES = STAGE_SECONDS.labels("features")
+PREDICT = STAGE_SECONDS.labels("predict")
+EXPLAIN = STAGE_SECONDS.labels("explain")
+DB_WRITE = STAGE_SECONDS.labels("db_write")
+PUBLISH = STAGE_SECONDS.labels("publish")
+END_TO_END = STAGE_SECONDS.labels("end_to_end")
+PUBLISH_FLUSH = STAGE_SECONDS.labels("publish_flush")
+IN_FLIGHT.set(0)
+
+
+def register_callback(name: str, documentation: str, function: Callable[[], float],
+                      type_name: str = "gauge", label_names: Sequence[str] = ()) -> _Metric:
+    """Register a metric whose value is read from `function` at scrape time
+
+    With `label_names`, `function` returns a dict keyed by label value(s).
+    """
+    metric_type = Counter if type_name == "counter" else Gauge
+    metric = metric_type(name, documentation, label_names)
+    metric.set_function(function)
+    return registry.register(metric)
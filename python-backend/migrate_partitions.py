@@ -0,0 +1,106 @@
+"""
+One-off conversion of an unpartitioned transactions table to range partitions
+
+Tables created before partitioning keep working, but init_db leaves them
+alone and partition maintenance skips them. This renames the old table
+(and its indexes) out of the way, creates the partitioned table, creates
+partitions covering the rows still inside retention and copies every row
+across; rows older than retention land in the DEFAULT partition and go at
+the next maintenance run. Stop the backend and anything else writing
+transactions first. The old table is kept as transactions_unpartitioned
+unless --drop-old is given. Only the columns the old table has are copied;
+a JSON features column from before feature_vector is converted on the way.
+
+Usage (from python-backend):
+    python migrate_partitions.py [--drop-old]
+"""
+import argparse
+from datetime import datetime, timedelta
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from config import get_settings
+from database import SessionLocal, TransactionDB, features_to_vector_sql
+from feature_extractor import FEATURE_SCHEMA_VERSION
+import partitions
+import logs
+
+logger = logs.get_logger("migrate_partitions")
+
+settings = get_settings()
+
+OLD_TABLE = f"{partitions.PARENT_TABLE}_unpartitioned"
+
+
+
+def copy_columns(db: Session) -> tuple:
+    """Target column list and matching SELECT list for copying the old table
+
+    write_xid is left to its default: old rows get the migration's write position.
+    """
+    existing = set(db.execute(
+        text("SELECT column_name FROM information_schema.columns "
+             "WHERE table_schema = current_schema() AND table_name = :table"),
+        {"table": OLD_TABLE}
+    ).scalars())
+    targets, sources = [], []
+    for column in TransactionDB.__table__.columns:
+        if column.name == "write_xid":
+            continue
+        if column.name in existing:
+            targets.append(f'"{column.name}"')
+            sources.append(f'"{column.name}"')
+        elif "features" in existing and column.name == "feature_vector":
+            targets.append('"feature_vector"')
+            sources.append(f"CASE WHEN features IS NULL THEN NULL ELSE {features_to_vector_sql()} END")
+        elif "features" in existing and column.name == "feature_schema_version":
+            targets.append('"feature_schema_version"')
+            sources.append(f"CASE WHEN features IS NULL THEN NULL ELSE {FEATURE_SCHEMA_VERSION} END")
+    return ", ".join(targets), ", ".join(sources)
+
+
+def migrate(db: Session, drop_old: bool = False) -> int:
+    """Convert the transactions table to a partitioned one; returns the rows copied"""
+    if partitions.is_partitioned(db):
+        logger.info("✅ %s is already partitioned", partitions.PARENT_TABLE)
+        return 0
+
+    # Index names are schema-wide, so the old ones must make way for the new table's
+    indexes = db.execute(
+        text("SELECT indexname FROM pg_indexes WHERE schemaname = current_schema() AND tablename = :table"),
+        {"table": partitions.PARENT_TABLE}
+    ).scalars().all()
+    db.execute(text(f"ALTER TABLE {partitions.PARENT_TABLE} RENAME TO {OLD_TABLE}"))
+    for name in indexes:
+        db.execute(text(f'ALTER INDEX "{name}" RENAME TO "{name}_unpartitioned"'))
+    TransactionDB.__table__.create(bind=db.connection())
+    db.commit()
+
+    oldest = db.execute(text(f'SELECT min("timestamp") FROM {OLD_TABLE}')).scalar()
+    cutoff = datetime.utcnow() - timedelta(days=settings.retention_days)
+    created = partitions.ensure_partitions(db, start=max(oldest, cutoff).date() if oldest else None)
+    logger.info("🗂️  Created %d partitions", created)
+
+    targets, sources = copy_columns(db)
+    copied = db.execute(text(
+        f"INSERT INTO {partitions.PARENT_TABLE} ({targets}) SELECT {sources} FROM {OLD_TABLE}"
+    )).rowcount
+    if drop_old:
+        db.execute(text(f"DROP TABLE {OLD_TABLE}"))
+    db.commit()
+    return copied
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert the transactions table to range partitions")
+    parser.add_argument("--drop-old", action="store_true", help=f"Drop {OLD_TABLE} after copying")
+    args = parser.parse_args()
+
+    with SessionLocal() as db:
+        copied = migrate(db, drop_old=args.drop_old)
+    logger.info("✅ Copied %d rows into the partitioned table", copied)
+
+
+if __name__ == "__main__":
+    main()
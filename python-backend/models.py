@@ -61,6 +61,9 @@ class HealthCheck(BaseModel):
     status: str
     model_loaded: bool
     redis_connected: bool
+    ready: bool = False
+    degradation_mode: str = "normal"
+    queues: Dict[str, int] = {}
     timestamp: datetime = Field(default_factory=datetime.utcnow)
     
     model_config = {
@@ -76,6 +79,7 @@ class Stats(BaseModel):
     avg_risk_score: float
     model_type: str
     uptime_seconds: float
+    duplicates_dropped: int = 0
     
     model_config = {
         "protected_namespaces": ()  # Allow model_ prefix fields
@@ -0,0 +1,143 @@
+"""
+Time-based range partitioning for the transactions table
+
+The transactions table is partitioned by RANGE on its timestamp column, one
+partition per day (or week). Partitions are created ahead of time, and
+retention drops whole partitions instead of deleting rows one by one, so
+retention is by event time (timestamp), not by insert time (created_at).
+
+PostgreSQL requires the partition key in every unique constraint, so the
+primary key is (transaction_id, timestamp) and the database alone no
+longer rejects a repeated transaction_id with a different timestamp.
+IDs are kept unique at ingestion by the dedup cache (dedup.py).
+
+Tables created before partitioning are converted with migrate_partitions.py.
+"""
+import re
+from datetime import date, datetime, timedelta
+from typing import List, Optional, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from config import get_settings
+import logs
+
+logger = logs.get_logger("partitions")
+
+settings = get_settings()
+
+PARENT_TABLE = "transactions"
+DEFAULT_PARTITION = f"{PARENT_TABLE}_default"
+
+_BOUND_PATTERN = re.compile(r"FROM \('([^']+)'\) TO \('([^']+)'\)")
+
+
+def _period_length() -> timedelta:
+    """Length of one partition"""
+    return timedelta(days=7) if settings.partition_interval == "week" else timedelta(days=1)
+
+
+def _period_start(day: date) -> date:
+    """First day of the partition containing `day`"""
+    if settings.partition_interval == "week":
+        return day - timedelta(days=day.weekday())
+    return day
+
+
+def partition_name(start: date) -> str:
+    """Name of the partition starting at `start`"""
+    return f"{PARENT_TABLE}_p{start:%Y%m%d}"
+
+
+def is_partitioned(db: Session) -> bool:
+    """True if the transactions table is a partitioned table"""
+    relkind = db.execute(
+        text("SELECT relkind FROM pg_class WHERE oid = to_regclass(:name)"),
+        {"name": PARENT_TABLE}
+    ).scalar()
+    return relkind == "p"
+
+
+def list_partitions(db: Session) -> List[Tuple[str, Optional[datetime], Optional[datetime]]]:
+    """List (name, lower bound, upper bound) of every partition; bounds are None for DEFAULT"""
+    rows = db.execute(
+        text("""
+            SELECT c.relname, pg_get_expr(c.relpartbound, c.oid)
+            FROM pg_inherits i
+            JOIN pg_class c ON c.oid = i.inhrelid
+            WHERE i.inhparent = to_regclass(:parent)
+        """),
+        {"parent": PARENT_TABLE}
+    ).all()
+
+    partitions = []
+    for name, bound in rows:
+        match = _BOUND_PATTERN.search(bound or "")
+        if match:
+            partitions.append((
+                name,
+                datetime.fromisoformat(match.group(1)),
+                datetime.fromisoformat(match.group(2))
+            ))
+        else:
+            partitions.append((name, None, None))
+    return sorted(partitions, key=lambda p: p[1] or datetime.min)
+
+
+def create_partition(db: Session, start: date) -> bool:
+    """Create the partition starting at `start` if missing; returns False on conflict"""
+    end = start + _period_length()
+    try:
+        db.execute(text(
+            f"CREATE TABLE IF NOT EXISTS {partition_name(start)} PARTITION OF {PARENT_TABLE} "
+            f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+        ))
+        db.commit()
+        return True
+    except Exception as e:
+        # Overlapping bounds (interval changed) or rows for this range already in DEFAULT
+        db.rollback()
+        logger.warning("⚠️  Could not create partition %s: %s", partition_name(start), e)
+        return False
+
+
+def ensure_partitions(db: Session, today: Optional[date] = None, start: Optional[date] = None) -> int:
+    """Create the DEFAULT partition plus partitions from `start` (default today) through the premake window"""
+    if not is_partitioned(db):
+        return 0
+
+    db.execute(text(f"CREATE TABLE IF NOT EXISTS {DEFAULT_PARTITION} PARTITION OF {PARENT_TABLE} DEFAULT"))
+    db.commit()
+
+    existing = {name for name, _, _ in list_partitions(db)}
+    today = today or datetime.utcnow().date()
+    last = _period_start(today) + settings.partition_premake * _period_length()
+    period = _period_start(min(start or today, today))
+    created = 0
+    while period <= last:
+        if partition_name(period) not in existing and create_partition(db, period):
+            created += 1
+        period += _period_length()
+    return created
+
+
+def drop_partition(db: Session, name: str):
+    """Detach and drop a partition (caller commits)"""
+    db.execute(text(f"ALTER TABLE {PARENT_TABLE} DETACH PARTITION {name}"))
+    db.execute(text(f"DROP TABLE {name}"))
+
+
+def purge_default_partition(db: Session, cutoff: datetime) -> Tuple[int, int, float]:
+    """Delete rows older than `cutoff` from DEFAULT; returns (count, fraud count, risk sum)"""
+    return tuple(db.execute(
+        text(f"""
+            WITH removed AS (
+                DELETE FROM {DEFAULT_PARTITION} WHERE "timestamp" < :cutoff
+                RETURNING is_fraud, fraud_probability
+            )
+            SELECT count(*), count(*) FILTER (WHERE is_fraud), coalesce(sum(fraud_probability), 0.0)
+            FROM removed
+        """),
+        {"cutoff": cutoff}
+    ).one())
@@ -2,11 +2,16 @@
 Pre-trained Logistic Regression Fraud Detector
 Uses sklearn with realistic fraud patterns
 """
+import logging
 import numpy as np
-from typing import Tuple, Dict
+from typing import Tuple, Dict, List, Optional
 import pickle
 import os
 
+import logs
+
+logger = logs.get_logger("detector")
+
 
 class PretrainedFraudDetector:
     """Pre-trained logistic regression fraud detector"""
@@ -20,7 +25,7 @@ class PretrainedFraudDetector:
         try:
             from sklearn.linear_model import LogisticRegression
         except ImportError:
-            print("⚠️  scikit-learn not installed, using fallback model")
+            logger.warning("⚠️  scikit-learn not installed, using fallback model")
             return None
         
         # Generate realistic training data
@@ -101,8 +106,7 @@ class PretrainedFraudDetector:
         )
         model.fit(X, y)
         
-        print(f"✅ Pre-trained Logistic Regression model loaded")
-        print(f"   Training accuracy: {model.score(X, y):.1%}")
+        logger.info("✅ Pre-trained Logistic Regression model loaded (training accuracy %.1f%%)", model.score(X, y) * 100)
         
         return model
     
@@ -112,14 +116,41 @@ class PretrainedFraudDetector:
             # Fallback: simple heuristic
             return self._fallback_predict(features)
         
+        rule_result = self._apply_rules(features)
+        if rule_result is not None:
+            return rule_result
+        
+        # Default: Use ML model for normal cases
+        X = np.array([features])
+        return self._ml_result(features, self.model.predict_proba(X)[0][1])
+    
+    def predict_batch(self, features: np.ndarray) -> List[Tuple[float, Dict]]:
+        """Predict fraud probabilities for a feature matrix (one row per transaction)
+        
+        Rows not decided by the rules are scored with a single predict_proba call.
+        """
+        if self.model is None:
+            return [self._fallback_predict(row.reshape(1, -1)) for row in features]
+        
+        results: List[Optional[Tuple[float, Dict]]] = [self._apply_rules(row) for row in features]
+        ml_rows = [i for i, result in enumerate(results) if result is None]
+        if ml_rows:
+            probabilities = self.model.predict_proba(features[ml_rows])[:, 1]
+            for i, ml_fraud_prob in zip(ml_rows, probabilities):
+                results[i] = self._ml_result(features[i], ml_fraud_prob)
+        return results
+    
+    def _apply_rules(self, features) -> Optional[Tuple[float, Dict]]:
+        """Rule-based score for edge cases, or None to defer to the ML model"""
         amount = features[0]
         user_avg = features[5] if features[5] > 0 else 100  # Default avg
         txns_last_hour = features[10]
         amount_vs_avg = features[9]
         
-        # Debug: Print high-value transactions
-        if amount > 400:
-            print(f"🔍 HIGH VALUE: ${amount:.2f}, user_avg=${user_avg:.2f}, deviation={amount_vs_avg:.2f}x, velocity={txns_last_hour}")
+        # Debug: log high-value transactions (skipped entirely unless debug is on)
+        if amount > 400 and logger.isEnabledFor(logging.DEBUG):
+            logger.debug("🔍 HIGH VALUE: $%.2f, user_avg=$%.2f, deviation=%.2fx, velocity=%s",
+                         amount, user_avg, amount_vs_avg, txns_last_hour)
         
         # HYBRID APPROACH: Use rules for edge cases, ML for normal cases
         
@@ -156,9 +187,12 @@ class PretrainedFraudDetector:
                 'velocity': txns_last_hour
             }
         
-        # Default: Use ML model for normal cases
-        X = np.array([features])
-        ml_fraud_prob = self.model.predict_proba(X)[0][1]
+        return None
+    
+    def _ml_result(self, features, ml_fraud_prob: float) -> Tuple[float, Dict]:
+        """Final score and importance from the ML probability"""
+        amount = features[0]
+        amount_vs_avg = features[9]
         
         # Boost ML prediction if amount is high (prevent underscoring)
         if amount > 500:
@@ -0,0 +1,155 @@
+"""
+On-demand profiling for the running service
+
+Nothing is installed until a profile is requested, so there is no cost
+while profiling is off. One profile runs at a time, for a bounded duration:
+
+- sample: a background thread snapshots the event loop thread's stack
+  every few milliseconds and returns collapsed stacks (one
+  "frame;frame;frame count" line per stack), the input format of
+  flamegraph.pl and speedscope. It never hooks the interpreter, so it is
+  the safe choice under live load.
+- cprofile: deterministic cProfile of the event loop thread, returned as
+  pstats text. Slows the profiled thread while it runs.
+- tracemalloc: traces allocations made during the window and returns the
+  top-N allocation sites still alive at the end.
+"""
+import asyncio
+import cProfile
+import io
+import os
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+
+import logs
+
+logger = logs.get_logger("profiling")
+
+MODES = ("sample", "cprofile", "tracemalloc")
+
+_lock = asyncio.Lock()
+
+
+class ProfilerBusy(Exception):
+    """Another profile is already running"""
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+def _collapse(frame) -> str:
+    """Root-first, semicolon-separated stack for one frame"""
+    labels = []
+    while frame is not None:
+        labels.append(_frame_label(frame))
+        frame = frame.f_back
+    return ";".join(reversed(labels))
+
+
+class StackSampler:
+    """Background thread sampling one thread's stack at a fixed interval"""
+
+    def __init__(self, thread_id: int, interval: float, all_threads: bool = False):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.all_threads = all_threads
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+
+    def _run(self):
+        own_id = threading.get_ident()
+        names = {t.ident: t.name for t in threading.enumerate()}
+        while not self._stop.wait(self.interval):
+            frames = sys._current_frames()
+            if self.all_threads:
+                for ident, frame in frames.items():
+                    if ident != own_id:
+                        name = names.get(ident, str(ident))
+                        self.stacks[f"{name};{_collapse(frame)}"] += 1
+            else:
+                frame = frames.get(self.thread_id)
+                if frame is not None:
+                    self.stacks[_collapse(frame)] += 1
+            self.samples += 1
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def collapsed(self) -> str:
+        """Collapsed-stack text, most frequent first"""
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+
+async def _sample(seconds: float, interval: float, all_threads: bool) -> str:
+    sampler = StackSampler(threading.get_ident(), interval, all_threads)
+    sampler.start()
+    try:
+        await asyncio.sleep(seconds)
+    finally:
+        await asyncio.to_thread(sampler.stop)
+    return sampler.collapsed()
+
+
+async def _cprofile(seconds: float, top: int) -> str:
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        await asyncio.sleep(seconds)
+    finally:
+        profiler.disable()
+    out = io.StringIO()
+    pstats.Stats(profiler, stream=out).sort_stats("cumulative").print_stats(top)
+    return out.getvalue()
+
+
+async def _tracemalloc(seconds: float, top: int) -> str:
+    already_tracing = tracemalloc.is_tracing()
+    if not already_tracing:
+        tracemalloc.start()
+    try:
+        await asyncio.sleep(seconds)
+        snapshot = tracemalloc.take_snapshot()
+    finally:
+        if not already_tracing:
+            tracemalloc.stop()
+    snapshot = snapshot.filter_traces((
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    ))
+    stats = snapshot.statistics("lineno")
+    total = sum(stat.size for stat in stats)
+    lines = [f"Top {top} allocation sites alive after {seconds:.1f}s ({total / 1024:.1f} KiB traced)"]
+    for index, stat in enumerate(stats[:top], 1):
+        frame = stat.traceback[0]
+        lines.append(f"{index:>3}. {frame.filename}:{frame.lineno}: {stat.size / 1024:.1f} KiB in {stat.count} blocks")
+    return "\n".join(lines) + "\n"
+
+
+async def run_profile(mode: str, seconds: float, interval: float = 0.005, top: int = 30,
+                      all_threads: bool = False) -> str:
+    """Run one bounded profile on the event loop; raises ProfilerBusy if one is running"""
+    if _lock.locked():
+        raise ProfilerBusy()
+    async with _lock:
+        started = time.perf_counter()
+        logger.info("🔬 Profiling (%s) for %.1fs", mode, seconds)
+        if mode == "sample":
+            result = await _sample(seconds, interval, all_threads)
+        elif mode == "cprofile":
+            result = await _cprofile(seconds, top)
+        else:
+            result = await _tracemalloc(seconds, top)
+        logger.info("🔬 Profile (%s) finished in %.1fs", mode, time.perf_counter() - started)
+        return result
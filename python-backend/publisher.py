@@ -0,0 +1,104 @@
+"""
+Batching Redis publisher
+
+Callers enqueue messages without awaiting Redis; a background task sends
+them in pipelines of up to `batch_size` commands, flushed when a batch
+fills or `flush_interval` seconds after the first pending message. One
+network round trip then carries a whole batch instead of one message.
+"""
+import asyncio
+import time
+from collections import deque
+from typing import Deque, Optional, Tuple, Union
+
+import logs
+import metrics
+
+logger = logs.get_logger("publisher")
+
+Message = Tuple[str, Union[str, bytes]]
+
+
+class BatchPublisher:
+    """Group PUBLISH (or XADD) commands into Redis pipelines"""
+
+    def __init__(self, redis_client, batch_size: int = 100, flush_interval: float = 0.005,
+                 max_pending: int = 10000, mode: str = "pubsub", stream_maxlen: Optional[int] = None):
+        self.redis_client = redis_client
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.mode = mode
+        self.stream_maxlen = stream_maxlen
+        self._pending: Deque[Message] = deque()
+        self._wake = asyncio.Event()
+        self._full = asyncio.Event()
+        self.stats = {
+            "messages_published": 0,
+            "batches_flushed": 0,
+            "messages_dropped": 0,
+            "publish_errors": 0,
+        }
+
+    def publish(self, channel: str, message: Union[str, bytes]):
+        """Enqueue a message; drops it if the backlog is full"""
+        if len(self._pending) >= self.max_pending:
+            self.stats["messages_dropped"] += 1
+            return
+        self._pending.append((channel, message))
+        self._wake.set()
+        if len(self._pending) >= self.batch_size:
+            self._full.set()
+
+    async def _send(self, batch):
+        """Send one batch in a single pipeline round trip"""
+        pipe = self.redis_client.pipeline(transaction=False)
+        for channel, message in batch:
+            if self.mode == "stream":
+                pipe.xadd(channel, {"data": message}, maxlen=self.stream_maxlen, approximate=True)
+            else:
+                pipe.publish(channel, message)
+        await pipe.execute()
+
+    async def flush(self):
+        """Send everything pending, one pipeline per batch"""
+        while self._pending:
+            count = min(self.batch_size, len(self._pending))
+            batch = [self._pending.popleft() for _ in range(count)]
+            try:
+                started = time.perf_counter()
+                await self._send(batch)
+                metrics.PUBLISH_FLUSH.observe(time.perf_counter() - started)
+                self.stats["messages_published"] += count
+                self.stats["batches_flushed"] += 1
+            except Exception as e:
+                self.stats["publish_errors"] += 1
+                self.stats["messages_dropped"] += count
+                logger.warning("⚠️  Redis publish error (%d messages dropped): %s", count, e)
+
+    async def run(self):
+        """Background task: flush by size or time until cancelled"""
+        try:
+            while True:
+                await self._wake.wait()
+                self._wake.clear()
+                if len(self._pending) < self.batch_size:
+                    # Give the batch up to flush_interval to fill
+                    try:
+                        await asyncio.wait_for(self._full.wait(), self.flush_interval)
+                    except asyncio.TimeoutError:
+                        pass
+                self._full.clear()
+                await self.flush()
+        except asyncio.CancelledError:
+            await self.flush()
+            raise
+
+    def get_stats(self) -> dict:
+        """Publish counters, backlog and average batch size"""
+        batches = self.stats["batches_flushed"]
+        return {
+            "pending": len(self._pending),
+            "avg_batch_size": self.stats["messages_published"] / batches if batches else 0.0,
+            **self.stats
+        }
@@ -0,0 +1,172 @@
+"""
+Read-through response cache for dashboard endpoints
+
+Many dashboards poll the same endpoints with the same parameters every few
+seconds. This cache keeps responses in process (optionally shared through
+Redis) for a short per-endpoint TTL, coalesces concurrent identical
+requests into a single load (single-flight), and drops entries by tag when
+the persistence stage writes new rows. With Redis, each tag also has a
+shared generation counter that every invalidation bumps, so a write in one
+worker invalidates the entries of all of them.
+"""
+import asyncio
+import json
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional, Tuple
+
+
+class ResponseCache:
+    """TTL cache with single-flight loading and tag-based invalidation
+
+    An entry is valid while it is younger than its TTL and newer than the
+    last invalidation of each of its tags, so invalidating a tag is O(1)
+    no matter how many entries carry it. With Redis, entries also record
+    the shared generation of their tags when loaded and are valid only
+    while those generations are unchanged; generations are re-read at most
+    once per `min_invalidation_interval`.
+    """
+
+    def __init__(self, max_entries: int = 1024, redis_client=None, namespace: str = "response_cache",
+                 min_invalidation_interval: float = 0.0):
+        self.max_entries = max_entries
+        self.min_invalidation_interval = min_invalidation_interval
+        self.redis_client = redis_client
+        self.namespace = namespace
+        # key -> (created_at, expires_at, tags, tag generations or None, value)
+        self._entries: "OrderedDict[str, Tuple[float, float, Tuple[str, ...], Optional[list], Any]]" = OrderedDict()
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._invalidated_at: Dict[str, float] = {}
+        # tag -> (read at, shared generation)
+        self._generations: Dict[str, Tuple[float, int]] = {}
+        self.stats = {"hits": 0, "misses": 0, "coalesced": 0, "invalidations": 0}
+
+    def _generation_key(self, tag: str) -> str:
+        return f"{self.namespace}:generation:{tag}"
+
+    async def _current_generations(self, tags: Tuple[str, ...], fresh: bool = False) -> list:
+        """Shared generation of each tag, re-read from Redis when older than the invalidation interval"""
+        now = time.monotonic()
+        stale = [tag for tag in tags
+                 if fresh or tag not in self._generations
+                 or now - self._generations[tag][0] >= self.min_invalidation_interval]
+        if stale:
+            values = await self.redis_client.mget([self._generation_key(tag) for tag in stale])
+            for tag, value in zip(stale, values):
+                self._generations[tag] = (now, int(value or 0))
+        return [self._generations[tag][1] for tag in tags]
+
+    async def _is_valid(self, created_at: float, expires_at: float, tags: Tuple[str, ...],
+                        generations: Optional[list]) -> bool:
+        """True if the entry has not expired or been invalidated here or, with Redis, anywhere"""
+        if time.monotonic() >= expires_at:
+            return False
+        if not all(created_at > self._invalidated_at.get(tag, 0.0) for tag in tags):
+            return False
+        if self.redis_client is None or not tags:
+            return True
+        try:
+            return generations == await self._current_generations(tags)
+        except Exception:
+            # Redis unavailable: local invalidations and the TTL still bound staleness
+            return True
+
+    def _store(self, key: str, created_at: float, ttl: float, tags: Tuple[str, ...],
+               generations: Optional[list], value: Any):
+        """Store an entry, evicting the oldest when full"""
+        self._entries[key] = (created_at, created_at + ttl, tags, generations, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def _redis_get(self, key: str, tags: Tuple[str, ...], generations: list) -> Optional[Any]:
+        """Read a shared entry from Redis if no worker has invalidated its tags since it was stored"""
+        raw = await self.redis_client.get(f"{self.namespace}:{key}")
+        if raw is None:
+            return None
+        payload = json.loads(raw)
+        if payload["generations"] != generations:
+            return None
+        return payload["value"]
+
+    async def _redis_set(self, key: str, ttl: float, generations: list, value: Any):
+        """Share an entry through Redis, with the tag generations it was loaded under"""
+        payload = json.dumps({"generations": generations, "value": value}, default=str)
+        await self.redis_client.set(f"{self.namespace}:{key}", payload, px=max(int(ttl * 1000), 1))
+
+    async def get_or_load(self, key: str, ttl: float, loader: Callable[[], Awaitable[Any]],
+                          tags: Iterable[str] = ()) -> Any:
+        """Return the cached value for `key`, loading it at most once concurrently"""
+        tags = tuple(tags)
+        entry = self._entries.get(key)
+        if entry is not None and await self._is_valid(*entry[:4]):
+            self.stats["hits"] += 1
+            return entry[4]
+
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            self.stats["coalesced"] += 1
+            return await asyncio.shield(inflight)
+
+        # The load runs as its own task so a disconnecting client cannot cancel it for the others
+        task = asyncio.ensure_future(self._load(key, ttl, loader, tags))
+        self._inflight[key] = task
+        task.add_done_callback(lambda t: self._load_done(key, t))
+        return await asyncio.shield(task)
+
+    def _load_done(self, key: str, task: asyncio.Task):
+        """Clear the in-flight marker and retrieve any exception"""
+        self._inflight.pop(key, None)
+        if not task.cancelled():
+            task.exception()
+
+    async def _load(self, key: str, ttl: float, loader: Callable[[], Awaitable[Any]],
+                    tags: Tuple[str, ...]) -> Any:
+        """Load from Redis (if shared) or the loader, then store locally"""
+        started_at = time.monotonic()
+        value = None
+        generations = None
+        if self.redis_client is not None:
+            try:
+                generations = await self._current_generations(tags, fresh=True)
+                value = await self._redis_get(key, tags, generations)
+            except Exception:
+                value = None
+
+        if value is None:
+            self.stats["misses"] += 1
+            value = await loader()
+            if generations is not None:
+                try:
+                    await self._redis_set(key, ttl, generations, value)
+                except Exception:
+                    pass
+        else:
+            self.stats["hits"] += 1
+
+        # Stamped with the load start: an invalidation during the load makes it stale at once
+        self._store(key, started_at, ttl, tags, generations, value)
+        return value
+
+    async def invalidate(self, *tags: str):
+        """Invalidate every entry carrying any of the tags, in every worker when shared
+
+        Under a steady write stream invalidations are rate-limited to one per
+        `min_invalidation_interval` per tag, so the cache keeps absorbing
+        reads; staleness is still bounded by the entry TTL.
+        """
+        now = time.monotonic()
+        for tag in tags:
+            if now - self._invalidated_at.get(tag, 0.0) < self.min_invalidation_interval:
+                continue
+            self._invalidated_at[tag] = now
+            self.stats["invalidations"] += 1
+            if self.redis_client is not None:
+                try:
+                    self._generations[tag] = (now, await self.redis_client.incr(self._generation_key(tag)))
+                except Exception:
+                    pass
+
+    def get_stats(self) -> dict:
+        """Hit/miss counters and current size"""
+        return {"entries": len(self._entries), **self.stats}
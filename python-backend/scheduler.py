@@ -0,0 +1,109 @@
+"""
+Per-key ordered scheduling
+
+Jobs for different keys (user IDs) run concurrently; jobs for the same key
+run one at a time, in submission order, which is what the per-user
+feature state needs. Keys with pending work take turns round-robin, one
+job per turn, so a user flooding the system gets one worker at a time
+and can never push other users' jobs behind its backlog.
+
+With several lanes, keys whose next job is in a higher-priority lane
+get their turn first (see lanes.LaneQueue); a key's lane is that of its
+oldest pending job, since its jobs cannot overtake each other anyway.
+
+The total number of scheduled jobs is bounded: `submit` waits once
+`max_pending` jobs are queued or running, which keeps backpressure
+flowing to the stage in front. `qsize()` / `maxsize` mirror asyncio.Queue
+so the degradation controller can watch the scheduler like any queue.
+"""
+import asyncio
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Hashable, Tuple
+
+from lanes import LaneQueue
+
+Job = Tuple[Callable[..., Awaitable[Any]], tuple, int, asyncio.Future]
+
+
+class KeyedScheduler:
+    """Concurrent across keys, serialized and ordered within a key"""
+
+    def __init__(self, concurrency: int = 8, max_pending: int = 1000, lanes: int = 1, min_share: float = 0.1):
+        self.concurrency = concurrency
+        self.maxsize = max_pending
+        # Keys present here are either waiting in _ready or running on a worker
+        self._jobs: Dict[Hashable, Deque[Job]] = {}
+        self._ready = LaneQueue(lanes, min_share=min_share)
+        self._slots = asyncio.Semaphore(max_pending)
+        self._pending = 0
+        self._running = 0
+        self.stats = {
+            "jobs_completed": 0,
+            "jobs_failed": 0,
+        }
+
+    def qsize(self) -> int:
+        """Jobs queued or running"""
+        return self._pending
+
+    async def submit(self, key: Hashable, function: Callable[..., Awaitable[Any]], *args,
+                     lane: int = 0) -> asyncio.Future:
+        """Schedule `function(*args)` under `key` in `lane`; waits while the scheduler is full"""
+        await self._slots.acquire()
+        future = asyncio.get_running_loop().create_future()
+        self._pending += 1
+        jobs = self._jobs.get(key)
+        if jobs is None:
+            jobs = self._jobs[key] = deque()
+            self._ready.put_nowait((lane, key))
+        jobs.append((function, args, lane, future))
+        return future
+
+    async def call(self, key: Hashable, function: Callable[..., Awaitable[Any]], *args, lane: int = 0) -> Any:
+        """Schedule a job and wait for its result"""
+        return await (await self.submit(key, function, *args, lane=lane))
+
+    async def _worker(self):
+        while True:
+            _, key = await self._ready.get()
+            jobs = self._jobs[key]
+            function, args, _, future = jobs.popleft()
+            self._running += 1
+            try:
+                if not future.cancelled():
+                    future.set_result(await function(*args))
+                self.stats["jobs_completed"] += 1
+            except asyncio.CancelledError:
+                future.cancel()
+                raise
+            except Exception as e:
+                self.stats["jobs_failed"] += 1
+                if not future.cancelled():
+                    future.set_exception(e)
+            finally:
+                self._running -= 1
+                self._pending -= 1
+                self._slots.release()
+                # Back of the line, so every other waiting key gets a turn first
+                if jobs:
+                    self._ready.put_nowait((jobs[0][2], key))
+                else:
+                    del self._jobs[key]
+
+    async def run(self):
+        """Background task: run the workers until cancelled"""
+        try:
+            await asyncio.gather(*(self._worker() for _ in range(self.concurrency)))
+        finally:
+            for jobs in self._jobs.values():
+                for _, _, _, future in jobs:
+                    future.cancel()
+
+    def get_stats(self) -> dict:
+        """Pending and running jobs and the number of keys with work"""
+        return {
+            "pending": self._pending,
+            "running": self._running,
+            "keys": len(self._jobs),
+            **self.stats
+        }
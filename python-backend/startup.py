@@ -0,0 +1,71 @@
+"""
+Startup step tracking
+
+Independent initialization steps (database schema, model training, Redis
+connection, ...) run concurrently. Each step's status and duration is
+recorded so the readiness endpoint, logs and metrics can report where a
+slow or failed start is spending its time.
+"""
+import asyncio
+import inspect
+import time
+from typing import Any, Callable, Iterable
+
+import logs
+import metrics
+
+logger = logs.get_logger("startup")
+
+PENDING = "pending"
+RUNNING = "running"
+READY = "ready"
+FAILED = "failed"
+
+
+class StartupTracker:
+    """Status and timing of each startup step"""
+
+    def __init__(self, steps: Iterable[str]):
+        self.steps = {name: {"status": PENDING, "seconds": None, "error": None} for name in steps}
+        self.started_at = time.perf_counter()
+        self.total_seconds = None
+        self.ready = False
+
+    @property
+    def failed(self) -> bool:
+        return any(step["status"] == FAILED for step in self.steps.values())
+
+    async def run(self, name: str, function: Callable, *args, in_thread: bool = False) -> Any:
+        """Run one step, in a worker thread if it blocks, recording how long it took"""
+        step = self.steps[name]
+        step["status"] = RUNNING
+        started = time.perf_counter()
+        try:
+            if in_thread:
+                result = await asyncio.to_thread(function, *args)
+            else:
+                result = function(*args)
+                if inspect.isawaitable(result):
+                    result = await result
+        except Exception as e:
+            step.update(status=FAILED, error=str(e), seconds=round(time.perf_counter() - started, 3))
+            logger.error("❌ Startup step %s failed after %.2fs: %s", name, step["seconds"], e)
+            raise
+        step.update(status=READY, seconds=round(time.perf_counter() - started, 3))
+        metrics.STARTUP_SECONDS.labels(name).set(step["seconds"])
+        logger.info("✅ %s ready in %.2fs", name, step["seconds"])
+        return result
+
+    def mark_ready(self):
+        """All steps are done and the pipeline is running"""
+        self.total_seconds = round(time.perf_counter() - self.started_at, 3)
+        self.ready = True
+        logger.info("🚀 Ready in %.2fs", self.total_seconds)
+
+    def report(self) -> dict:
+        return {
+            "ready": self.ready,
+            "failed": self.failed,
+            "total_seconds": self.total_seconds,
+            "steps": self.steps
+        }
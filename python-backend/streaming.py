@@ -0,0 +1,125 @@
+"""
+Live result fan-out for dashboards (Server-Sent Events)
+
+One Redis subscription to the results channel per API process, fanned out
+to every connected client through a small bounded queue per client. A
+client that cannot keep up is evicted rather than allowed to buffer without
+limit; it reconnects and catches up with /recent?since=<cursor>.
+"""
+import asyncio
+from typing import Optional, Set
+
+import codec
+import logs
+
+logger = logs.get_logger("stream")
+
+
+class Subscriber:
+    """A connected stream client with its filters and bounded buffer"""
+
+    def __init__(self, buffer_size: int, risk_levels: Optional[Set[str]] = None,
+                 user_id: Optional[str] = None):
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=buffer_size)
+        self.risk_levels = risk_levels or None
+        self.user_id = user_id
+        self.evicted = False
+
+    @property
+    def has_filters(self) -> bool:
+        """True if this client filters results server-side"""
+        return self.risk_levels is not None or self.user_id is not None
+
+    def matches(self, result: dict) -> bool:
+        """Server-side filter on risk_level and user_id"""
+        if self.risk_levels is not None and result.get("risk_level") not in self.risk_levels:
+            return False
+        if self.user_id is not None and result.get("user_id") != self.user_id:
+            return False
+        return True
+
+    def evict(self):
+        """Drop buffered messages and wake the client with an end-of-stream marker"""
+        self.evicted = True
+        while not self.queue.empty():
+            self.queue.get_nowait()
+        self.queue.put_nowait(None)
+
+
+class ResultBroadcaster:
+    """Single Redis subscriber fanning results out to many stream clients"""
+
+    def __init__(self, redis_client, channel: str, buffer_size: int = 256, max_clients: int = 1000):
+        self.redis_client = redis_client
+        self.channel = channel
+        self.buffer_size = buffer_size
+        self.max_clients = max_clients
+        self.subscribers: Set[Subscriber] = set()
+        self.stats = {
+            "messages_received": 0,
+            "messages_delivered": 0,
+            "clients_evicted": 0,
+            "messages_unparsable": 0,
+        }
+
+    def subscribe(self, risk_levels: Optional[Set[str]] = None,
+                  user_id: Optional[str] = None) -> Optional[Subscriber]:
+        """Register a client; returns None when at capacity"""
+        if len(self.subscribers) >= self.max_clients:
+            return None
+        subscriber = Subscriber(self.buffer_size, risk_levels, user_id)
+        self.subscribers.add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber):
+        """Remove a client"""
+        self.subscribers.discard(subscriber)
+
+    def publish(self, data: str):
+        """Fan one raw result message out to every matching client"""
+        self.stats["messages_received"] += 1
+        if not self.subscribers:
+            return
+
+        result = None
+        if any(s.has_filters for s in self.subscribers):
+            try:
+                result = codec.loads(data)
+            except ValueError:
+                # Filters cannot be checked, but unfiltered clients still get the raw message
+                self.stats["messages_unparsable"] += 1
+
+        for subscriber in list(self.subscribers):
+            if subscriber.evicted:
+                continue
+            if subscriber.has_filters and (result is None or not subscriber.matches(result)):
+                continue
+            try:
+                subscriber.queue.put_nowait(data)
+                self.stats["messages_delivered"] += 1
+            except asyncio.QueueFull:
+                # Slow consumer: evict instead of buffering without bound
+                subscriber.evict()
+                self.unsubscribe(subscriber)
+                self.stats["clients_evicted"] += 1
+
+    async def run(self):
+        """Background task: subscribe once and fan out until cancelled"""
+        pubsub = self.redis_client.pubsub()
+        await pubsub.subscribe(self.channel)
+        logger.info("📡 Streaming results from Redis channel '%s'", self.channel)
+        try:
+            async for message in pubsub.listen():
+                if message["type"] == "message":
+                    self.publish(message["data"])
+        except asyncio.CancelledError:
+            for subscriber in list(self.subscribers):
+                subscriber.evict()
+            self.subscribers.clear()
+            await pubsub.unsubscribe(self.channel)
+            await pubsub.close()
+            raise
+
+    def get_stats(self) -> dict:
+        """Connected clients and fan-out counters"""
+        return {"clients": len(self.subscribers), **self.stats}
@@ -0,0 +1,226 @@
+"""AIReasoner's Ollama path against a local stub server"""
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+import ai_reasoner
+from ai_reasoner import AIReasoner
+from circuit_breaker import CLOSED, HALF_OPEN, OPEN
+from config import get_settings
+
+FEATURES = {"amount": 900.0, "amount_vs_avg": 6.0, "txns_last_hour": 8.0, "hour_of_day": 3.0}
+IMPORTANCE = {"amount_vs_avg": 0.6, "txns_last_hour": 0.3, "model": "pretrained_lr"}
+
+
+class StubOllama(ThreadingHTTPServer):
+    """Answers /api/generate with `status` (and `body`, if set) after `delay` seconds; records client ports"""
+
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), _Handler)
+        self.status = 200
+        self.delay = 0.0
+        self.body = None
+        self.requests = 0
+        self.client_ports = set()
+        self._lock = threading.Lock()
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # Keep-alive, so connection reuse is visible
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers["Content-Length"]))
+        with self.server._lock:
+            self.server.requests += 1
+            self.server.client_ports.add(self.client_address[1])
+        time.sleep(self.server.delay)
+        body = self.server.body or json.dumps({"response": "Stub explanation."}).encode()
+        self.send_response(self.server.status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    stub = StubOllama()
+    thread = threading.Thread(target=stub.serve_forever, daemon=True)
+    thread.start()
+    yield stub
+    stub.shutdown()
+    stub.server_close()
+
+
+def _reasoner(monkeypatch, server: StubOllama, **overrides) -> AIReasoner:
+    settings = get_settings().model_copy(update={
+        "enable_ai_reasoning": True,
+        "ai_reasoning_mode": "ollama",
+        "ollama_url": server.url,
+        "explanation_cache_enabled": False,
+        **overrides
+    })
+    monkeypatch.setattr(ai_reasoner, "get_settings", lambda: settings)
+    return AIReasoner()
+
+
+async def _explain(reasoner: AIReasoner, txn_id: str = "txn_1") -> dict:
+    return await reasoner.explain_fraud(txn_id, 0.9, "high", FEATURES, IMPORTANCE)
+
+
+def _from_ollama(result: dict) -> bool:
+    # Only Ollama answers name a model; the rule-based fallback does not
+    return "ai_model" in result
+
+
+def test_success_uses_one_pooled_connection(monkeypatch, server):
+    reasoner = _reasoner(monkeypatch, server)
+
+    async def run():
+        try:
+            results = [await _explain(reasoner, f"txn_{n}") for n in range(5)]
+            assert reasoner._get_client() is reasoner._get_client()
+            return results
+        finally:
+            await reasoner.aclose()
+
+    results = asyncio.run(run())
+    assert all(_from_ollama(result) for result in results)
+    assert results[0]["explanation"] == "Stub explanation."
+    assert server.requests == 5
+    assert len(server.client_ports) == 1
+    assert reasoner.stats["succeeded"] == 5
+
+
+def test_breaker_opens_after_failures_and_skips_the_server(monkeypatch, server):
+    server.status = 500
+    reasoner = _reasoner(monkeypatch, server, ollama_breaker_failures=3, ollama_breaker_reset_seconds=60.0)
+
+    async def run():
+        try:
+            return [await _explain(reasoner) for _ in range(5)]
+        finally:
+            await reasoner.aclose()
+
+    results = asyncio.run(run())
+    assert not any(_from_ollama(result) for result in results)
+    assert server.requests == 3
+    assert reasoner.breaker.state == OPEN
+    assert reasoner.stats["failed"] == 3
+    assert reasoner.stats["short_circuited"] == 2
+
+
+def test_half_open_sends_a_single_probe(monkeypatch, server):
+    server.status = 500
+    reasoner = _reasoner(monkeypatch, server, ollama_breaker_failures=1, ollama_breaker_reset_seconds=0.2)
+
+    async def run():
+        try:
+            await _explain(reasoner)
+            assert reasoner.breaker.state == OPEN
+            server.status, server.delay = 200, 0.1
+            await asyncio.sleep(0.25)
+            # Concurrent callers while the probe is out fall back instead of piling on
+            return await asyncio.gather(*(_explain(reasoner, f"txn_{n}") for n in range(4)))
+        finally:
+            await reasoner.aclose()
+
+    results = asyncio.run(run())
+    assert sum(_from_ollama(result) for result in results) == 1
+    assert server.requests == 2
+    assert reasoner.breaker.state == CLOSED
+    assert reasoner.stats["short_circuited"] == 3
+
+
+def test_deadline_expiry_falls_back_and_counts_as_failure(monkeypatch, server):
+    server.delay = 1.0
+    reasoner = _reasoner(monkeypatch, server, ollama_deadline_seconds=0.2, ollama_breaker_failures=1)
+
+    async def run():
+        try:
+            started = time.perf_counter()
+            result = await _explain(reasoner)
+            return result, time.perf_counter() - started
+        finally:
+            await reasoner.aclose()
+
+    result, elapsed = asyncio.run(run())
+    assert not _from_ollama(result)
+    assert elapsed < 0.8
+    assert reasoner.stats["timed_out"] == 1
+    assert reasoner.breaker.state == OPEN
+
+
+def test_saturated_slots_fall_back_without_tripping_the_breaker(monkeypatch, server):
+    reasoner = _reasoner(monkeypatch, server, ollama_max_concurrency=1, ollama_deadline_seconds=0.1,
+                         ollama_breaker_failures=1)
+
+    async def run():
+        try:
+            await reasoner._slots.acquire()  # Every generation slot busy
+            saturated = [await _explain(reasoner, f"txn_{n}") for n in range(3)]
+            reasoner._slots.release()
+            return saturated, await _explain(reasoner, "txn_after")
+        finally:
+            await reasoner.aclose()
+
+    saturated, after = asyncio.run(run())
+    assert not any(_from_ollama(result) for result in saturated)
+    assert reasoner.stats["saturated"] == 3
+    assert reasoner.breaker.state == CLOSED and reasoner.breaker.failures == 0
+    assert _from_ollama(after)
+    assert server.requests == 1
+
+
+def test_cancelled_probe_does_not_wedge_the_breaker(monkeypatch, server):
+    server.status = 500
+    reasoner = _reasoner(monkeypatch, server, ollama_breaker_failures=1, ollama_breaker_reset_seconds=0.2)
+
+    async def run():
+        try:
+            await _explain(reasoner)
+            server.status, server.delay = 200, 1.0
+            await asyncio.sleep(0.25)
+            probe = asyncio.create_task(_explain(reasoner))
+            await asyncio.sleep(0.1)
+            assert reasoner.breaker.state == HALF_OPEN
+            probe.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await probe
+            server.delay = 0.0
+            return await _explain(reasoner, "txn_after")
+        finally:
+            await reasoner.aclose()
+
+    after = asyncio.run(run())
+    assert _from_ollama(after)
+    assert reasoner.breaker.state == CLOSED
+
+
+def test_malformed_body_counts_as_failure(monkeypatch, server):
+    server.body = b"not json"
+    reasoner = _reasoner(monkeypatch, server, ollama_breaker_failures=1)
+
+    async def run():
+        try:
+            return await _explain(reasoner)
+        finally:
+            await reasoner.aclose()
+
+    result = asyncio.run(run())
+    assert not _from_ollama(result)
+    assert reasoner.stats["failed"] == 1 and reasoner.stats["succeeded"] == 0
+    assert reasoner.breaker.state == OPEN
@@ -0,0 +1,62 @@
+import asyncio
+
+import backpressure
+from backpressure import DegradationController
+
+
+def _fill(queue: asyncio.Queue, size: int):
+    while queue.qsize() > size:
+        queue.get_nowait()
+    while queue.qsize() < size:
+        queue.put_nowait(object())
+
+
+def test_fill_ratio_follows_the_fullest_bounded_queue():
+    ingest, persist, unbounded = asyncio.Queue(maxsize=10), asyncio.Queue(maxsize=100), asyncio.Queue()
+    controller = DegradationController({"ingest": ingest, "persist": persist, "unbounded": unbounded})
+    _fill(ingest, 3)
+    _fill(persist, 50)
+    _fill(unbounded, 1000)
+    assert controller.fill_ratio() == 0.5
+
+
+def test_steps_up_through_every_mode_at_once():
+    queue = asyncio.Queue(maxsize=100)
+    controller = DegradationController({"ingest": queue}, min_dwell=0.0)
+    _fill(queue, 60)
+    assert controller.update() == backpressure.DEFER_AI
+    _fill(queue, 95)
+    assert controller.update() == backpressure.SHED
+    assert controller.stats["mode_changes"] == 2
+
+
+def test_steps_down_only_past_hysteresis_and_dwell(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(backpressure.time, "monotonic", lambda: now[0])
+    queue = asyncio.Queue(maxsize=100)
+    controller = DegradationController({"ingest": queue}, hysteresis=0.2, min_dwell=5.0)
+    _fill(queue, 80)
+    assert controller.update() == backpressure.CHEAP_MODEL
+
+    # Below the entry threshold but within the hysteresis band: stays
+    _fill(queue, 60)
+    now[0] += 10
+    assert controller.update() == backpressure.CHEAP_MODEL
+
+    # Far enough down, but the mode has not lasted min_dwell yet
+    _fill(queue, 10)
+    controller._changed_at = now[0]
+    now[0] += 1
+    assert controller.update() == backpressure.CHEAP_MODEL
+
+    now[0] += 5
+    assert controller.update() == backpressure.NORMAL
+
+
+def test_shed_is_bounded_and_counted():
+    controller = DegradationController({}, deferred_max=2)
+    assert controller.shed("a") and controller.shed("b")
+    assert not controller.shed("c")
+    stats = controller.get_stats()
+    assert (stats["deferred"], stats["shed"], stats["shed_dropped"]) == (2, 2, 1)
+    assert stats["mode"] == "normal"
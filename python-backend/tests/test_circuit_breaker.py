@@ -0,0 +1,74 @@
+import circuit_breaker
+from circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker
+
+
+def _clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(circuit_breaker.time, "monotonic", lambda: now[0])
+    return now
+
+
+def _trip(breaker: CircuitBreaker):
+    for _ in range(breaker.failure_threshold):
+        assert breaker.allow()
+        breaker.record_failure()
+
+
+def test_opens_after_consecutive_failures_only(monkeypatch):
+    _clock(monkeypatch)
+    breaker = CircuitBreaker("test", failure_threshold=3, reset_timeout=10.0)
+    breaker.record_failure()
+    breaker.record_failure()
+    breaker.record_success()  # Resets the count
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.state == CLOSED and breaker.allow()
+
+    breaker.record_failure()
+    assert breaker.state == OPEN
+    assert not breaker.allow()
+
+
+def test_half_open_lets_exactly_one_probe_through(monkeypatch):
+    now = _clock(monkeypatch)
+    breaker = CircuitBreaker("test", failure_threshold=2, reset_timeout=10.0)
+    _trip(breaker)
+
+    now[0] += 9.9
+    assert not breaker.allow()
+    now[0] += 0.1
+    assert breaker.allow()
+    assert breaker.state == HALF_OPEN
+    assert not breaker.allow()
+
+    breaker.record_success()
+    assert breaker.state == CLOSED and breaker.failures == 0
+    assert breaker.allow() and breaker.allow()
+
+
+def test_failed_probe_reopens_for_another_timeout(monkeypatch):
+    now = _clock(monkeypatch)
+    breaker = CircuitBreaker("test", failure_threshold=2, reset_timeout=10.0)
+    _trip(breaker)
+    now[0] += 10.0
+    assert breaker.allow()
+
+    breaker.record_failure()
+    assert breaker.state == OPEN
+    now[0] += 5.0
+    assert not breaker.allow()
+    now[0] += 5.0
+    assert breaker.allow()
+
+
+def test_released_probe_can_be_retried(monkeypatch):
+    now = _clock(monkeypatch)
+    breaker = CircuitBreaker("test", failure_threshold=1, reset_timeout=10.0)
+    _trip(breaker)
+    now[0] += 10.0
+    assert breaker.allow()
+
+    breaker.release()
+    assert breaker.state == HALF_OPEN
+    assert breaker.allow()
+    assert not breaker.allow()
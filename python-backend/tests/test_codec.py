@@ -0,0 +1,60 @@
+import json
+
+import numpy as np
+import pytest
+
+import codec
+from models import Transaction
+
+MESSAGE = json.dumps({
+    "transaction_id": "txn-1",
+    "user_id": "user_1",
+    "amount": 125.5,
+    "transaction_type": "purchase",
+    "merchant_id": "merchant_1",
+    "timestamp": "2024-05-01T12:00:00Z",
+    "metadata": {"channel": "web"}
+})
+
+PATHS = [False, pytest.param(True, marks=pytest.mark.skipif(codec.orjson is None, reason="orjson not installed"))]
+
+
+@pytest.mark.parametrize("fast", PATHS)
+def test_decode_transaction(fast):
+    transaction = codec.decode_transaction(MESSAGE, fast=fast)
+    assert isinstance(transaction, Transaction)
+    assert transaction.amount == 125.5
+    assert transaction.metadata == {"channel": "web"}
+
+
+@pytest.mark.skipif(codec.orjson is None, reason="orjson not installed")
+def test_decode_paths_agree():
+    assert codec.decode_transaction(MESSAGE, fast=False) == codec.decode_transaction(MESSAGE, fast=True)
+
+
+def test_decode_rejects_invalid_message():
+    with pytest.raises(ValueError):
+        codec.decode_transaction(json.dumps({"transaction_id": "txn-1"}), fast=True)
+    with pytest.raises(ValueError):
+        codec.decode_transaction(json.dumps({"transaction_id": "txn-1"}), fast=False)
+
+
+@pytest.mark.parametrize("fast", PATHS)
+def test_built_result_round_trips_with_numpy_inputs(fast):
+    transaction = codec.decode_transaction(MESSAGE)
+    features = np.array([0.25, 1.5], dtype=np.float32)
+    result = codec.build_result(transaction, np.float64(0.875), np.str_("high"), np.bool_(True),
+                                features.tolist(), "pretrained_lr")
+
+    decoded = codec.loads(codec.encode_result(result, fast=fast), fast=fast)
+    assert decoded["fraud_probability"] == 0.875
+    assert decoded["is_fraud"] is True
+    assert decoded["risk_level"] == "high"
+    assert decoded["feature_vector"] == [0.25, 1.5]
+    assert decoded["transaction_type"] == "purchase"
+
+
+def test_explicit_override_does_not_touch_settings():
+    before = codec.settings.json_codec
+    codec.encode_result({"a": 1}, fast=before != "orjson")
+    assert codec.settings.json_codec == before
@@ -0,0 +1,47 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy.dialects import postgresql
+
+import crud
+
+
+class _CapturingSession:
+    """Records the statement instead of running it"""
+
+    def __init__(self):
+        self.statements = []
+
+    async def execute(self, statement):
+        self.statements.append(statement)
+        return self
+
+    def scalar_one_or_none(self):
+        return None
+
+
+def _sql(statement) -> tuple:
+    compiled = statement.compile(dialect=postgresql.dialect())
+    return str(compiled), compiled.params
+
+
+def test_transaction_lookup_is_bounded_by_event_time():
+    session = _CapturingSession()
+    around = datetime(2024, 1, 1, 13, 0, tzinfo=timezone(timedelta(hours=1)))
+    asyncio.run(crud.get_transaction_async(session, "txn_1", around=around, window=timedelta(minutes=10)))
+
+    sql, params = _sql(session.statements[0])
+    assert "transactions.timestamp BETWEEN" in sql
+    # Compared as naive UTC, like the column
+    assert sorted(v for v in params.values() if isinstance(v, datetime)) == [
+        datetime(2024, 1, 1, 11, 50), datetime(2024, 1, 1, 12, 10)
+    ]
+
+
+def test_transaction_lookup_without_time_searches_by_id_only():
+    session = _CapturingSession()
+    asyncio.run(crud.get_transaction_async(session, "txn_1"))
+
+    sql, _ = _sql(session.statements[0])
+    assert "transactions.transaction_id =" in sql
+    assert "BETWEEN" not in sql
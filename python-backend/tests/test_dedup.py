@@ -0,0 +1,53 @@
+import dedup
+from dedup import BloomFilter, DeduplicationCache
+
+
+def test_repeated_id_is_a_duplicate():
+    cache = DeduplicationCache()
+    assert cache.check("txn_1") == dedup.NEW
+    assert cache.check("txn_1") == dedup.DUPLICATE
+    assert cache.check("txn_2") == dedup.NEW
+    assert cache.get_stats() == {"window_entries": 2, "checked": 3, "duplicates_dropped": 1, "bloom_hits": 0}
+
+
+def test_discarded_id_is_new_again():
+    cache = DeduplicationCache()
+    cache.check("txn_1")
+    cache.discard("txn_1")
+    assert cache.check("txn_1") == dedup.NEW
+    cache.discard("never_seen")  # No-op
+
+
+def test_ids_past_the_window_fall_back_to_the_bloom_filter():
+    cache = DeduplicationCache(window_seconds=0.0)
+    assert cache.check("txn_1") == dedup.NEW
+    # Expired out of the exact window on the next check
+    assert cache.check("txn_2") == dedup.NEW
+    assert cache.check("txn_1") == dedup.PROBABLE_DUPLICATE
+    assert cache.stats["bloom_hits"] == 1
+
+
+def test_window_is_bounded_by_max_entries():
+    cache = DeduplicationCache(max_entries=10)
+    for i in range(100):
+        cache.check(f"txn_{i}")
+    assert cache.get_stats()["window_entries"] <= 10
+    assert cache.check("txn_0") == dedup.PROBABLE_DUPLICATE
+
+
+def test_bloom_filter_rotation_keeps_previous_generation():
+    cache = DeduplicationCache(window_seconds=0.0, bloom_capacity=5)
+    for i in range(8):
+        cache.check(f"txn_{i}")
+    cache.check("flush")
+    assert cache._previous_bloom is not None
+    assert cache.check("txn_0") == dedup.PROBABLE_DUPLICATE
+
+
+def test_bloom_filter_has_no_false_negatives_and_few_false_positives():
+    bloom = BloomFilter(capacity=2000, error_rate=0.01)
+    for i in range(2000):
+        bloom.add(f"in_{i}")
+    assert all(f"in_{i}" in bloom for i in range(2000))
+    false_positives = sum(f"out_{i}" in bloom for i in range(5000))
+    assert false_positives / 5000 < 0.03
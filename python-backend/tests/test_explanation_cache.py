@@ -0,0 +1,120 @@
+import asyncio
+
+import fakeredis.aioredis
+
+import explanation_cache
+from explanation_cache import ExplanationCache, fill_values, render, signature, to_template
+
+
+def _values(transaction_id: str, fraud_score: float, amount: float, user_avg: float = 200.0):
+    features = {"amount": amount, "user_avg_amount": user_avg, "amount_vs_avg": amount / user_avg,
+                "txns_last_hour": 8}
+    return fill_values(transaction_id, fraud_score, features, [("amount_vs_avg", 0.612)])
+
+
+EXPLANATION = ("Txn txn_1 scored 87.3% ({high}): $1,234.50 is 6.2x the $200.00 average, "
+               "with 8 transactions in an hour (weight 0.612). Not to be confused with $1,234.500.")
+
+
+def test_to_template_replaces_whole_values_only():
+    template = to_template(EXPLANATION, _values("txn_1", 0.873, 1234.5))
+
+    assert template == ("Txn {txn_id} scored {score_pct1} ({{high}}): {amount_cents} is {deviation} "
+                        "the {user_avg_cents} average, with {velocity_transactions} in an hour "
+                        "(weight {factor0_value}). Not to be confused with $1,234.500.")
+
+
+def test_render_fills_in_another_transactions_numbers():
+    template = to_template(EXPLANATION, _values("txn_1", 0.873, 1234.5))
+
+    assert render(template, _values("txn_2", 0.915, 2000.0)) == (
+        "Txn txn_2 scored 91.5% ({high}): $2,000.00 is 10.0x the $200.00 average, "
+        "with 8 transactions in an hour (weight 0.612). Not to be confused with $1,234.500."
+    )
+    # Fewer top features than the cached text used
+    values = _values("txn_3", 0.9, 500.0)
+    del values["factor0_value"]
+    assert render(template, values) is None
+
+
+def test_value_shared_by_two_quantities_is_uncacheable():
+    # Amount and user average both print as $200.00: the text cannot say which is which
+    values = _values("txn_1", 0.9, 200.0, user_avg=200.0)
+    assert to_template("Spent $200.00 against a $200.00 average.", values) is None
+    # Formats of one quantity may coincide ($900.00 with and without separators)
+    values = _values("txn_1", 0.9, 900.0)
+    assert to_template("Spent $900.00.", values) == "Spent {amount_cents}."
+
+
+def test_signature_buckets_the_key_features():
+    importance = {"amount_vs_avg": 0.6, "txns_last_hour": 0.3, "reason": "velocity"}
+    base = {"amount": 600.0, "amount_vs_avg": 4.0, "txns_last_hour": 6}
+
+    assert signature("high", base, importance) == signature("high", {**base, "amount": 900.0}, importance)
+    assert signature("high", base, importance) != signature("high", {**base, "amount": 1200.0}, importance)
+    assert signature("high", base, importance) != signature("critical", base, importance)
+    assert signature("high", base, importance).startswith("high|velocity|")
+
+
+def test_cache_hits_render_and_count_saved_time():
+    async def scenario():
+        cache = ExplanationCache()
+        assert await cache.get("key", _values("txn_2", 0.9, 2000.0)) is None
+        await cache.put("key", EXPLANATION, _values("txn_1", 0.873, 1234.5), 2.0)
+        return cache, await cache.get("key", _values("txn_2", 0.915, 2000.0))
+
+    cache, explanation = asyncio.run(scenario())
+    assert explanation.startswith("Txn txn_2 scored 91.5%")
+    assert cache.get_stats()["hit_rate"] == 0.5
+    assert cache.stats["saved_seconds"] == 2.0
+
+
+def test_cache_is_bounded_and_expires(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(explanation_cache.time, "monotonic", lambda: now[0])
+    values = _values("txn_1", 0.873, 1234.5)
+
+    async def scenario():
+        cache = ExplanationCache(max_entries=2, ttl=10.0)
+        for key in ("a", "b"):
+            await cache.put(key, EXPLANATION, values, 1.0)
+        assert await cache.get("a", values) is not None  # "b" is now least recently used
+        await cache.put("c", EXPLANATION, values, 1.0)
+        kept = list(cache._entries)
+        now[0] += 10.0
+        return cache, kept, await cache.get("a", values)
+
+    cache, kept, expired = asyncio.run(scenario())
+    assert kept == ["a", "c"]
+    assert expired is None
+    assert cache.get_stats()["entries"] == 1
+
+
+def test_uncacheable_explanations_are_not_stored():
+    async def scenario():
+        cache = ExplanationCache()
+        values = _values("txn_1", 0.9, 200.0, user_avg=200.0)
+        await cache.put("key", "Spent $200.00 against a $200.00 average.", values, 1.0)
+        return cache
+
+    cache = asyncio.run(scenario())
+    assert cache.stats["uncacheable"] == 1
+    assert cache.get_stats()["entries"] == 0
+    assert cache.avg_generation_seconds == 1.0
+
+
+def test_workers_share_entries_through_redis():
+    server = fakeredis.FakeServer()
+
+    async def scenario():
+        first = ExplanationCache(redis_client=fakeredis.aioredis.FakeRedis(server=server), ttl=60.0)
+        second = ExplanationCache(redis_client=fakeredis.aioredis.FakeRedis(server=server), ttl=60.0)
+        await first.put("key", EXPLANATION, _values("txn_1", 0.873, 1234.5), 3.0)
+        explanation = await second.get("key", _values("txn_2", 0.915, 2000.0))
+        return second, explanation
+
+    second, explanation = asyncio.run(scenario())
+    assert explanation.startswith("Txn txn_2 scored 91.5%")
+    assert second.stats["hits"] == 1 and second.stats["saved_seconds"] == 3.0
+    # Kept locally for the rest of its TTL
+    assert "key" in second._entries
@@ -0,0 +1,48 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from feature_extractor import FeatureExtractor
+from models import Transaction
+
+
+def _transaction(n: int, user_id: str = "user_1", merchant_id: str = "merchant_1",
+                 ip_address: str = "10.0.0.1") -> Transaction:
+    return Transaction(transaction_id=f"txn_{n}", user_id=user_id, amount=10.0 + n,
+                       merchant_id=merchant_id, ip_address=ip_address,
+                       transaction_type="purchase", timestamp=datetime(2024, 1, 1, 12, 0, n % 60))
+
+
+def test_histories_are_trimmed_to_the_window():
+    extractor = FeatureExtractor(window_size=5)
+    for n in range(20):
+        features = extractor.extract_features(_transaction(n))
+
+    assert features["ip_txn_count"] == 5
+    for history, key in ((extractor.user_history, "user_1"),
+                         (extractor.merchant_history, "merchant_1"),
+                         (extractor.ip_history, "10.0.0.1")):
+        assert [t.transaction_id for t in history[key]] == [f"txn_{n}" for n in range(15, 20)]
+
+
+def test_least_recently_used_keys_are_dropped():
+    extractor = FeatureExtractor(max_keys=3)
+    for n, merchant in enumerate(["m1", "m2", "m3", "m1", "m4"]):
+        extractor.extract_features(_transaction(n, user_id=merchant, merchant_id=merchant, ip_address=merchant))
+
+    for history in (extractor.user_history, extractor.merchant_history, extractor.ip_history):
+        assert list(history) == ["m3", "m1", "m4"]
+
+
+def test_shared_merchant_and_ip_history_is_safe_across_threads():
+    extractor = FeatureExtractor(window_size=50)
+
+    def user(u: int):
+        for n in range(200):
+            extractor.extract_features(_transaction(u * 1000 + n, user_id=f"user_{u}"))
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(user, range(8)))
+
+    assert len(extractor.merchant_history["merchant_1"]) == 50
+    assert len(extractor.ip_history["10.0.0.1"]) == 50
+    assert all(len(extractor.user_history[f"user_{u}"]) == 50 for u in range(8))
@@ -0,0 +1,61 @@
+from datetime import datetime, timedelta
+
+from hot_store import HotResultStore
+
+BASE = datetime.utcnow() + timedelta(minutes=1)
+
+
+def _add(store, seconds: int, txn_id: str, user_id="u1", risk_level="low", is_fraud=False):
+    result = {"transaction_id": txn_id, "user_id": user_id, "risk_level": risk_level, "is_fraud": is_fraud}
+    return store.add((BASE + timedelta(seconds=seconds), txn_id), result)
+
+
+def _ids(entries):
+    return [result["transaction_id"] for _, _, result in entries]
+
+
+def test_views_are_ordered_by_key_not_arrival():
+    store = HotResultStore(capacity=10)
+    _add(store, 3, "c")
+    _add(store, 1, "a", is_fraud=True)
+    _add(store, 2, "b", user_id="u2", is_fraud=True)
+
+    assert _ids(store.recent(3)) == ["c", "b", "a"]
+    assert _ids(store.by_user("u1", 5)) == ["c", "a"]
+    assert _ids(store.fraud(5)) == ["b", "a"]
+    assert [r["transaction_id"] for r in store.values()] == ["a", "b", "c"]
+
+
+def test_eviction_drops_smallest_key_from_every_index():
+    store = HotResultStore(capacity=2)
+    _add(store, 2, "b", risk_level="high")
+    _add(store, 1, "a", risk_level="high", is_fraud=True)
+    _add(store, 3, "c", risk_level="critical")
+
+    assert len(store) == 2
+    assert _ids(store.recent(5)) == ["c", "b"]
+    assert store.fraud_count() == 0
+    assert store.risk_level_count(("high", "critical")) == 2
+    assert store.watermark == (BASE + timedelta(seconds=1), "a")
+
+
+def test_results_below_watermark_are_not_kept():
+    store = HotResultStore(capacity=1)
+    _add(store, 5, "b")
+    _add(store, 6, "c")  # Evicts b
+
+    assert not _add(store, 4, "late")
+    assert _ids(store.recent(5)) == ["c"]
+    # Older than startup: rows around it may only be in the database
+    assert not store.add((datetime(2000, 1, 1), "old"), {"user_id": "u1", "risk_level": "low", "is_fraud": False})
+
+
+def test_by_risk_levels_merges_newest_first():
+    store = HotResultStore(capacity=10)
+    _add(store, 1, "a", risk_level="high")
+    _add(store, 4, "d", risk_level="critical")
+    _add(store, 2, "b", risk_level="critical")
+    _add(store, 3, "c", risk_level="high")
+    _add(store, 5, "e", risk_level="low")
+
+    assert _ids(store.by_risk_levels(("high", "critical"), 3)) == ["d", "c", "b"]
@@ -0,0 +1,74 @@
+import asyncio
+from datetime import datetime
+
+import lanes
+from config import get_settings
+from models import Transaction
+
+
+def _transaction(amount: float, transaction_type: str = "purchase") -> Transaction:
+    return Transaction(transaction_id="txn_1", user_id="user_1", amount=amount,
+                       transaction_type=transaction_type, timestamp=datetime(2024, 1, 1))
+
+
+def test_classify_with_default_lanes():
+    default_lanes = lanes.load_lanes(get_settings().priority_lanes)
+    assert [lane.name for lane in default_lanes] == ["high", "normal", "low"]
+
+    assert lanes.classify(default_lanes, _transaction(900.0, "transfer")) == 0
+    # High needs both the amount and the type
+    assert lanes.classify(default_lanes, _transaction(900.0, "purchase")) == 1
+    assert lanes.classify(default_lanes, _transaction(100.0, "withdrawal")) == 1
+    assert lanes.classify(default_lanes, _transaction(5.0, "transfer")) == 2
+
+
+def test_unmatched_transactions_fall_into_the_last_lane():
+    strict = lanes.load_lanes([
+        {"name": "big", "min_amount": 1000.0, "slo_seconds": 0.1},
+        {"name": "refunds", "min_amount": 10.0, "transaction_types": ["refund"], "slo_seconds": 1.0},
+    ])
+    assert lanes.classify(strict, _transaction(1.0)) == 1
+
+
+def _drain(queue: lanes.LaneQueue):
+    return [queue.get_nowait() for _ in range(queue.qsize())]
+
+
+def test_strict_priority_without_min_share():
+    queue = lanes.LaneQueue(3, min_share=0.0)
+    for lane, item in ((2, "low_1"), (1, "normal_1"), (0, "high_1"), (2, "low_2"), (0, "high_2")):
+        queue.put_nowait((lane, item))
+
+    assert queue.lane_sizes() == [2, 1, 2]
+    assert _drain(queue) == [(0, "high_1"), (0, "high_2"), (1, "normal_1"), (2, "low_1"), (2, "low_2")]
+    assert queue.empty()
+
+
+def test_min_share_lets_the_longest_waiting_lower_lane_through():
+    queue = lanes.LaneQueue(3, min_share=0.25)
+    queue.put_nowait((2, "low"))
+    queue.put_nowait((1, "normal"))
+    for n in range(8):
+        queue.put_nowait((0, f"high_{n}"))
+
+    order = [item for _, item in _drain(queue)]
+    # Every 4th pick goes to a waiting lower lane, oldest first
+    assert order[3] == "low"
+    assert order[7] == "normal"
+    assert order.count("low") == order.count("normal") == 1
+
+
+def test_bounded_on_the_total_across_lanes():
+    async def run():
+        queue = lanes.LaneQueue(2, maxsize=2)
+        await queue.put((1, "a"))
+        await queue.put((0, "b"))
+        assert queue.full()
+        blocked = asyncio.create_task(queue.put((0, "c")))
+        await asyncio.sleep(0)
+        assert not blocked.done()
+        assert await queue.get() == (0, "b")
+        await blocked
+        return _drain(queue)
+
+    assert asyncio.run(run()) == [(0, "c"), (1, "a")]
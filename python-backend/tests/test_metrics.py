@@ -0,0 +1,60 @@
+from metrics import Counter, Gauge, Histogram, MetricsRegistry, register_callback
+
+
+def test_histogram_buckets_are_cumulative_with_sum_and_count():
+    histogram = Histogram("stage_seconds", "Stage time", label_names=("stage",), buckets=(0.1, 1.0))
+    child = histogram.labels("parse")
+    for value in (0.05, 0.1, 0.5, 3.0):
+        child.observe(value)
+
+    lines = histogram.render()
+    assert lines[:2] == ["# HELP stage_seconds Stage time", "# TYPE stage_seconds histogram"]
+    assert lines[2:] == [
+        'stage_seconds_bucket{stage="parse",le="0.1"} 2',
+        'stage_seconds_bucket{stage="parse",le="1.0"} 3',
+        'stage_seconds_bucket{stage="parse",le="+Inf"} 4',
+        'stage_seconds_sum{stage="parse"} 3.65',
+        'stage_seconds_count{stage="parse"} 4',
+    ]
+
+
+def test_counter_and_gauge_children_per_label():
+    counter = Counter("errors_total", "Errors", label_names=("stage",))
+    counter.labels("db_write").inc()
+    counter.labels("db_write").inc(2)
+    counter.labels("explain").inc()
+    gauge = Gauge("in_flight", "In flight")
+    gauge.inc(3)
+    gauge.dec()
+
+    assert counter.render()[2:] == ['errors_total{stage="db_write"} 3.0', 'errors_total{stage="explain"} 1.0']
+    assert gauge.render()[2:] == ["in_flight 2.0"]
+
+
+def test_label_values_are_escaped():
+    counter = Counter("odd_total", "Odd labels", label_names=("path",))
+    counter.labels('a"b\\c\nd').inc()
+    assert counter.render()[2] == 'odd_total{path="a\\"b\\\\c\\nd"} 1.0'
+
+
+def test_callbacks_are_read_at_scrape_time_and_failures_are_skipped():
+    depth = {"value": 1}
+    queue = register_callback("test_queue_depth", "Queue depth", lambda: depth["value"])
+    lanes = register_callback("test_lane_depth", "Lane depth", lambda: {"high": 2, "low": 5},
+                              label_names=("lane",))
+    broken = register_callback("test_broken", "Broken", lambda: 1 / 0)
+
+    depth["value"] = 7
+    assert queue.render()[2:] == ["test_queue_depth 7"]
+    assert lanes.render()[2:] == ['test_lane_depth{lane="high"} 2', 'test_lane_depth{lane="low"} 5']
+    assert broken.render()[2:] == []
+
+
+def test_registry_renders_every_family():
+    registry = MetricsRegistry()
+    registry.register(Counter("a_total", "A")).inc()
+    registry.register(Gauge("b", "B")).set(1.5)
+    assert registry.render() == (
+        "# HELP a_total A\n# TYPE a_total counter\na_total 1.0\n"
+        "# HELP b B\n# TYPE b gauge\nb 1.5\n"
+    )
@@ -0,0 +1,52 @@
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from benchmarks import microbench
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+
+def test_compare_flags_only_slowdowns_beyond_threshold():
+    baseline = {
+        "steady": {"ns_per_item": 100.0},
+        "slower": {"ns_per_item": 100.0},
+        "faster": {"ns_per_item": 100.0},
+    }
+    results = {
+        "steady": {"ns_per_item": 115.0},
+        "slower": {"ns_per_item": 130.0},
+        "faster": {"ns_per_item": 50.0},
+        "new_case": {"ns_per_item": 10.0},
+        "skipped": {"skipped": "no xgboost"},
+    }
+    assert microbench.compare(results, baseline, threshold=0.20) == ["slower"]
+    assert results["faster"]["change_vs_baseline"] == -0.5
+
+
+def test_committed_baseline_covers_the_default_cases():
+    baseline = microbench.json.loads(microbench.DEFAULT_BASELINE.read_text())
+    expected = {name for name in microbench.all_cases(include_database=False)
+                if not name.startswith(("detector.xgboost", "detector.lightgbm"))}
+    assert expected <= set(baseline)
+
+
+def _run_microbench(*args):
+    return subprocess.run([sys.executable, "-m", "benchmarks.microbench", *args],
+                          cwd=BACKEND_DIR, capture_output=True, text=True)
+
+
+def test_missing_baseline_fails(tmp_path):
+    run = _run_microbench("--filter", "features.to_array", "--repeats", "1",
+                          "--baseline", str(tmp_path / "missing.json"))
+    assert run.returncode == 1
+    assert "No baseline" in run.stdout
+
+
+@pytest.mark.benchmark
+def test_no_regression_against_committed_baseline():
+    # Extra repeats steady the medians on shared runners
+    run = _run_microbench("--repeats", "9")
+    assert run.returncode == 0, run.stdout
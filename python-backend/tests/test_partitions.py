@@ -0,0 +1,125 @@
+"""Partition creation, retention and migration against a throwaway PostgreSQL (see conftest.py)"""
+import os
+from datetime import datetime, timedelta
+
+import pytest
+
+if not os.getenv("TEST_DATABASE_URL"):
+    pytest.skip("TEST_DATABASE_URL is not set", allow_module_level=True)
+
+from sqlalchemy import func, inspect, select, text
+
+import crud
+import partitions
+from conftest import create_baseline_transactions_table, insert_baseline_row
+from database import Base, SessionLocal, TransactionDB, engine, init_db
+from feature_extractor import FEATURE_NAMES, FEATURE_SCHEMA_VERSION
+from migrate_partitions import OLD_TABLE, migrate
+from models import FraudScore, Transaction
+
+pytestmark = pytest.mark.postgres
+
+
+def _drop_everything():
+    with engine.begin() as conn:
+        conn.execute(text(f"DROP TABLE IF EXISTS {OLD_TABLE}"))
+    Base.metadata.drop_all(bind=engine)
+
+
+@pytest.fixture
+def db():
+    _drop_everything()
+    init_db()
+    with SessionLocal() as session:
+        yield session
+    _drop_everything()
+
+
+def _add(db, txn_id: str, timestamp: datetime):
+    transaction = Transaction(transaction_id=txn_id, user_id="user_1", amount=25.0,
+                              transaction_type="purchase", timestamp=timestamp)
+    score = FraudScore(transaction_id=txn_id, fraud_probability=0.9, risk_level="high",
+                       is_fraud=True, features={}, model_used="test")
+    crud.create_transaction(db, transaction, score)
+
+
+def _partition_names(db):
+    return {name for name, _, _ in partitions.list_partitions(db)}
+
+
+def test_init_creates_default_and_premade_partitions(db):
+    today = datetime.utcnow().date()
+    names = _partition_names(db)
+
+    assert partitions.is_partitioned(db)
+    assert partitions.DEFAULT_PARTITION in names
+    for day in range(partitions.settings.partition_premake + 1):
+        assert partitions.partition_name(today + timedelta(days=day)) in names
+    # Idempotent
+    assert partitions.ensure_partitions(db) == 0
+
+
+def test_retention_drops_partitions_and_purges_default_by_event_time(db):
+    now = datetime.utcnow()
+    old_day = (now - timedelta(days=40)).date()
+    assert partitions.create_partition(db, old_day)
+
+    _add(db, "in_old_partition", datetime.combine(old_day, datetime.min.time()) + timedelta(hours=12))
+    _add(db, "in_default", now - timedelta(days=45))
+    _add(db, "recent", now)
+    assert crud.get_transaction_count(db) == 3
+
+    # Every row was inserted just now: retention must go by timestamp, not created_at
+    assert crud.delete_old_transactions(db, days=30) == 2
+
+    assert partitions.partition_name(old_day) not in _partition_names(db)
+    remaining = db.execute(select(TransactionDB.transaction_id)).scalars().all()
+    assert remaining == ["recent"]
+    assert crud.get_transaction_count(db) == 1
+
+
+def test_same_id_with_another_timestamp_is_not_rejected(db):
+    # Documented: only (transaction_id, timestamp) is unique on the partitioned table
+    now = datetime.utcnow()
+    _add(db, "txn_1", now)
+    _add(db, "txn_1", now - timedelta(hours=1))
+
+    count = db.execute(select(func.count()).where(TransactionDB.transaction_id == "txn_1")).scalar()
+    assert count == 2
+
+
+def test_migrate_converts_baseline_table():
+    _drop_everything()
+    # As the first release created it: JSON features, no write_xid, no partitions
+    create_baseline_transactions_table(engine)
+    Base.metadata.create_all(bind=engine)  # Remaining tables; transactions already exists
+
+    try:
+        now = datetime.utcnow()
+        features = {name: 1.0 for name in FEATURE_NAMES}
+        insert_baseline_row(engine, "recent", now, features)
+        insert_baseline_row(engine, "last_week", now - timedelta(days=7), features)
+        insert_baseline_row(engine, "expired", now - timedelta(days=60))
+
+        with SessionLocal() as db:
+            assert not partitions.is_partitioned(db)
+            assert migrate(db) == 3
+
+            assert partitions.is_partitioned(db)
+            assert partitions.partition_name((now - timedelta(days=7)).date()) in _partition_names(db)
+            rows = {row.transaction_id: row for row in db.execute(select(
+                TransactionDB.transaction_id, TransactionDB.write_xid,
+                TransactionDB.feature_vector, TransactionDB.feature_schema_version
+            ))}
+            assert set(rows) == {"recent", "last_week", "expired"}
+            assert all(row.write_xid is not None for row in rows.values())
+            assert rows["recent"].feature_vector == [1.0] * len(FEATURE_NAMES)
+            assert rows["recent"].feature_schema_version == FEATURE_SCHEMA_VERSION
+            assert rows["expired"].feature_vector is None
+            assert inspect(engine).has_table(OLD_TABLE)
+
+            # Past retention, copied into DEFAULT and retired by the next maintenance run
+            assert crud.delete_old_transactions(db, days=30) == 1
+            assert migrate(db) == 0
+    finally:
+        _drop_everything()
@@ -0,0 +1,82 @@
+import asyncio
+
+import fakeredis.aioredis
+
+from response_cache import ResponseCache
+
+
+class Loader:
+    """Counts loads and returns the current version"""
+
+    def __init__(self):
+        self.version = 0
+        self.calls = 0
+
+    async def __call__(self):
+        self.calls += 1
+        await asyncio.sleep(0.01)
+        return {"version": self.version}
+
+
+def test_concurrent_misses_load_once():
+    async def scenario():
+        cache = ResponseCache()
+        loader = Loader()
+        results = await asyncio.gather(*(cache.get_or_load("stats", 5.0, loader) for _ in range(10)))
+        return cache, loader, results
+
+    cache, loader, results = asyncio.run(scenario())
+    assert loader.calls == 1
+    assert all(result == {"version": 0} for result in results)
+    assert cache.stats["coalesced"] == 9
+
+
+def test_invalidate_drops_tagged_entries_only():
+    async def scenario():
+        cache = ResponseCache()
+        tagged, untagged = Loader(), Loader()
+        await cache.get_or_load("recent", 5.0, tagged, tags=("transactions",))
+        await cache.get_or_load("health", 5.0, untagged)
+        await cache.invalidate("transactions")
+        await cache.get_or_load("recent", 5.0, tagged, tags=("transactions",))
+        await cache.get_or_load("health", 5.0, untagged)
+        return tagged.calls, untagged.calls
+
+    assert asyncio.run(scenario()) == (2, 1)
+
+
+def test_invalidations_are_rate_limited():
+    async def scenario():
+        cache = ResponseCache(min_invalidation_interval=60.0)
+        loader = Loader()
+        await cache.invalidate("transactions")
+        await cache.get_or_load("recent", 5.0, loader, tags=("transactions",))
+        await cache.invalidate("transactions")  # Within the interval: ignored
+        await cache.get_or_load("recent", 5.0, loader, tags=("transactions",))
+        return cache.stats["invalidations"], loader.calls
+
+    assert asyncio.run(scenario()) == (1, 1)
+
+
+def test_invalidation_reaches_other_workers_through_redis():
+    async def scenario():
+        server = fakeredis.FakeServer()
+        worker_a = ResponseCache(redis_client=fakeredis.aioredis.FakeRedis(server=server, decode_responses=True))
+        worker_b = ResponseCache(redis_client=fakeredis.aioredis.FakeRedis(server=server, decode_responses=True))
+        loader = Loader()
+
+        first = await worker_a.get_or_load("recent", 30.0, loader, tags=("transactions",))
+        shared = await worker_b.get_or_load("recent", 30.0, loader, tags=("transactions",))
+        assert (first, shared, loader.calls) == ({"version": 0}, {"version": 0}, 1)
+
+        # A write in worker A must invalidate worker B's local copy and the shared one
+        loader.version = 1
+        await worker_a.invalidate("transactions")
+        after_b = await worker_b.get_or_load("recent", 30.0, loader, tags=("transactions",))
+        after_a = await worker_a.get_or_load("recent", 30.0, loader, tags=("transactions",))
+        return after_b, after_a, loader.calls
+
+    after_b, after_a, calls = asyncio.run(scenario())
+    assert after_b == {"version": 1}
+    assert after_a == {"version": 1}
+    assert calls == 2
@@ -0,0 +1,146 @@
+import asyncio
+
+import pytest
+
+from scheduler import KeyedScheduler
+
+
+async def _run(scheduler: KeyedScheduler, body):
+    """Run `body()` with the scheduler's workers going"""
+    runner = asyncio.create_task(scheduler.run())
+    try:
+        return await body()
+    finally:
+        runner.cancel()
+        await asyncio.gather(runner, return_exceptions=True)
+
+
+def test_jobs_for_one_key_run_in_order_one_at_a_time():
+    scheduler = KeyedScheduler(concurrency=4)
+    log, running = [], set()
+
+    async def job(key, n):
+        assert key not in running
+        running.add(key)
+        await asyncio.sleep(0.001 * (3 - n % 3))  # Later jobs would finish first if they overlapped
+        log.append((key, n))
+        running.discard(key)
+
+    async def body():
+        futures = [await scheduler.submit("user_1", job, "user_1", n) for n in range(6)]
+        await asyncio.gather(*futures)
+
+    asyncio.run(_run(scheduler, body))
+    assert log == [("user_1", n) for n in range(6)]
+    assert scheduler.stats["jobs_completed"] == 6
+
+
+def test_different_keys_run_concurrently():
+    scheduler = KeyedScheduler(concurrency=3)
+    started = []
+
+    async def job(key, gate):
+        started.append(key)
+        await gate.wait()
+
+    async def body():
+        gate = asyncio.Event()
+        futures = [await scheduler.submit(key, job, key, gate) for key in ("a", "b", "c")]
+        await asyncio.sleep(0.01)
+        assert sorted(started) == ["a", "b", "c"]
+        assert scheduler.get_stats()["running"] == 3
+        gate.set()
+        await asyncio.gather(*futures)
+
+    asyncio.run(_run(scheduler, body))
+
+
+def test_keys_take_turns_so_a_backlog_does_not_starve_others():
+    scheduler = KeyedScheduler(concurrency=1)
+    order = []
+
+    async def job(key):
+        order.append(key)
+
+    async def body():
+        futures = [await scheduler.submit("flood", job, "flood") for _ in range(5)]
+        futures.append(await scheduler.submit("quiet", job, "quiet"))
+        await asyncio.gather(*futures)
+
+    asyncio.run(_run(scheduler, body))
+    assert order.index("quiet") <= 1
+
+
+def test_higher_priority_lane_goes_first():
+    scheduler = KeyedScheduler(concurrency=1, lanes=2, min_share=0.0)
+    order = []
+
+    async def job(key):
+        order.append(key)
+
+    async def body():
+        futures = [await scheduler.submit(f"low_{n}", job, f"low_{n}", lane=1) for n in range(3)]
+        futures.append(await scheduler.submit("high", job, "high", lane=0))
+        await asyncio.gather(*futures)
+
+    asyncio.run(_run(scheduler, body))
+    assert order[0] == "high"
+
+
+def test_submit_waits_once_max_pending_jobs_are_scheduled():
+    scheduler = KeyedScheduler(concurrency=1, max_pending=2)
+
+    async def job(gate):
+        await gate.wait()
+
+    async def body():
+        gate = asyncio.Event()
+        await scheduler.submit("a", job, gate)
+        await scheduler.submit("b", job, gate)
+        assert scheduler.qsize() == scheduler.maxsize == 2
+        blocked = asyncio.create_task(scheduler.submit("c", job, gate))
+        await asyncio.sleep(0.01)
+        assert not blocked.done()
+        gate.set()
+        await (await blocked)
+        assert scheduler.qsize() == 0
+
+    asyncio.run(_run(scheduler, body))
+
+
+def test_failures_reach_the_future_and_do_not_stop_the_key():
+    scheduler = KeyedScheduler(concurrency=2)
+
+    async def fail():
+        raise ValueError("boom")
+
+    async def double(n):
+        return n * 2
+
+    async def body():
+        failed = await scheduler.submit("a", fail)
+        assert await scheduler.call("a", double, 21) == 42
+        with pytest.raises(ValueError, match="boom"):
+            await failed
+
+    asyncio.run(_run(scheduler, body))
+    assert scheduler.get_stats() == {
+        "pending": 0, "running": 0, "keys": 0, "jobs_completed": 1, "jobs_failed": 1
+    }
+
+
+def test_stopping_cancels_jobs_still_waiting():
+    scheduler = KeyedScheduler(concurrency=1)
+
+    async def body():
+        gate = asyncio.Event()
+        runner = asyncio.create_task(scheduler.run())
+        running = await scheduler.submit("a", gate.wait)
+        waiting = await scheduler.submit("a", gate.wait)
+        await asyncio.sleep(0.01)
+        runner.cancel()
+        await asyncio.gather(runner, return_exceptions=True)
+        return running, waiting
+
+    running, waiting = asyncio.run(body())
+    assert running.cancelled() and waiting.cancelled()
@@ -0,0 +1,69 @@
+"""init_db on a database created by the first release (see conftest.py for TEST_DATABASE_URL)"""
+import os
+from datetime import datetime
+
+import pytest
+
+if not os.getenv("TEST_DATABASE_URL"):
+    pytest.skip("TEST_DATABASE_URL is not set", allow_module_level=True)
+
+from sqlalchemy import inspect, select, text
+
+import crud
+from conftest import create_baseline_transactions_table, insert_baseline_row
+from database import Base, SessionLocal, TransactionDB, engine, init_db
+from feature_extractor import FEATURE_NAMES, FEATURE_SCHEMA_VERSION
+from migrate_partitions import OLD_TABLE
+from models import FraudScore, Transaction
+
+pytestmark = pytest.mark.postgres
+
+
+def _drop_everything():
+    with engine.begin() as conn:
+        conn.execute(text(f"DROP TABLE IF EXISTS {OLD_TABLE}"))
+    Base.metadata.drop_all(bind=engine)
+
+
+@pytest.fixture
+def baseline():
+    _drop_everything()
+    create_baseline_transactions_table(engine)
+    yield
+    _drop_everything()
+
+
+def test_init_db_converts_json_features_to_vectors(baseline):
+    now = datetime.utcnow()
+    features = {name: float(index) for index, name in enumerate(FEATURE_NAMES)}
+    del features["ip_user_ratio"]  # Missing names become 0
+    insert_baseline_row(engine, "legacy", now, features)
+    insert_baseline_row(engine, "no_features", now)
+
+    init_db()
+    init_db()  # Idempotent
+
+    columns = {column["name"] for column in inspect(engine).get_columns("transactions")}
+    assert "features" not in columns
+    assert {"feature_vector", "feature_schema_version", "write_xid"} <= columns
+    with SessionLocal() as db:
+        rows = dict(db.execute(
+            select(TransactionDB.transaction_id, TransactionDB.feature_vector)
+        ).all())
+        versions = set(db.execute(select(TransactionDB.feature_schema_version)
+                                  .where(TransactionDB.transaction_id == "legacy")).scalars())
+    assert rows["legacy"] == [float(index) for index in range(len(FEATURE_NAMES) - 1)] + [0.0]
+    assert rows["no_features"] is None
+    assert versions == {FEATURE_SCHEMA_VERSION}
+
+
+def test_new_rows_insert_after_upgrade(baseline):
+    init_db()
+    transaction = Transaction(transaction_id="new", user_id="user_1", amount=25.0,
+                              transaction_type="purchase", timestamp=datetime.utcnow())
+    score = FraudScore(transaction_id="new", fraud_probability=0.9, risk_level="high",
+                       is_fraud=True, features={"amount": 25.0}, model_used="test")
+    with SessionLocal() as db:
+        crud.create_transaction(db, transaction, score)
+        vector = db.execute(select(TransactionDB.feature_vector)).scalar_one()
+    assert vector[0] == 25.0 and len(vector) == len(FEATURE_NAMES)
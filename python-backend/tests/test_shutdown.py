@@ -0,0 +1,62 @@
+import asyncio
+from datetime import datetime
+
+import main
+import metrics
+from models import Transaction
+
+
+def _transaction(n: int) -> Transaction:
+    return Transaction(transaction_id=f"txn_{n}", user_id=f"user_{n % 2}", amount=10.0,
+                       transaction_type="purchase", timestamp=datetime(2024, 1, 1))
+
+
+def test_drain_scores_and_writes_everything_accepted(monkeypatch):
+    written = []
+
+    async def score_transaction(transaction, received_at, lane):
+        await asyncio.sleep(0.01)
+        await main.persist_queue.put((transaction, None, {}, None))
+
+    async def write_batch(batch):
+        await asyncio.sleep(0.01)
+        written.extend(transaction.transaction_id for transaction, _, _, _ in batch)
+        return len(batch)
+
+    monkeypatch.setattr(main, "score_transaction", score_transaction)
+    monkeypatch.setattr(main, "write_batch", write_batch)
+    monkeypatch.setattr(main, "response_cache", None)
+
+    async def scenario():
+        tasks = [asyncio.create_task(main.score_transactions()), asyncio.create_task(main.scheduler.run()),
+                 asyncio.create_task(main.persist_results())]
+        try:
+            for n in range(2):
+                main.degradation.deferred.append(_transaction(n))  # Shed earlier
+            for n in range(2, 6):
+                main.ingest_queue.put_nowait((0, (_transaction(n), 0.0)))
+            await asyncio.wait_for(main.drain_pipeline(), 5.0)
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    asyncio.run(scenario())
+    assert sorted(written) == [f"txn_{n}" for n in range(6)]
+    assert not main.degradation.deferred
+    assert main.ingest_queue.qsize() == main.persist_queue.qsize() == 0
+
+
+def test_undrained_work_is_counted():
+    before = metrics.SHUTDOWN_DISCARDED.labels("persist").value
+    main.persist_queue.put_nowait((_transaction(0), None, {}, None))
+    main.degradation.deferred.append(_transaction(1))
+    try:
+        main.count_undrained()
+    finally:
+        main.persist_queue.get_nowait()
+        main.persist_queue.task_done()
+        main.degradation.deferred.clear()
+
+    assert metrics.SHUTDOWN_DISCARDED.labels("persist").value == before + 1
+    assert metrics.SHUTDOWN_DISCARDED.labels("deferred").value >= 1
@@ -0,0 +1,54 @@
+import asyncio
+
+import orjson
+
+from streaming import ResultBroadcaster
+
+
+def _drain(subscriber) -> list:
+    return [subscriber.queue.get_nowait() for _ in range(subscriber.queue.qsize())]
+
+
+def test_filtered_clients_only_get_matching_results():
+    async def scenario():
+        broadcaster = ResultBroadcaster(redis_client=None, channel="results")
+        everything = broadcaster.subscribe()
+        high = broadcaster.subscribe(risk_levels={"high"})
+        user = broadcaster.subscribe(user_id="user_2")
+        for user_id, risk_level in (("user_1", "high"), ("user_2", "low")):
+            broadcaster.publish(orjson.dumps({"user_id": user_id, "risk_level": risk_level}).decode())
+        return broadcaster, _drain(everything), _drain(high), _drain(user)
+
+    broadcaster, everything, high, user = asyncio.run(scenario())
+    assert len(everything) == 2
+    assert [orjson.loads(m)["user_id"] for m in high] == ["user_1"]
+    assert [orjson.loads(m)["user_id"] for m in user] == ["user_2"]
+    assert broadcaster.stats["messages_delivered"] == 4
+
+
+def test_unparsable_message_still_reaches_unfiltered_clients():
+    async def scenario():
+        broadcaster = ResultBroadcaster(redis_client=None, channel="results")
+        everything = broadcaster.subscribe()
+        high = broadcaster.subscribe(risk_levels={"high"})
+        broadcaster.publish("not json")
+        return broadcaster, _drain(everything), _drain(high)
+
+    broadcaster, everything, high = asyncio.run(scenario())
+    assert everything == ["not json"]
+    assert high == []
+    assert broadcaster.stats["messages_unparsable"] == 1
+
+
+def test_slow_client_is_evicted():
+    async def scenario():
+        broadcaster = ResultBroadcaster(redis_client=None, channel="results", buffer_size=2)
+        slow = broadcaster.subscribe()
+        for n in range(3):
+            broadcaster.publish(orjson.dumps({"n": n}).decode())
+        return broadcaster, slow, _drain(slow)
+
+    broadcaster, slow, buffered = asyncio.run(scenario())
+    assert slow.evicted and buffered == [None]
+    assert broadcaster.get_stats()["clients"] == 0
+    assert broadcaster.stats["clients_evicted"] == 1